@@ -0,0 +1,280 @@
+import os
+import math
+import time
+import zlib
+import logging
+import multiprocessing
+from functools import wraps
+from flask import jsonify, request, session
+from config import Config
+from deadline import current_deadline
+from metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TokenBucketTable:
+    """Süreçler arasında paylaşılan, kullanıcı başına token bucket tablosu
+
+    Saniyede ``rate`` token dolan, en fazla ``burst`` token biriktiren kovalar
+    paylaşılan bellekte (anahtar hash'i, token, son güncelleme) üçlüsü olarak
+    tutulur. Boşta kalıp dolmuş bir kova yenisinden farksız olduğu için
+    yeniden kullanılır; yoklanan girişlerin hepsi doluysa en eski kova devralınır.
+    """
+
+    PROBES = 8
+
+    def __init__(self, rate, burst, size):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.size = max(1, size)
+        self._lock = multiprocessing.Lock()
+        self._entries = multiprocessing.RawArray('d', self.size * 3)
+
+    def _slot(self, tag, now):
+        start = int(tag) % self.size
+        free = oldest = None
+        for probe in range(min(self.PROBES, self.size)):
+            index = (start + probe) % self.size
+            key, tokens, updated = self._entries[index * 3:index * 3 + 3]
+            if key == tag:
+                return index
+            if free is None and (key == 0 or tokens + (now - updated) * self.rate >= self.burst):
+                free = index
+            if oldest is None or updated < self._entries[oldest * 3 + 2]:
+                oldest = index
+        index = free if free is not None else oldest
+        self._entries[index * 3:index * 3 + 3] = [tag, self.burst, now]
+        return index
+
+    def take(self, key):
+        """Token al; (başarılı mı, yeniden deneme için beklenecek saniye)"""
+        tag = float(zlib.crc32(key.encode()) + 1)
+        with self._lock:
+            now = time.monotonic()
+            base = self._slot(tag, now) * 3
+            tokens = min(self.burst, self._entries[base + 1] + (now - self._entries[base + 2]) * self.rate)
+            self._entries[base + 2] = now
+            if tokens >= 1:
+                self._entries[base + 1] = tokens - 1
+                return True, 0.0
+            self._entries[base + 1] = tokens
+            return False, (1 - tokens) / self.rate
+
+
+class ConcurrencyLimiter:
+    """Süreçler arasında paylaşılan, sınırlı bekleme kuyruklu semafor
+
+    En fazla ``limit`` istek aynı anda çalışır; ``queue_size`` istek
+    ``queue_timeout`` saniyeye kadar sıra bekler. Kuyruk doluysa istek hiç
+    beklemeden reddedilir.
+
+    Slotlar paylaşılan bellekte sahibi olan sürecin pid'iyle tutulur; ölen
+    (örn. timeout ile öldürülen) bir worker'ın slotları geri alınır.
+    Bekleyenler ``POLL_INTERVAL`` aralıklarla yoklar; gevent havuzunda
+    time.sleep yalnızca green thread'i bekletir.
+    """
+
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, limit, queue_size, queue_timeout):
+        self.limit = max(1, limit)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self._lock = multiprocessing.Lock()
+        # [0, limit) çalışan, [limit, limit + queue_size) bekleyen istekler; boş slot 0
+        self._slots = multiprocessing.RawArray('i', self.limit + self.queue_size)
+        self._hold_average = multiprocessing.RawValue('d', 0.0)
+
+    def _claim(self, start, stop):
+        """Boş veya ölü sürece ait ilk slotu bu sürece ver; indeks ya da None"""
+        owners = self._slots[start:stop]
+        for index, owner in enumerate(owners, start):
+            if owner == 0:
+                self._slots[index] = os.getpid()
+                return index
+        for index, owner in enumerate(owners, start):
+            if owner != os.getpid() and not _process_alive(owner):
+                self._slots[index] = os.getpid()
+                return index
+        return None
+
+    def _count(self, start, stop):
+        return sum(1 for owner in self._slots[start:stop] if owner)
+
+    def acquire(self, timeout=None):
+        """Slot al; (slot, None) veya (None, red nedeni: 'queue_full' / 'queue_timeout')"""
+        with self._lock:
+            if not self._count(self.limit, len(self._slots)):
+                slot = self._claim(0, self.limit)
+                if slot is not None:
+                    return slot, None
+            place = self._claim(self.limit, len(self._slots))
+            if place is None:
+                return None, 'queue_full'
+
+        wait_until = time.monotonic() + min(self.queue_timeout, timeout if timeout is not None else self.queue_timeout)
+        try:
+            while True:
+                with self._lock:
+                    slot = self._claim(0, self.limit)
+                if slot is not None:
+                    return slot, None
+                remaining = wait_until - time.monotonic()
+                if remaining <= 0:
+                    return None, 'queue_timeout'
+                time.sleep(min(self.POLL_INTERVAL, remaining))
+        finally:
+            with self._lock:
+                self._slots[place] = 0
+
+    def release(self, slot, held):
+        """Slotu bırak; ortalama tutma süresi Retry-After tahmininde kullanılır"""
+        with self._lock:
+            self._slots[slot] = 0
+            average = self._hold_average.value
+            self._hold_average.value = held if not average else 0.8 * average + 0.2 * held
+
+    @property
+    def active(self):
+        with self._lock:
+            return self._count(0, self.limit)
+
+    @property
+    def waiting(self):
+        with self._lock:
+            return self._count(self.limit, len(self._slots))
+
+    def retry_after(self):
+        """Kuyruğun boşalması için tahmini süre (saniye)"""
+        with self._lock:
+            waiting = self._count(self.limit, len(self._slots))
+            return self._hold_average.value * (waiting + 1) / self.limit
+
+
+class Rejection:
+    """Reddedilen istek: HTTP durum kodu, neden ve Retry-After"""
+
+    MESSAGES = {
+        'rate_limited': 'Çok fazla istek - lütfen {seconds} sn sonra tekrar deneyin',
+        'queue_full': 'Sunucu yoğun - lütfen {seconds} sn sonra tekrar deneyin',
+        'queue_timeout': 'Sunucu yoğun - lütfen {seconds} sn sonra tekrar deneyin'
+    }
+
+    def __init__(self, endpoint_class, reason, retry_after):
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.status = 429 if reason == 'rate_limited' else 503
+        self.retry_after = max(1, math.ceil(retry_after))
+
+    def response(self):
+        response = jsonify({
+            'success': False,
+            'error': self.MESSAGES[self.reason].format(seconds=self.retry_after),
+            'reason': self.reason,
+            'retry_after': self.retry_after
+        })
+        response.status_code = self.status
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response
+
+
+class AdmissionController:
+    """Endpoint sınıfı başına eşzamanlılık ve kullanıcı başına hız sınırı
+
+    Slotlar ve kovalar paylaşılan bellekte tutulur. Gunicorn preload_app ile
+    (varsayılan) controller master'da oluşturulur ve fork edilen tüm
+    worker'lar aynı sınırları paylaşır: bir sınıfın toplam eşzamanlılığı
+    worker sayısından bağımsız olarak ``concurrency``dir. preload_app
+    kapalıysa her worker kendi tablolarını oluşturur ve sınırlar worker
+    sayısıyla çarpılır.
+    """
+
+    def __init__(self, settings):
+        self.enabled = settings['enabled']
+        self.classes = settings['classes']
+        self.limiters = {
+            name: ConcurrencyLimiter(limits['concurrency'], limits['queue_size'], limits['queue_timeout'])
+            for name, limits in self.classes.items()
+        }
+        self.buckets = {
+            name: TokenBucketTable(limits['user_rate'], limits['user_burst'], settings['max_tracked_users'])
+            for name, limits in self.classes.items() if limits['user_rate'] > 0
+        }
+
+    def enter(self, endpoint_class, user):
+        """İsteği kabul et; (slot, None) veya (None, Rejection) döndür"""
+        if endpoint_class in self.buckets:
+            allowed, wait = self.buckets[endpoint_class].take(str(user))
+            if not allowed:
+                return None, self._reject(endpoint_class, 'rate_limited', wait, user)
+
+        limiter = self.limiters[endpoint_class]
+        started = time.monotonic()
+        ADMISSION_QUEUED.inc(endpoint_class)
+        try:
+            slot, reason = limiter.acquire(current_deadline().remaining())
+        finally:
+            ADMISSION_QUEUED.dec(endpoint_class)
+        ADMISSION_WAIT.observe(endpoint_class, value=time.monotonic() - started)
+        if reason:
+            return None, self._reject(endpoint_class, reason, limiter.retry_after(), user)
+        ADMISSION_IN_FLIGHT.inc(endpoint_class)
+        return slot, None
+
+    def leave(self, endpoint_class, slot, held):
+        ADMISSION_IN_FLIGHT.dec(endpoint_class)
+        self.limiters[endpoint_class].release(slot, held)
+
+    def _reject(self, endpoint_class, reason, retry_after, user):
+        ADMISSION_REJECTED.inc(endpoint_class, reason)
+        rejection = Rejection(endpoint_class, reason, retry_after)
+        logging.warning("🚦 İstek reddedildi: %s (%s) - kullanıcı: %s, Retry-After: %ds",
+                        endpoint_class, reason, user, rejection.retry_after)
+        return rejection
+
+    def stats(self):
+        return {name: {
+            'active': limiter.active,
+            'waiting': limiter.waiting,
+            'limit': limiter.limit,
+            'queue_size': limiter.queue_size
+        } for name, limiter in self.limiters.items()}
+
+
+controller = AdmissionController(Config.ADMISSION_CONFIG)
+
+
+def admit(endpoint_class):
+    """View veya Flask yanıtı döndüren yardımcı fonksiyon için kabul kontrolü
+
+    Reddedilirse fonksiyon çalıştırılmaz; 429 (kullanıcı hız sınırı) veya
+    503 (eşzamanlılık sınırı) ve Retry-After başlığı döner.
+    """
+    if endpoint_class not in Config.ADMISSION_CONFIG['classes']:
+        raise ValueError(f"Bilinmeyen admission sınıfı: {endpoint_class}")
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not controller.enabled:
+                return f(*args, **kwargs)
+            user = session.get('user_id') or request.remote_addr
+            slot, rejection = controller.enter(endpoint_class, user)
+            if rejection is not None:
+                return rejection.response()
+            started = time.monotonic()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                controller.leave(endpoint_class, slot, time.monotonic() - started)
+        return decorated_function
+    return decorator
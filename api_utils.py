@@ -1,51 +1,96 @@
 import requests
 import logging
+from requests.adapters import HTTPAdapter
+import time
 from config import Config, CategoryConfig
+from deadline import current_deadline, DeadlineExceeded
+from metrics import observe_upstream
 
 class APIManager:
     """API yönetim sınıfı"""
     
     def __init__(self):
         self.config = Config.API_CONFIG
+        self._session = None
     
-    def make_request(self, endpoint, method='GET', params=None, data=None, retries=0):
-        """Güvenli API request helper"""
+    @property
+    def session(self):
+        """Connection pool'lu paylaşılan HTTP oturumu (ilk kullanımda açılır)"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.config['pool_size'],
+                pool_maxsize=self.config['pool_size']
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+    
+    def reset_session(self):
+        """Oturumu kapat; fork sonrası worker'lar kendi bağlantılarını açar"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def make_request(self, endpoint, method='GET', params=None, data=None, retries=0, deadline=None):
+        """Güvenli API request helper
+        
+        Tüm denemeler isteğin zaman bütçesini (deadline) paylaşır: her deneme
+        kalan bütçeyi timeout olarak kullanır, bütçe bitince yeniden denenmez.
+        """
+        deadline = deadline or current_deadline()
+        url = f"{self.config['base_url']}{endpoint}"
         try:
-            url = f"{self.config['base_url']}{endpoint}"
+            timeout = deadline.timeout(self.config['timeout'])
             headers = {
                 'X-API-Key': self.config['api_key'],
                 'Content-Type': 'application/json',
-                'User-Agent': 'Lapsus-Dashboard/1.0'
+                'User-Agent': 'Lapsus-Dashboard/1.0',
+                'X-Request-Deadline': f"{deadline.remaining():.3f}"
             }
             
-            logging.info(f"🔄 API çağrısı: {url}")
+            logging.info("🔄 API çağrısı: %s (timeout: %.1fs)", url, timeout)
             
-            if method == 'GET':
-                response = requests.get(
-                    url, 
-                    headers=headers, 
-                    params=params, 
-                    timeout=self.config['timeout']
-                )
-            elif method == 'POST':
-                response = requests.post(
-                    url, 
-                    headers=headers, 
-                    json=data, 
-                    timeout=self.config['timeout']
-                )
-            else:
-                raise ValueError(f"Desteklenmeyen HTTP metodu: {method}")
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                if method == 'GET':
+                    response = self.session.get(
+                        url, 
+                        headers=headers, 
+                        params=params, 
+                        timeout=timeout
+                    )
+                elif method == 'POST':
+                    response = self.session.post(
+                        url, 
+                        headers=headers, 
+                        json=data, 
+                        timeout=timeout
+                    )
+                else:
+                    raise ValueError(f"Desteklenmeyen HTTP metodu: {method}")
+                outcome = response.status_code
+            except requests.exceptions.Timeout:
+                outcome = 'timeout'
+                raise
+            finally:
+                observe_upstream('api', endpoint, time.perf_counter() - started, outcome)
             
             response.raise_for_status()
-            logging.info(f"✅ API başarılı: {endpoint} - Status: {response.status_code}")
+            logging.info("✅ API başarılı: %s - Status: %s", endpoint, response.status_code)
             return response.json()
             
+        except DeadlineExceeded as e:
+            logging.error(f"⏰ API zaman bütçesi tükendi: {endpoint} - {e}")
+            raise Exception("API zaman aşımı - istek zaman bütçesi tükendi")
+            
         except requests.exceptions.Timeout:
             logging.error(f"⏰ API timeout: {endpoint}")
-            if retries < self.config['max_retries']:
-                logging.info(f"🔄 Yeniden deneniyor ({retries + 1}/{self.config['max_retries']})")
-                return self.make_request(endpoint, method, params, data, retries + 1)
+            if retries < self.config['max_retries'] and not deadline.expired():
+                logging.info("🔄 Yeniden deneniyor (%d/%d)", retries + 1, self.config['max_retries'])
+                return self.make_request(endpoint, method, params, data, retries + 1, deadline)
             raise Exception("API zaman aşımı - sunucu yanıt vermiyor")
             
         except requests.exceptions.ConnectionError:
@@ -71,9 +116,9 @@ class APIManager:
                 
         except Exception as e:
             logging.error(f"💥 API genel hatası: {str(e)}")
-            if retries < self.config['max_retries']:
-                logging.info(f"🔄 Yeniden deneniyor ({retries + 1}/{self.config['max_retries']})")
-                return self.make_request(endpoint, method, params, data, retries + 1)
+            if retries < self.config['max_retries'] and not deadline.expired():
+                logging.info("🔄 Yeniden deneniyor (%d/%d)", retries + 1, self.config['max_retries'])
+                return self.make_request(endpoint, method, params, data, retries + 1, deadline)
             raise
     
     def search_accounts(self, query, page=1, limit=20, domain='', region='', source=''):
@@ -92,7 +137,8 @@ class APIManager:
         if source:
             api_params['source'] = source
         
-        logging.info(f"🔍 API arama: {query} - Parametreler: {api_params}")
+        logging.info("🔍 API arama: %s", query)
+        logging.debug("API arama parametreleri: %s", api_params)
         return self.make_request('/api/search', params=api_params)
     
     def get_accounts(self, page=1, limit=10, domain='', region='', source=''):
@@ -1,18 +1,20 @@
 import sys
 import os
-from flask import Flask, render_template, redirect, url_for, session, flash, request, jsonify
+from flask import Flask, render_template, redirect, url_for, session, flash, request, jsonify, g
 import logging
+import logging_setup
 from datetime import timedelta
-from routes.api2_search import search_domain_with_retry
+from routes.api2_search import run_domain_search, parse_sharded, reset_session as reset_api2_session
+from deadline import new_deadline, current_deadline
 
 # Python path'e mevcut dizini ekle
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-app = Flask(__name__)
 # Konfigürasyon ve modül importları
 try:
     from config import Config
     from database import db
+    from api_utils import api
     
     # Route blueprint'leri
     from routes.auth import auth_bp
@@ -20,6 +22,8 @@ try:
     from routes.api import api_bp
     from routes.debug import debug_bp
     from routes.admin import admin_bp
+    from routes.metrics import metrics_bp
+    from metrics import register_metrics, reinit_after_fork as reinit_metrics_after_fork
 except ImportError as e:
     print(f"Import hatası: {e}")
     print("Lütfen tüm dosyaların doğru konumda olduğundan emin olun.")
@@ -36,6 +40,14 @@ def create_app():
     # Loglama ayarları
     configure_logging()
     
+    # İstek metrikleri (diğer hook'lardan önce, tüm süreyi ölçmek için)
+    if Config.METRICS_CONFIG['enabled']:
+        register_metrics(
+            app,
+            Config.METRICS_CONFIG['multiprocess_dir'],
+            Config.METRICS_CONFIG['flush_interval']
+        )
+    
     # Blueprint'leri kaydet
     register_blueprints(app)
     
@@ -45,18 +57,14 @@ def create_app():
     # Context processor'ları kaydet
     register_context_processors(app)
     
+    # İstek zaman bütçesi hook'larını kaydet
+    register_request_hooks(app)
+    
     return app
 
 def configure_logging():
-    """Loglama konfigürasyonu"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('lapsus.log'),
-            logging.StreamHandler()
-        ]
-    )
+    """Loglama konfigürasyonu (kuyruk tabanlı, bkz. logging_setup)"""
+    logging_setup.configure(**Config.LOGGING_CONFIG)
 
 def register_blueprints(app):
     """Blueprint'leri kaydet"""
@@ -65,6 +73,8 @@ def register_blueprints(app):
     app.register_blueprint(api_bp)
     app.register_blueprint(debug_bp)
     app.register_blueprint(admin_bp)
+    if Config.METRICS_CONFIG['enabled']:
+        app.register_blueprint(metrics_bp)
 
 def register_error_handlers(app):
     """Error handler'ları kaydet"""
@@ -97,6 +107,34 @@ def register_context_processors(app):
             is_logged_in='user_id' in session
         )
 
+def register_request_hooks(app):
+    """İstek başına zaman bütçesi (deadline) hook'larını kaydet"""
+    
+    @app.before_request
+    def start_request_deadline():
+        """Config veya X-Request-Deadline başlığından istek bütçesi oluştur"""
+        g.log_token = logging_setup.set_request_id(request.headers.get('X-Request-ID', '')[:64])
+        g.deadline = new_deadline(request.headers.get('X-Request-Deadline'))
+    
+    @app.after_request
+    def report_request_deadline(response):
+        """Harcanan ve kalan bütçeyi yanıt başlıklarına ekle"""
+        deadline = getattr(g, 'deadline', None)
+        if deadline is not None:
+            timing = deadline.report()
+            response.headers['X-Request-Budget'] = f"{timing['budget']:.3f}"
+            response.headers['X-Request-Elapsed'] = f"{timing['elapsed']:.3f}"
+            response.headers['X-Request-Budget-Remaining'] = f"{timing['remaining']:.3f}"
+        response.headers['X-Request-ID'] = logging_setup.get_request_id() or ''
+        return response
+    
+    @app.teardown_request
+    def reset_request_id(exc):
+        """İstek kimliğini bağlamdan kaldır"""
+        token = g.pop('log_token', None)
+        if token is not None:
+            logging_setup.reset_request_id(token)
+
 # Flask uygulamasını oluştur
 app = create_app()
 
@@ -110,12 +148,16 @@ def search_domain_route():
             domain = request.args.get('domain')
             start_date = request.args.get('start_date')
             end_date = request.args.get('end_date')
+            sharded = parse_sharded(request.args.get('sharded'))
+            granularity = request.args.get('granularity', 'auto')
         else:
             # POST için JSON body'den al
             data = request.get_json() or {}
             domain = data.get('domain')
             start_date = data.get('start_date')
             end_date = data.get('end_date')
+            sharded = parse_sharded(data.get('sharded'))
+            granularity = data.get('granularity', 'auto')
         
         # Domain zorunlu parametre kontrolü
         if not domain:
@@ -127,7 +169,11 @@ def search_domain_route():
         
         # API2 search fonksiyonunu çağır
         logging.info(f"Global API2 search: {domain}")
-        result = search_domain_with_retry(domain, start_date, end_date)
+        result, sharding = run_domain_search(
+            domain, start_date, end_date,
+            sharded=sharded,
+            granularity=granularity
+        )
         
         # Hata kontrolü
         if "error" in result:
@@ -135,17 +181,27 @@ def search_domain_route():
             return jsonify({
                 "success": False,
                 "error": result["error"],
-                "domain": domain
+                "domain": domain,
+                "timing": current_deadline().report()
             }), 500
         
         # Başarılı sonuç
-        return jsonify({
+        response_data = {
             "success": True,
             "data": result,
             "domain": domain,
-            "endpoint": "global"
-        })
+            "endpoint": "global",
+            "timing": current_deadline().report()
+        }
+        if sharding:
+            response_data["sharding"] = sharding
+        return jsonify(response_data)
         
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": f"Geçersiz tarih aralığı: {str(e)}"
+        }), 400
     except Exception as e:
         logging.error(f"Search domain error: {e}")
         return jsonify({
@@ -153,6 +209,19 @@ def search_domain_route():
             "error": f"Arama sırasında hata: {str(e)}"
         }), 500
 
+def reinit_after_fork():
+    """Fork sonrası worker başına yeniden başlatılması gereken kaynaklar
+    
+    Gunicorn preload modunda uygulama master süreçte bir kez yüklenir;
+    master'da açılmış HTTP connection pool'ları, sorgu profili
+    istatistikleri ve metrik değerleri worker'lara kopyalanmamalı.
+    """
+    api.reset_session()
+    reset_api2_session()
+    if db.profiler is not None:
+        db.profiler.reset()
+    reinit_metrics_after_fork()
+
 def startup_checks():
     """Başlangıç kontrolleri"""
     logging.info("🚀 Lapsus uygulaması başlatılıyor...")
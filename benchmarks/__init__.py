@@ -0,0 +1,20 @@
+"""Sentetik veri ile tekrarlanabilir veritabanı benchmark'ları
+
+Kullanım (repo kökünden):
+
+    # Yerel MySQL/MariaDB'ye 1M satırlık veri yükle
+    BENCH_DB_NAME=lapsus_bench python -m benchmarks load --rows 1000000
+
+    # Tüm DatabaseManager metotlarını ve bot sorgularını ölç
+    python -m benchmarks run --output bench_results.json
+
+    # Baseline kaydet / sonraki çalıştırmayı baseline ile karşılaştır
+    python -m benchmarks run --save-baseline benchmarks/baseline.json
+    python -m benchmarks run --baseline benchmarks/baseline.json
+
+    # Bot komut handler'ları: havuzlu/havuzsuz, önbellekli/önbelleksiz
+    python -m benchmarks bot --profiles default unpooled uncached --users 20 --duration 30
+
+Bağlantı ayarları BENCH_DB_* ortam değişkenlerinden okunur; üretim
+veritabanına (Config.DB_CONFIG) yükleme yapılmasına izin verilmez.
+"""
@@ -0,0 +1,196 @@
+import argparse
+import logging
+import os
+import sys
+from datetime import date
+
+import mysql.connector
+
+from config import Config
+from benchmarks import cases, runner, synthetic
+
+
+def bench_db_config():
+    """Benchmark veritabanı ayarları (BENCH_DB_*, yoksa DB_* kullanıcı bilgileri)"""
+    return dict(
+        Config.DB_CONFIG,
+        host=os.getenv('BENCH_DB_HOST', '127.0.0.1'),
+        port=int(os.getenv('BENCH_DB_PORT', 3306)),
+        database=os.getenv('BENCH_DB_NAME', 'lapsus_bench'),
+        user=os.getenv('BENCH_DB_USER', Config.DB_CONFIG['user']),
+        password=os.getenv('BENCH_DB_PASSWORD', Config.DB_CONFIG['password'])
+    )
+
+
+def is_production(config):
+    production = Config.DB_CONFIG
+    return (config['host'], config['port'], config['database']) == (
+        production['host'], production['port'], production['database'])
+
+
+def connect(config, **overrides):
+    return mysql.connector.connect(**dict(config, **overrides))
+
+
+def cmd_load(args, config):
+    if is_production(config):
+        logging.error("❌ Benchmark verisi üretim veritabanına yüklenemez (BENCH_DB_NAME/BENCH_DB_HOST ayarlayın)")
+        return 2
+
+    server = connect(config, database=None, raise_on_warnings=False)
+    server.cursor().execute(f"CREATE DATABASE IF NOT EXISTS `{config['database']}` CHARACTER SET utf8mb4")
+    server.close()
+
+    anchor = date.fromisoformat(args.anchor) if args.anchor else None
+    data = synthetic.SyntheticData(args.rows, seed=args.seed, anchor=anchor, domain_skew=args.skew)
+    connection = connect(config, raise_on_warnings=False, autocommit=False)
+    try:
+        stats = synthetic.load(connection, data, args.tables, args.batch_size)
+    finally:
+        connection.close()
+
+    for table, table_stats in stats.items():
+        print(f"{table:<18} {table_stats['rows']:>12,} satır  {table_stats['seconds']:>8.1f}s  "
+              f"{table_stats['rows_per_sec']:>10,.0f} satır/sn")
+    if args.output:
+        runner.save({'load': stats, 'rows': args.rows, 'seed': args.seed}, args.output)
+    return 0
+
+
+def cmd_run(args, config):
+    monitor = connect(config, raise_on_warnings=False)
+    meta = synthetic.read_meta(monitor)
+    if meta is None:
+        logging.error("❌ Benchmark verisi bulunamadı, önce 'python -m benchmarks load' çalıştırın")
+        monitor.close()
+        return 2
+    data = synthetic.SyntheticData(meta['rows'], seed=meta['seed'], anchor=meta['anchor'])
+
+    from database import DatabaseManager
+    db = DatabaseManager()
+    db.config = config
+
+    selected = []
+    if args.group in ('all', 'database'):
+        selected.extend(cases.database_cases(db, data))
+    if args.group in ('all', 'bot'):
+        selected.extend(cases.bot_cases(lambda: connect(config), data))
+    if args.filter:
+        selected = [case for case in selected if args.filter in case.name]
+
+    try:
+        results = runner.run_all(selected, args.iterations, args.warmup, monitor, meta={
+            'rows': meta['rows'], 'seed': meta['seed'], 'anchor': meta['anchor'].isoformat(),
+            'server_version': monitor.get_server_info()
+        })
+    finally:
+        monitor.close()
+
+    if args.output:
+        runner.save(results, args.output)
+        print(f"📄 Sonuçlar: {args.output}")
+    if args.save_baseline:
+        runner.save(results, args.save_baseline)
+        print(f"📌 Baseline kaydedildi: {args.save_baseline}")
+    if args.baseline:
+        return report(results, runner.load_results(args.baseline), args)
+    return 0
+
+
+def cmd_bot(args, config):
+    from benchmarks import bot_harness
+
+    monitor = connect(config, raise_on_warnings=False)
+    meta = synthetic.read_meta(monitor)
+    monitor.close()
+    if meta is None:
+        logging.error("❌ Benchmark verisi bulunamadı, önce 'python -m benchmarks load' çalıştırın")
+        return 2
+    data = synthetic.SyntheticData(meta['rows'], seed=meta['seed'], anchor=meta['anchor'])
+    overrides = dict(item.partition('=')[::2] for item in args.set)
+
+    results = bot_harness.run_profiles(
+        args.profiles, config, data, overrides,
+        users=args.users, duration=args.duration, iterations=args.iterations,
+        send_latency=args.send_latency, commands=args.commands, seed=args.seed
+    )
+    print(bot_harness.format_profiles(results))
+    if args.output:
+        runner.save({'meta': {'rows': meta['rows'], 'anchor': meta['anchor'].isoformat()},
+                     'profiles': results}, args.output)
+        print(f"📄 Sonuçlar: {args.output}")
+    return 0
+
+
+def cmd_compare(args, config):
+    return report(runner.load_results(args.current), runner.load_results(args.baseline), args)
+
+
+def report(current, baseline, args):
+    if current['meta'].get('rows') != baseline['meta'].get('rows'):
+        logging.warning("⚠️ Baseline farklı veri ölçeğiyle alınmış, karşılaştırma anlamlı olmayabilir")
+    rows, regressions = runner.compare(current, baseline, args.tolerance, args.min_delta_ms)
+    print(runner.format_comparison(rows))
+    print(f"\n{'🔴' if regressions else '✅'} {regressions} gerileme (tolerans %{args.tolerance * 100:.0f})")
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Lapsus veritabanı benchmark aracı')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    load = commands.add_parser('load', help='Sentetik veriyi yükle')
+    load.add_argument('--rows', type=int, default=1_000_000, help='Hesap tablosu başına satır (leak_logs %%5)')
+    load.add_argument('--seed', type=int, default=42)
+    load.add_argument('--skew', type=float, default=1.1, help='Domain dağılımının Zipf üssü')
+    load.add_argument('--anchor', help='Verinin biteceği gün (YYYY-MM-DD, varsayılan bugün)')
+    load.add_argument('--tables', nargs='+', choices=list(synthetic.SCHEMAS))
+    load.add_argument('--batch-size', type=int, default=5000)
+    load.add_argument('--output', help='Yükleme istatistiklerini JSON olarak kaydet')
+
+    def add_compare_options(command):
+        command.add_argument('--tolerance', type=float, default=0.2, help='İzin verilen kötüleşme oranı')
+        command.add_argument('--min-delta-ms', type=float, default=2.0, help='Gecikmede en küçük anlamlı fark')
+
+    run = commands.add_parser('run', help='Benchmark senaryolarını çalıştır')
+    run.add_argument('--group', choices=('all', 'database', 'bot'), default='all')
+    run.add_argument('--filter', help='Yalnızca adında bu metin geçen senaryolar')
+    run.add_argument('--iterations', type=int, default=5)
+    run.add_argument('--warmup', type=int, default=1)
+    run.add_argument('--output', default='bench_results.json')
+    run.add_argument('--baseline', help='Karşılaştırılacak baseline JSON')
+    run.add_argument('--save-baseline', help='Sonuçları baseline olarak da kaydet')
+    add_compare_options(run)
+
+    bot = commands.add_parser('bot', help='Bot komut handler\'larını sahte Telegram ile ölç')
+    bot.add_argument('--profiles', nargs='+', default=['default'],
+                     choices=('default', 'unpooled', 'uncached', 'bare'),
+                     help='Karşılaştırılacak yapılandırmalar (havuz / önbellek açık-kapalı)')
+    bot.add_argument('--set', action='append', default=[], metavar='ALAN=DEĞER',
+                     help='BotConfig alanı üzerine yaz (örn. db_pool_max_size=4)')
+    bot.add_argument('--users', type=int, default=10, help='Eşzamanlı sanal kullanıcı')
+    bot.add_argument('--duration', type=float, default=30.0, help='Profil başına süre (sn)')
+    bot.add_argument('--iterations', type=int, help='Süre yerine kullanıcı başına komut sayısı')
+    bot.add_argument('--send-latency', type=float, default=0.0, help='Sahte Telegram gönderim gecikmesi (sn)')
+    bot.add_argument('--commands', nargs='+', help='Yalnızca bu komutlar (örn. istatistik bolgeler)')
+    bot.add_argument('--seed', type=int, default=1)
+    bot.add_argument('--output', help='Sonuçları JSON olarak kaydet')
+
+    compare = commands.add_parser('compare', help='İki sonuç dosyasını karşılaştır')
+    compare.add_argument('current')
+    compare.add_argument('baseline')
+    add_compare_options(compare)
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    # DatabaseManager her bağlantıda INFO logu yazar; ölçüm çıktısını boğmasın
+    logging.getLogger().addFilter(lambda record: 'başarıyla bağlanıldı' not in record.getMessage())
+    args = build_parser().parse_args(argv)
+    handlers = {'load': cmd_load, 'run': cmd_run, 'bot': cmd_bot, 'compare': cmd_compare}
+    return handlers[args.command](args, bench_db_config())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
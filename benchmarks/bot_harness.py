@@ -0,0 +1,310 @@
+import asyncio
+import dataclasses
+import itertools
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+
+# cases modülü telegram-api dizinini sys.path'e ekler
+from benchmarks import cases  # noqa: F401
+
+import api as bot_api  # noqa: E402
+import command_metrics  # noqa: E402
+
+# Karşılaştırılabilir hazır yapılandırmalar (BotConfig alanlarının üzerine yazılır)
+PROFILES = {
+    'default': {},
+    'unpooled': {'db_pool_enabled': False},
+    'uncached': {'analytics_cache_enabled': False, 'result_cache_enabled': False, 'aggregates_enabled': False},
+    'bare': {'db_pool_enabled': False, 'analytics_cache_enabled': False,
+             'result_cache_enabled': False, 'aggregates_enabled': False}
+}
+PROFILE_FIELDS = ('db_pool_enabled', 'db_pool_max_size', 'analytics_cache_enabled',
+                  'result_cache_enabled', 'aggregates_enabled')
+
+# Komut karışımı: (komut, handler metodu, ağırlık, argüman üreten fonksiyon)
+COMMANDS = [
+    ('istatistik', 'cmd_statistics', 4, None),
+    ('bolgeler', 'cmd_regions', 2, None),
+    ('enpopulerdomain', 'cmd_popular_domains', 2, None),
+    ('kaynaklar', 'cmd_sources', 2, None),
+    ('son7gun', 'cmd_last_7_days', 2, None),
+    ('ara', 'cmd_search_keyword', 2, lambda data, rng: [data.domain(rng.randint(0, 9)).split('.')[0]]),
+    ('tarihsorgu', 'cmd_date_query', 2,
+     lambda data, rng: [(data.anchor - timedelta(days=rng.randint(0, 6))).isoformat()]),
+    ('domainkontrol', 'cmd_domain_control', 2, lambda data, rng: [data.domain(rng.randint(0, 50))]),
+    ('spidsorgu', 'cmd_search_spid', 1, lambda data, rng: [str(rng.randint(1, data.table_rows('accs')))]),
+    ('gunlukrapor', 'cmd_daily_report', 1, None)
+]
+
+
+# =====================================
+# SAHTE TELEGRAM NESNELERİ
+# =====================================
+
+class FakeTransport:
+    """Giden mesajları kaydeden sahte Telegram taşıması
+
+    ``send_latency`` ile her gönderime Telegram API gecikmesi eklenebilir;
+    süre komut metriklerinde 'send' fazına yazılır.
+    """
+
+    def __init__(self, send_latency=0.0):
+        self.send_latency = send_latency
+        self.sent = Counter()
+        self.edits = 0
+        self.deletes = 0
+        self.error_replies = 0
+        self.bytes = 0
+        self._ids = itertools.count(1)
+
+    async def send(self, chat_id, text):
+        with command_metrics.track('send'):
+            if self.send_latency:
+                await asyncio.sleep(self.send_latency)
+        self.sent[chat_id] += 1
+        self.bytes += len(text.encode())
+        if text.lstrip().startswith('❌'):
+            self.error_replies += 1
+        return FakeMessage(self, chat_id, next(self._ids), text)
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.username = f"bench{user_id}"
+        self.first_name = 'Bench'
+
+
+class FakeChat:
+    def __init__(self, chat_id):
+        self.id = chat_id
+        self.type = 'private'
+
+
+class FakeMessage:
+    def __init__(self, transport, chat_id, message_id, text=''):
+        self.transport = transport
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = text
+
+    async def reply_text(self, text, parse_mode=None, reply_markup=None, **kwargs):
+        return await self.transport.send(self.chat_id, text)
+
+    async def edit_text(self, text, parse_mode=None, reply_markup=None, **kwargs):
+        self.transport.edits += 1
+        self.text = text
+        return self
+
+    async def delete(self):
+        self.transport.deletes += 1
+        return True
+
+
+class FakeUpdate:
+    """Komut handler'larının kullandığı Update alanları"""
+
+    def __init__(self, transport, user_id, text):
+        self.effective_user = FakeUser(user_id)
+        self.effective_chat = FakeChat(user_id)
+        self.message = FakeMessage(transport, user_id, 0, text)
+        self.callback_query = None
+
+
+class FakeContext:
+    def __init__(self, args):
+        self.args = args
+        self.bot = None
+
+
+# =====================================
+# BAĞLANTI SAYACI
+# =====================================
+
+class ConnectionCounter:
+    """DatabaseManager'ın açtığı fiziksel bağlantıları say (toplam ve eşzamanlı tepe)"""
+
+    def __init__(self, db_manager):
+        self.created = 0
+        self.open = 0
+        self.peak_open = 0
+        self._factory = db_manager._create_connection
+        db_manager._create_connection = self._create
+        if db_manager.pool:
+            db_manager.pool._factory = self._create
+
+    def _create(self):
+        connection = self._factory()
+        self.created += 1
+        self.open += 1
+        self.peak_open = max(self.peak_open, self.open)
+        return _CountedConnection(connection, self)
+
+    def closed(self):
+        self.open -= 1
+
+
+class _CountedConnection:
+    def __init__(self, connection, counter):
+        self._connection = connection
+        self._counter = counter
+        self._closed = False
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._counter.closed()
+        return self._connection.close()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+# =====================================
+# ÇALIŞTIRMA
+# =====================================
+
+def build_config(db_config, overrides, workdir):
+    """Benchmark veritabanına bağlı BotConfig; önbellek/durum dosyaları geçici dizinde"""
+    config = bot_api.Config.load_from_env()
+    fields = {field.name for field in dataclasses.fields(config)}
+    values = {
+        'db_host': db_config['host'],
+        'db_port': int(db_config['port']),
+        'db_user': db_config['user'],
+        'db_password': db_config['password'],
+        'db_name': db_config['database'],
+        'db_perf_enabled': False,
+        'result_cache_path': os.path.join(workdir, 'bot_results.sqlite3'),
+        'report_state_path': os.path.join(workdir, 'report_scheduler.json')
+    }
+    for name, value in overrides.items():
+        if name not in fields:
+            raise ValueError(f"Bilinmeyen BotConfig alanı: {name}")
+        kind = type(getattr(config, name))
+        if kind is bool and isinstance(value, str):
+            value = value.lower() in ('1', 'true', 'yes')
+        values[name] = kind(value)
+    return dataclasses.replace(config, **values)
+
+
+async def run_profile(name, config, data, users=10, duration=30.0, iterations=None,
+                      send_latency=0.0, commands=None, seed=1):
+    """Tek bir yapılandırma ile eşzamanlı komut yükü üret ve ölç"""
+    handler = bot_api.LapsusBotHandler(config)
+    transport = FakeTransport(send_latency)
+    metrics = command_metrics.CommandMetrics()
+    counter = ConnectionCounter(handler.db_manager)
+    selected = [command for command in COMMANDS if not commands or command[0] in commands]
+    wrapped = {command: metrics.instrument(command, getattr(handler, method))
+               for command, method, _, _ in selected}
+
+    if not await handler.db_manager.test_connection():
+        raise RuntimeError("Benchmark veritabanına bağlanılamadı")
+    aggregate_task = None
+    if handler.aggregates:
+        # Bot başlangıcındaki gibi: kurulamazsa komutlar ham sorgulara düşer
+        try:
+            await handler.aggregates.ensure_schema()
+            await handler.aggregates.refresh()
+            aggregate_task = asyncio.create_task(handler.aggregates.run())
+        except Exception as e:
+            logging.warning(f"⚠️ Günlük özetler devre dışı: {e}")
+            handler.aggregates = None
+
+    for user_index in range(users):
+        handler.auth_manager.authorize_user(1000 + user_index, f"bench{user_index}")
+
+    completed = 0
+    stop_at = time.monotonic() + duration
+
+    async def virtual_user(user_index):
+        nonlocal completed
+        rng = random.Random(f"{seed}:{user_index}")
+        runs = 0
+        while (iterations is None and time.monotonic() < stop_at) or (iterations is not None and runs < iterations):
+            command, _, _, build_args = rng.choices(selected, [item[2] for item in selected])[0]
+            args = build_args(data, rng) if build_args else []
+            update = FakeUpdate(transport, 1000 + user_index, f"/{command} {' '.join(args)}".strip())
+            try:
+                await wrapped[command](update, FakeContext(args))
+            except Exception as e:
+                logging.error(f"❌ {command} hata: {e}")
+            runs += 1
+            completed += 1
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(virtual_user(index) for index in range(users)))
+    finally:
+        elapsed = time.perf_counter() - started
+        if aggregate_task:
+            aggregate_task.cancel()
+        pool_stats = handler.db_manager.pool_stats()
+        handler.db_manager.close()
+
+    summary = metrics.summary(window=int(elapsed) + 3600)
+    return {
+        'profile': name,
+        'users': users,
+        'elapsed_seconds': round(elapsed, 2),
+        'commands': completed,
+        'commands_per_sec': round(completed / elapsed, 2) if elapsed else 0.0,
+        'per_command': {row['command']: {
+            'count': row['count'],
+            'errors': row['errors'],
+            'p50_ms': round(row['p50'] * 1000, 1),
+            'p95_ms': round(row['p95'] * 1000, 1),
+            'p99_ms': round(row['p99'] * 1000, 1),
+            'db_p95_ms': round(row['db_p95'] * 1000, 1),
+            'format_p95_ms': None if row['format_p95'] is None else round(row['format_p95'] * 1000, 1),
+            'send_p95_ms': round(row['send_p95'] * 1000, 1)
+        } for row in summary},
+        'connections': {
+            'created': counter.created,
+            'peak_open': counter.peak_open,
+            'pool': pool_stats
+        },
+        'messages': {
+            'sent': sum(transport.sent.values()),
+            'edits': transport.edits,
+            'deletes': transport.deletes,
+            'error_replies': transport.error_replies,
+            'bytes': transport.bytes
+        },
+        'config': {field: getattr(config, field) for field in PROFILE_FIELDS}
+    }
+
+
+def run_profiles(profiles, db_config, data, overrides=None, **options):
+    """Profilleri sırayla çalıştır (her biri temiz bir handler ile)"""
+    results = {}
+    for name in profiles:
+        with tempfile.TemporaryDirectory(prefix='bot-bench-') as workdir:
+            config = build_config(db_config, dict(PROFILES[name], **(overrides or {})), workdir)
+            logging.info(f"🤖 Profil: {name}")
+            results[name] = asyncio.run(run_profile(name, config, data, **options))
+    return results
+
+
+def format_profiles(results):
+    """Profil karşılaştırma tablosu"""
+    lines = [f"{'profil':<10} {'komut/sn':>9} {'komut':>7} {'bağlantı':>9} {'tepe':>5}  en yavaş (p95)"]
+    for name, result in results.items():
+        slowest = next(iter(result['per_command'].items()), (None, None))
+        slowest_text = f"{slowest[0]} {slowest[1]['p95_ms']:.0f}ms" if slowest[0] else '-'
+        lines.append(
+            f"{name:<10} {result['commands_per_sec']:>9.2f} {result['commands']:>7} "
+            f"{result['connections']['created']:>9} {result['connections']['peak_open']:>5}  {slowest_text}"
+        )
+        for command, stats in result['per_command'].items():
+            lines.append(
+                f"    {command:<16} n={stats['count']:<5} p50 {stats['p50_ms']:>8.1f}  p95 {stats['p95_ms']:>8.1f}  "
+                f"db p95 {stats['db_p95_ms']:>8.1f}  hata {stats['errors']}"
+            )
+    return '\n'.join(lines)
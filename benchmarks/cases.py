@@ -0,0 +1,179 @@
+import os
+import sys
+
+# Bot'un tarih pencereleri (telegram-api/query_builder.py) ile aynı sorgular kurulur
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'telegram-api'))
+
+import query_builder  # noqa: E402
+
+
+class Case:
+    """Tek bir benchmark senaryosu
+
+    run() her çağrıda döndürülen satır sayısını verir.
+    """
+
+    def __init__(self, name, group, run):
+        self.name = name
+        self.group = group
+        self.run = run
+
+
+def _result_rows(result):
+    """DatabaseManager dönüş değerlerinden satır sayısı"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        if 'results' in result:
+            return len(result['results'])
+        return sum(len(value) for value in result.values() if isinstance(value, list)) or 1
+    return 1 if result else 0
+
+
+def database_cases(db, data):
+    """database.DatabaseManager metotları (web paneli)"""
+    popular = data.domain(0)
+    rare = data.domain(len(data.domains) - 1)
+
+    def method(name, *args, **kwargs):
+        def run():
+            return _result_rows(getattr(db, name)(*args, **kwargs))
+        return run
+
+    specs = [
+        ('test_connection', method('test_connection')),
+        ('get_categories_stats', method('get_categories_stats')),
+        ('get_total_stats', method('get_total_stats')),
+        ('get_table_structure', method('get_table_structure')),
+        ('get_leak_logs', method('get_leak_logs', page=1)),
+        ('get_leak_logs_deep_page', method('get_leak_logs', page=500)),
+        ('get_leak_logs_type_filter', method('get_leak_logs', page=1, type_filter='combo')),
+        ('get_leak_logs_stats', method('get_leak_logs_stats')),
+        ('search_leak_logs', method('search_leak_logs', popular.split('.')[0])),
+        ('search_accounts_popular', method('search_accounts', popular)),
+        ('search_accounts_rare', method('search_accounts', rare)),
+        ('search_accounts_filtered', method('search_accounts', popular, region_filter='TR', source_filter='TXT')),
+        ('search_accounts_deep_page', method('search_accounts', popular, page=200))
+    ]
+    return [Case(f"db.{name}", 'database', run) for name, run in specs]
+
+
+def bot_cases(connect, data):
+    """Bot komutlarının sıcak sorguları (accs tablosu)
+
+    Pencereler, verinin üretildiği güne (anchor) göre kurulur; böylece
+    bugün/dün sorguları her çalıştırmada aynı veri hacmine denk gelir.
+    """
+    today = query_builder.today_window(data.anchor)
+    yesterday = query_builder.yesterday_window(data.anchor)
+    week = query_builder.week_window(data.anchor)
+    month = query_builder.month_window(data.anchor)
+    popular = data.domain(0)
+
+    queries = {
+        'statistics': [
+            ("""
+                SELECT COUNT(*) AS total, COUNT(DISTINCT region) AS region_count,
+                       COUNT(DISTINCT domain) AS domain_count
+                FROM accs
+            """, ()),
+            (f"""
+                SELECT {today.count_if('today_total')}, {yesterday.count_if('yesterday_total')},
+                       {week.count_if('week_total')}, COUNT(*) AS month_total
+                FROM accs
+                WHERE {month.condition()}
+            """, today.params() + yesterday.params() + week.params() + month.params())
+        ],
+        'regions': [
+            ("""
+                SELECT COALESCE(NULLIF(region, ''), 'Unspecified') as region, COUNT(*) AS count
+                FROM accs GROUP BY region ORDER BY count DESC LIMIT 15
+            """, ()),
+            ("SELECT COUNT(*) AS total FROM accs", ())
+        ],
+        'popular_domains': [
+            ("""
+                SELECT domain, COUNT(*) AS count
+                FROM accs WHERE domain IS NOT NULL AND domain != ''
+                GROUP BY domain ORDER BY count DESC LIMIT 15
+            """, ()),
+            ("SELECT COUNT(*) AS total FROM accs WHERE domain IS NOT NULL AND domain != ''", ())
+        ],
+        'sources': [
+            ("""
+                SELECT COALESCE(NULLIF(source, ''), 'Unspecified') as source, COUNT(*) as count
+                FROM accs GROUP BY source ORDER BY count DESC LIMIT 10
+            """, ()),
+            ("SELECT COUNT(*) AS total FROM accs", ())
+        ],
+        'trend_7d': [
+            (f"""
+                SELECT DATE(date) as day, COUNT(*) as count, DAYNAME(date) as day_name
+                FROM accs WHERE {week.condition()}
+                GROUP BY DATE(date), DAYNAME(date) ORDER BY day DESC
+            """, week.params())
+        ],
+        'keyword_search': [
+            ("""
+                SELECT domain, COUNT(*) as count
+                FROM accs
+                WHERE (LOWER(domain) LIKE %s OR LOWER(email) LIKE %s)
+                AND domain IS NOT NULL AND domain != ''
+                GROUP BY domain ORDER BY count DESC LIMIT 10
+            """, (f"%{popular.split('.')[0]}%",) * 2)
+        ],
+        'date_query': [
+            (f"""
+                SELECT domain, COUNT(*) as count FROM accs
+                WHERE {yesterday.condition()} AND domain IS NOT NULL AND domain != ''
+                GROUP BY domain ORDER BY count DESC LIMIT 5
+            """, yesterday.params()),
+            (f"""
+                SELECT region, COUNT(*) as count FROM accs
+                WHERE {yesterday.condition()} AND region IS NOT NULL AND region != ''
+                GROUP BY region ORDER BY count DESC LIMIT 5
+            """, yesterday.params()),
+            (f"""
+                SELECT HOUR(date) as hour, COUNT(*) as count FROM accs
+                WHERE {yesterday.condition()} GROUP BY HOUR(date) ORDER BY hour
+            """, yesterday.params())
+        ],
+        'domain_detail': [
+            (f"""
+                SELECT COUNT(*) AS count, {week.count_if('recent_count')},
+                       MIN(date) AS first_date, MAX(date) AS last_date
+                FROM accs WHERE LOWER(domain) = %s
+            """, week.params() + (popular,)),
+            ("""
+                SELECT region, COUNT(*) as count FROM accs
+                WHERE LOWER(domain) = %s AND region IS NOT NULL AND region != ''
+                GROUP BY region ORDER BY count DESC LIMIT 5
+            """, (popular,))
+        ],
+        'daily_report_week': [
+            (f"""
+                SELECT DATE(date) as date, COUNT(*) as count FROM accs
+                WHERE {week.condition()} GROUP BY DATE(date) ORDER BY date DESC
+            """, week.params())
+        ],
+        'spid_lookup': [
+            ("SELECT * FROM accs WHERE id = %s", (max(1, data.table_rows('accs') // 2),))
+        ]
+    }
+
+    def runner(statements):
+        def run():
+            connection = connect()
+            try:
+                cursor = connection.cursor(dictionary=True)
+                rows = 0
+                for sql, params in statements:
+                    cursor.execute(sql, params)
+                    rows += len(cursor.fetchall())
+                cursor.close()
+                return rows
+            finally:
+                connection.close()
+        return run
+
+    return [Case(f"bot.{name}", 'bot', runner(statements)) for name, statements in queries.items()]
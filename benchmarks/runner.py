@@ -0,0 +1,174 @@
+import gc
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+
+# Karşılaştırılan ölçümler: (anahtar, büyük değer kötü mü)
+COMPARED = (('p50_ms', True), ('p95_ms', True), ('rows_per_sec', False), ('peak_rss_mb', True))
+
+
+def percentile(values, pct):
+    """Doğrusal enterpolasyonlu yüzdelik"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek RSS değeri (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def handler_reads(connection):
+    """Sunucunun okuduğu toplam satır (Handler_read_* sayaçları); yetki yoksa None"""
+    if connection is None:
+        return None
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SHOW GLOBAL STATUS LIKE 'Handler_read%'")
+        total = sum(int(value) for _, value in cursor.fetchall())
+        cursor.close()
+        return total
+    except Exception:
+        return None
+
+
+def run_case(case, iterations, warmup, monitor=None):
+    """Senaryoyu ölç: gecikme yüzdelikleri, satır/sn ve tepe RSS
+
+    rows_per_sec, mümkünse sunucunun taradığı satırlardan (Handler_read_*)
+    hesaplanır; bu, COUNT/GROUP BY gibi az satır döndüren sorgularda
+    döndürülen satır sayısından çok daha anlamlıdır.
+    """
+    for _ in range(warmup):
+        case.run()
+
+    gc.collect()
+    rss_before = peak_rss_mb()
+    reads_before = handler_reads(monitor)
+    timings = []
+    returned = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        returned += case.run()
+        timings.append(time.perf_counter() - started)
+    reads_after = handler_reads(monitor)
+
+    elapsed = sum(timings)
+    if reads_before is not None and reads_after is not None:
+        rows_basis, examined = reads_after - reads_before, True
+    else:
+        rows_basis, examined = returned, False
+    peak = peak_rss_mb()
+    return {
+        'group': case.group,
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'mean_ms': round(elapsed / iterations * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+        'rows_returned': returned // iterations,
+        'rows_per_sec': round(rows_basis / elapsed, 1) if elapsed else 0.0,
+        'rows_basis': 'examined' if examined else 'returned',
+        'peak_rss_mb': round(peak, 1),
+        'rss_growth_mb': round(peak - rss_before, 1)
+    }
+
+
+def run_all(cases, iterations=5, warmup=1, monitor=None, meta=None):
+    """Tüm senaryoları çalıştırıp JSON'a yazılabilir sonuç üret"""
+    results = {}
+    for case in cases:
+        try:
+            results[case.name] = run_case(case, iterations, warmup, monitor)
+            stats = results[case.name]
+            logging.info(
+                f"⏱️ {case.name}: p50 {stats['p50_ms']:.1f}ms, p95 {stats['p95_ms']:.1f}ms, "
+                f"{stats['rows_per_sec']:,.0f} satır/sn"
+            )
+        except Exception as e:
+            logging.error(f"❌ {case.name} başarısız: {e}")
+            results[case.name] = {'group': case.group, 'error': str(e)}
+    return {
+        'meta': dict(meta or {}, **{
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': iterations,
+            'warmup': warmup
+        }),
+        'cases': results
+    }
+
+
+def compare(current, baseline, tolerance=0.2, min_delta_ms=2.0):
+    """Sonuçları baseline ile karşılaştır
+
+    Bir ölçüm, baseline'a göre ``tolerance`` oranından fazla kötüleşmişse
+    gerileme sayılır; gecikmelerde ayrıca en az ``min_delta_ms`` fark
+    aranır (küçük sorgulardaki gürültü gerileme sayılmaz).
+    Dönüş: (satırlar, gerileme sayısı)
+    """
+    rows = []
+    regressions = 0
+    for name, stats in current['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if base is None or 'error' in stats or 'error' in base:
+            rows.append({'case': name, 'status': 'error' if 'error' in stats else 'new'})
+            continue
+        for key, higher_is_worse in COMPARED:
+            old, new = base.get(key), stats.get(key)
+            if not old or new is None:
+                continue
+            if key == 'rows_per_sec' and base.get('rows_basis') != stats.get('rows_basis'):
+                continue
+            change = (new - old) / old
+            worse = change > tolerance if higher_is_worse else change < -tolerance
+            if worse and key.endswith('_ms') and new - old < min_delta_ms:
+                worse = False
+            status = 'regression' if worse else 'ok'
+            regressions += worse
+            rows.append({
+                'case': name, 'metric': key, 'baseline': old, 'current': new,
+                'change_pct': round(change * 100, 1), 'status': status
+            })
+    for name in baseline.get('cases', {}):
+        if name not in current['cases']:
+            rows.append({'case': name, 'status': 'missing'})
+    return rows, regressions
+
+
+def format_comparison(rows):
+    """Karşılaştırma tablosunu metin olarak hazırla"""
+    lines = []
+    for row in rows:
+        if 'metric' not in row:
+            lines.append(f"{row['status'].upper():<10} {row['case']}")
+            continue
+        marker = '🔴' if row['status'] == 'regression' else '  '
+        lines.append(
+            f"{marker} {row['case']:<36} {row['metric']:<13} "
+            f"{row['baseline']:>12} → {row['current']:>12} ({row['change_pct']:+.1f}%)"
+        )
+    return '\n'.join(lines)
+
+
+def save(results, path):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2, ensure_ascii=False)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
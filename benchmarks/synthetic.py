@@ -0,0 +1,276 @@
+import logging
+import random
+import time
+from bisect import bisect
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+from config import CategoryConfig
+
+# Meta tablosu: üretim parametreleri (benchmark tarih pencereleri bu güne göre kurulur)
+META_TABLE = 'bench_meta'
+
+SCHEMAS = {
+    'fetched_accounts': """
+        CREATE TABLE fetched_accounts (
+            id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            domain VARCHAR(255),
+            username VARCHAR(255),
+            password VARCHAR(255),
+            region VARCHAR(64),
+            source VARCHAR(64),
+            category VARCHAR(64),
+            fetch_date DATETIME
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    'leak_logs': """
+        CREATE TABLE leak_logs (
+            id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            channel VARCHAR(255),
+            source VARCHAR(64),
+            content TEXT,
+            author VARCHAR(255),
+            detection_date DATETIME,
+            type VARCHAR(32),
+            created_at DATETIME
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    'accs': """
+        CREATE TABLE accs (
+            id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            email VARCHAR(255),
+            password VARCHAR(255),
+            domain VARCHAR(255),
+            region VARCHAR(64),
+            source VARCHAR(64),
+            date DATETIME
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """
+}
+
+# İkincil indeksler yükleme bittikten sonra eklenir (toplu ekleme çok daha hızlı)
+INDEXES = {
+    'fetched_accounts': [
+        'CREATE INDEX idx_fetched_accounts_domain ON fetched_accounts (domain)',
+        'CREATE INDEX idx_fetched_accounts_fetch_date ON fetched_accounts (fetch_date)'
+    ],
+    'leak_logs': [
+        'CREATE INDEX idx_leak_logs_created_at ON leak_logs (created_at)'
+    ],
+    'accs': [
+        'CREATE INDEX idx_accs_date ON accs (date)'
+    ]
+}
+
+INSERTS = {
+    'fetched_accounts': """
+        INSERT INTO fetched_accounts (domain, username, password, region, source, category, fetch_date)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """,
+    'leak_logs': """
+        INSERT INTO leak_logs (channel, source, content, author, detection_date, type, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """,
+    'accs': """
+        INSERT INTO accs (email, password, domain, region, source, date)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """
+}
+
+# leak_logs, hesap tablolarına göre çok daha küçüktür
+TABLE_RATIOS = {'fetched_accounts': 1.0, 'accs': 1.0, 'leak_logs': 0.05}
+
+# Sık görülen gerçek domainler, kuyruk sentetik domainlerle doldurulur
+HEAD_DOMAINS = [
+    ('gmail.com', 'email_providers'), ('hotmail.com', 'email_providers'),
+    ('facebook.com', 'social_media'), ('instagram.com', 'social_media'),
+    ('turkiye.gov.tr', 'government'), ('yahoo.com', 'email_providers'),
+    ('trendyol.com', 'popular_turkish'), ('hepsiburada.com', 'popular_turkish'),
+    ('outlook.com', 'email_providers'), ('twitter.com', 'social_media'),
+    ('ziraatbank.com.tr', 'banks'), ('garanti.com.tr', 'banks'),
+    ('sahibinden.com', 'popular_turkish'), ('netflix.com', 'tech_companies'),
+    ('microsoft.com', 'tech_companies'), ('odtu.edu.tr', 'universities'),
+    ('itu.edu.tr', 'universities'), ('isbank.com.tr', 'banks'),
+    ('n11.com', 'turkish_extensions'), ('e-devlet.gov.tr', 'government')
+]
+TLDS = [('.com', None), ('.com.tr', 'turkish_extensions'), ('.net', None),
+        ('.org', None), ('.gov.tr', 'government'), ('.edu.tr', 'universities')]
+
+REGIONS = ['TR', 'US', 'DE', 'GB', 'FR', 'NL', 'RU', 'BR', 'IN', 'AZ', 'IR', 'Unknown', '']
+REGION_WEIGHTS = [40, 15, 8, 6, 5, 4, 4, 3, 3, 3, 2, 5, 2]
+SOURCES = ['TXT', 'Telegram', 'Stealer', 'Combo', 'Forum', 'API', '']
+SOURCE_WEIGHTS = [35, 25, 20, 10, 5, 3, 2]
+LEAK_TYPES = ['credential', 'database', 'combo', 'mention', 'stealer_log']
+LEAK_TYPE_WEIGHTS = [40, 20, 20, 15, 5]
+
+WORDS = ('panel giris sifre hesap veri sizinti kullanici admin musteri banka kart '
+         'mail liste guncel yeni toplu log stealer dump tablo').split()
+
+
+def zipf_cum_weights(count, exponent):
+    """1/rank^s ağırlıklarının kümülatif listesi (random.choices için)"""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+class SyntheticData:
+    """Tekrarlanabilir sentetik veri üretici
+
+    Domain dağılımı Zipf benzeri (birkaç domain kayıtların büyük kısmını
+    oluşturur), tarih dağılımı ise son günlere yoğunlaşır; böylece
+    bugün/dün/hafta pencereleri gerçekçi hacimde veri içerir.
+    """
+
+    def __init__(self, rows, seed=42, anchor=None, domain_skew=1.1, history_days=365):
+        self.rows = rows
+        self.seed = seed
+        self.anchor = anchor or date.today()
+        self.history_days = history_days
+        self._end = datetime.combine(self.anchor, datetime.min.time()) + timedelta(days=1)
+
+        rng = random.Random(seed)
+        domain_count = max(len(HEAD_DOMAINS) * 10, rows // 200)
+        self.domains = list(HEAD_DOMAINS)
+        while len(self.domains) < domain_count:
+            tld, category = rng.choice(TLDS)
+            name = f"{rng.choice(WORDS)}{len(self.domains)}{tld}"
+            self.domains.append((name, category or rng.choice(CategoryConfig.ORDER)))
+        self.domain_weights = zipf_cum_weights(len(self.domains), domain_skew)
+        self.channels = [f"leak_channel_{i}" for i in range(200)]
+        self.channel_weights = zipf_cum_weights(len(self.channels), 1.0)
+
+    def domain(self, rank):
+        """Popülerlik sırasına göre domain (0 = en yaygın)"""
+        return self.domains[rank][0]
+
+    def _pick(self, rng, items, cum_weights):
+        return items[bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+    def _timestamp(self, rng):
+        # Üstel dağılım: kayıtların yaklaşık yarısı son ~25 günde
+        age = min(rng.expovariate(1 / 35.0), self.history_days) * 86400
+        return (self._end - timedelta(seconds=age)).replace(microsecond=0)
+
+    def table_rows(self, table):
+        """Tablo için üretilecek satır sayısı"""
+        return max(1, int(self.rows * TABLE_RATIOS[table]))
+
+    def generate(self, table):
+        """Tablo satırlarını üret (tablo bazında sabit seed ile)"""
+        rng = random.Random(f"{self.seed}:{table}")
+        generator = getattr(self, f"_{table}_row")
+        for index in range(self.table_rows(table)):
+            yield generator(rng, index)
+
+    def _fetched_accounts_row(self, rng, index):
+        domain, category = self._pick(rng, self.domains, self.domain_weights)
+        return (
+            domain,
+            f"user{index}@{domain}",
+            f"p{rng.getrandbits(40):x}",
+            rng.choices(REGIONS, REGION_WEIGHTS)[0],
+            rng.choices(SOURCES, SOURCE_WEIGHTS)[0],
+            category,
+            self._timestamp(rng)
+        )
+
+    def _accs_row(self, rng, index):
+        domain, _ = self._pick(rng, self.domains, self.domain_weights)
+        return (
+            f"user{index}@{domain}",
+            f"p{rng.getrandbits(40):x}",
+            domain if rng.random() > 0.02 else '',
+            rng.choices(REGIONS, REGION_WEIGHTS)[0],
+            rng.choices(SOURCES, SOURCE_WEIGHTS)[0],
+            self._timestamp(rng)
+        )
+
+    def _leak_logs_row(self, rng, index):
+        created = self._timestamp(rng)
+        domain = self._pick(rng, self.domains, self.domain_weights)[0]
+        content = ' '.join(rng.choices(WORDS, k=rng.randint(8, 40)))
+        return (
+            self._pick(rng, self.channels, self.channel_weights),
+            rng.choices(SOURCES, SOURCE_WEIGHTS)[0],
+            f"{domain} {content}",
+            f"author{rng.randint(1, 5000)}",
+            created - timedelta(minutes=rng.randint(0, 600)),
+            rng.choices(LEAK_TYPES, LEAK_TYPE_WEIGHTS)[0],
+            created
+        )
+
+
+def load(connection, data, tables=None, batch_size=5000):
+    """Tabloları yeniden oluşturup sentetik veriyi yükle
+
+    Dönüş: tablo başına {'rows', 'seconds', 'rows_per_sec'}
+    """
+    tables = tables or list(SCHEMAS)
+    cursor = connection.cursor()
+    stats = {}
+
+    cursor.execute(f"DROP TABLE IF EXISTS {META_TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {META_TABLE} (
+            name VARCHAR(64) PRIMARY KEY,
+            value VARCHAR(255)
+        )
+    """)
+    cursor.executemany(
+        f"INSERT INTO {META_TABLE} (name, value) VALUES (%s, %s)",
+        [('rows', str(data.rows)), ('seed', str(data.seed)), ('anchor', data.anchor.isoformat())]
+    )
+    connection.commit()
+
+    for table in tables:
+        started = time.perf_counter()
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(SCHEMAS[table])
+        total = data.table_rows(table)
+        batch = []
+        inserted = 0
+        for row in data.generate(table):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(INSERTS[table], batch)
+                connection.commit()
+                inserted += len(batch)
+                batch = []
+                if inserted % (batch_size * 100) == 0:
+                    logging.info(f"📥 {table}: {inserted:,}/{total:,}")
+        if batch:
+            cursor.executemany(INSERTS[table], batch)
+            connection.commit()
+            inserted += len(batch)
+
+        for statement in INDEXES[table]:
+            cursor.execute(statement)
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+
+        elapsed = time.perf_counter() - started
+        stats[table] = {
+            'rows': inserted,
+            'seconds': round(elapsed, 2),
+            'rows_per_sec': round(inserted / elapsed, 1) if elapsed else 0.0
+        }
+        logging.info(f"✅ {table}: {inserted:,} satır, {elapsed:.1f}s")
+
+    cursor.close()
+    return stats
+
+
+def read_meta(connection):
+    """Yükleme sırasında kaydedilen parametreler; yükleme yapılmamışsa None"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT name, value FROM {META_TABLE}")
+        meta = dict(cursor.fetchall())
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+    return {
+        'rows': int(meta['rows']),
+        'seed': int(meta['seed']),
+        'anchor': date.fromisoformat(meta['anchor'])
+    }
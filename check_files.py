@@ -12,6 +12,7 @@ def check_files():
         'database.py', 
         'auth.py',
         'api_utils.py',
+        'deadline.py',
         'requirements.txt',
         'routes/__init__.py',
         'routes/auth.py',
@@ -20,21 +20,104 @@ class Config:
         'autocommit': True,
         'raise_on_warnings': True
     }
+    # Sürücü seçimi yalnızca açıkça istenirse (gevent havuzu DB_USE_PURE=true
+    # ayarlar; C eklentisi patch'lenemez). Verilmezse mysql-connector kendi
+    # varsayılanını kullanır - C eklentisi kurulu değilse saf Python'a düşer.
+    if os.getenv('DB_USE_PURE'):
+        DB_CONFIG['use_pure'] = os.getenv('DB_USE_PURE').lower() == 'true'
     
     # API ayarları - SEN NE İSTEDİYSEN O!
     API_CONFIG = {
         'base_url': os.getenv('API_BASE_URL', 'http://192.168.70.71:5000'),
         'api_key': os.getenv('API_KEY', 'demo_key_123'),
         'timeout': int(os.getenv('API_TIMEOUT', 800)),
-        'max_retries': int(os.getenv('API_MAX_RETRIES', 3))
+        'max_retries': int(os.getenv('API_MAX_RETRIES', 3)),
+        # Paylaşılan HTTP oturumunun connection pool boyutu
+        'pool_size': int(os.getenv('API_POOL_SIZE', 10))
     }
     
     API2_CONFIG = {
-    'base_url': os.getenv('API_BASE_URL', 'https://api2.tahaeryetisozen.com.tr'),  # .com eklendi
+    'base_url': os.getenv('API2_BASE_URL', os.getenv('API_BASE_URL', 'https://api2.tahaeryetisozen.com.tr')),  # .com eklendi
     'api_key': os.getenv('API_KEY', 'mysecretkey123'),
     'timeout': int(os.getenv('API_TIMEOUT', 500)),
-    'max_retries': int(os.getenv('API_MAX_RETRIES', 3))
+    'max_retries': int(os.getenv('API_MAX_RETRIES', 3)),
+    # Tarih aralığı parçalı (sharded) arama ayarları
+    'shard_workers': int(os.getenv('API2_SHARD_WORKERS', 4)),
+    'shard_auto_days': int(os.getenv('API2_SHARD_AUTO_DAYS', 31)),
+    # Bu kadar veya daha fazla kayıt dönen parça daha küçük pencerelere bölünür (0: kapalı)
+    'shard_split_records': int(os.getenv('API2_SHARD_SPLIT_RECORDS', 5000)),
+    'pool_size': int(os.getenv('API2_POOL_SIZE', 10))
     }
+    
+    # İstek zaman bütçesi - tüm denemeler bu süreyi paylaşır
+    REQUEST_DEADLINE = {
+        'default_budget': float(os.getenv('REQUEST_BUDGET', 120)),
+        'max_budget': float(os.getenv('REQUEST_MAX_BUDGET', 900)),
+        'min_attempt_timeout': float(os.getenv('REQUEST_MIN_ATTEMPT_TIMEOUT', 1))
+    }
+    
+    # Sorgu profili - eşiği aşan SELECT'ler için EXPLAIN (hız sınırlı) arka
+    # planda, ayrı bir bağlantıda alınır; istek beklemez
+    QUERY_PROFILER = {
+        'enabled': os.getenv('QUERY_PROFILER_ENABLED', 'true').lower() == 'true',
+        'slow_threshold': float(os.getenv('SLOW_QUERY_THRESHOLD', 0.5)),
+        'explain_interval': int(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 300)),
+        'explain_per_minute': int(os.getenv('SLOW_QUERY_EXPLAIN_PER_MINUTE', 6)),
+        'max_fingerprints': int(os.getenv('QUERY_PROFILER_MAX_FINGERPRINTS', 500))
+    }
+    
+    # /metrics endpoint'i - token tanımlıysa Bearer başlığı veya ?token= gerekir;
+    # tanımlı değilse yalnızca proxy'siz localhost isteklerine açıktır.
+    # METRICS_MULTIPROC_DIR verilirse (gunicorn.conf.py ayarlar) değerler
+    # worker'lar arasında dosyalar üzerinden toplanır
+    METRICS_CONFIG = {
+        'enabled': os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+        'token': os.getenv('METRICS_TOKEN', ''),
+        'multiprocess_dir': os.getenv('METRICS_MULTIPROC_DIR', ''),
+        'flush_interval': float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+    }
+    
+    # Kabul kontrolü - pahalı endpoint sınıfları için eşzamanlılık (bekleme
+    # kuyruklu) ve kullanıcı başına token bucket (istek/sn, burst). Sınırlar
+    # gunicorn worker'ları arasında paylaşılır (preload_app), toplam değerlerdir
+    ADMISSION_CONFIG = {
+        'enabled': os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true',
+        'max_tracked_users': int(os.getenv('ADMISSION_MAX_TRACKED_USERS', 10000)),
+        'classes': {
+            # Limitsiz leak logs listeleri (/leak-logs/api/all, /leak-logs/api/list)
+            'bulk': {
+                'concurrency': int(os.getenv('ADMISSION_BULK_CONCURRENCY', 2)),
+                'queue_size': int(os.getenv('ADMISSION_BULK_QUEUE', 4)),
+                'queue_timeout': float(os.getenv('ADMISSION_BULK_QUEUE_TIMEOUT', 10)),
+                'user_rate': float(os.getenv('ADMISSION_BULK_USER_RATE', 0.1)),
+                'user_burst': float(os.getenv('ADMISSION_BULK_USER_BURST', 3))
+            },
+            # LIKE ağırlıklı veritabanı aramaları
+            'search': {
+                'concurrency': int(os.getenv('ADMISSION_SEARCH_CONCURRENCY', 6)),
+                'queue_size': int(os.getenv('ADMISSION_SEARCH_QUEUE', 12)),
+                'queue_timeout': float(os.getenv('ADMISSION_SEARCH_QUEUE_TIMEOUT', 5)),
+                'user_rate': float(os.getenv('ADMISSION_SEARCH_USER_RATE', 0.5)),
+                'user_burst': float(os.getenv('ADMISSION_SEARCH_USER_BURST', 10))
+            }
+        }
+    }
+    
+    # Loglama - kuyruk tabanlı, JSON; LOG_FILE boşsa yalnızca konsol
+    # Birden fazla worker aynı dosyayı döndüremez: LOG_FILE=logs/lapsus-{pid}.log
+    LOGGING_CONFIG = {
+        'level': os.getenv('LOG_LEVEL', 'INFO').upper(),
+        'fmt': os.getenv('LOG_FORMAT', 'json'),
+        'console_format': os.getenv('LOG_CONSOLE_FORMAT', 'text'),
+        'file': os.getenv('LOG_FILE', 'lapsus.log'),
+        'max_bytes': int(os.getenv('LOG_MAX_BYTES', 50 * 1024 * 1024)),
+        'backup_count': int(os.getenv('LOG_BACKUP_COUNT', 5)),
+        'when': os.getenv('LOG_ROTATE_WHEN', ''),
+        'queue_size': int(os.getenv('LOG_QUEUE_SIZE', 10000)),
+        'sample_rate': float(os.getenv('LOG_INFO_SAMPLE_RATE', 1.0)),
+        'quiet_loggers': ('urllib3',)
+    }
+    
     # Flask çalıştırma ayarları
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     FLASK_HOST = os.getenv('FLASK_HOST', '0.0.0.0')
@@ -1,13 +1,33 @@
 import mysql.connector
 from mysql.connector import Error
 import logging
+import os
+import queue
+import sys
+import threading
+import time
 from config import Config
+from metrics import observe_db_query
+from query_profiler import QueryProfiler
 
 class DatabaseManager:
     """Veritabanı yönetim sınıfı"""
     
     def __init__(self):
         self.config = Config.DB_CONFIG
+        settings = Config.QUERY_PROFILER
+        self.profiler = None
+        if settings['enabled']:
+            self.profiler = QueryProfiler(
+                slow_threshold=settings['slow_threshold'],
+                explain_interval=settings['explain_interval'],
+                explain_per_minute=settings['explain_per_minute'],
+                max_fingerprints=settings['max_fingerprints']
+            )
+        # EXPLAIN arka plan thread'i; süreç başına ilk yavaş sorguda açılır
+        self._explain_lock = threading.Lock()
+        self._explain_queue = None
+        self._explain_pid = None
     
     def get_connection(self):
         """Güvenli veritabanı bağlantısı"""
@@ -20,14 +40,91 @@ class DatabaseManager:
             logging.error(f"Veritabanı bağlantı hatası: {e}")
             return None
     
+    def query(self, cursor, sql, params=None, fetch='all'):
+        """SQL çalıştır, sonucu getir; süreyi metriklere ve sorgu profiline kaydet
+        
+        fetch: 'all' (satır listesi), 'one' (tek satır) veya None (sonuç okunmaz)
+        """
+        started = time.perf_counter()
+        ok = False
+        result = None
+        try:
+            cursor.execute(sql, params)
+            if fetch == 'all':
+                result = cursor.fetchall()
+            elif fetch == 'one':
+                result = cursor.fetchone()
+            ok = True
+            return result
+        finally:
+            duration = time.perf_counter() - started
+            observe_db_query(duration, ok)
+            if self.profiler is not None:
+                if fetch == 'all':
+                    rows = len(result or [])
+                elif fetch == 'one':
+                    rows = 1 if result else 0
+                else:
+                    rows = max(cursor.rowcount, 0)
+                caller = sys._getframe(1).f_code.co_name
+                explain_key = self.profiler.record(sql, params, duration, rows, caller)
+                if explain_key and ok:
+                    self._schedule_explain(explain_key, sql, params)
+    
+    def _schedule_explain(self, key, sql, params):
+        """Yavaş bir SELECT'in EXPLAIN'ini arka plana bırak; istek beklemez
+        
+        Kuyruk dolarsa (veritabanı EXPLAIN'leri de yavaş yanıtlıyorsa) istek
+        atlanır; parmak izi explain_interval sonra yeniden denenir.
+        """
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return
+        with self._explain_lock:
+            if self._explain_pid != os.getpid():
+                # Fork sonrası thread worker'a kopyalanmaz; her süreç kendininkini açar
+                self._explain_queue = queue.Queue(maxsize=max(1, self.profiler.explain_per_minute))
+                threading.Thread(target=self._explain_worker, args=(self._explain_queue,),
+                                 name='query-explain', daemon=True).start()
+                self._explain_pid = os.getpid()
+        try:
+            self._explain_queue.put_nowait((key, sql, tuple(params) if isinstance(params, list) else params))
+        except queue.Full:
+            logging.debug(f"EXPLAIN kuyruğu dolu, atlandı: {key[:200]}")
+    
+    def _explain_worker(self, jobs):
+        """EXPLAIN kuyruğunu sırayla işle"""
+        while True:
+            key, sql, params = jobs.get()
+            try:
+                self._explain(key, sql, params)
+            except Exception as e:
+                logging.warning(f"EXPLAIN alınamadı: {e}")
+    
+    def _explain(self, key, sql, params):
+        """Yavaş bir SELECT için EXPLAIN al (ayrı bağlantıda, asıl cursor'a dokunmadan)"""
+        try:
+            # EXPLAIN bir Note uyarısı üretir; raise_on_warnings burada kapalı olmalı
+            connection = mysql.connector.connect(**dict(self.config, raise_on_warnings=False))
+        except Error as e:
+            logging.warning(f"EXPLAIN bağlantısı kurulamadı: {e}")
+            return
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"EXPLAIN {sql}", params)
+            self.profiler.store_explain(key, cursor.fetchall())
+            cursor.close()
+        except Error as e:
+            logging.warning(f"EXPLAIN alınamadı: {e}")
+        finally:
+            connection.close()
+    
     def test_connection(self):
         """Veritabanı bağlantısını test et"""
         connection = self.get_connection()
         if connection:
             try:
                 cursor = connection.cursor()
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
+                self.query(cursor, "SELECT 1", fetch='one')
                 cursor.close()
                 connection.close()
                 return True
@@ -45,13 +142,12 @@ class DatabaseManager:
         
         try:
             cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
+            categories = self.query(cursor, """
                 SELECT category, COUNT(*) as count 
                 FROM fetched_accounts 
                 GROUP BY category 
                 ORDER BY count DESC
             """)
-            categories = cursor.fetchall()
             cursor.close()
             connection.close()
             return categories
@@ -71,16 +167,15 @@ class DatabaseManager:
             cursor = connection.cursor(dictionary=True)
             
             # Toplam hesap sayısı
-            cursor.execute("SELECT COUNT(*) as total FROM fetched_accounts")
-            total_accounts = cursor.fetchone()['total']
+            total_accounts = self.query(cursor, "SELECT COUNT(*) as total FROM fetched_accounts", fetch='one')['total']
             
             # Benzersiz domain sayısı
-            cursor.execute("SELECT COUNT(DISTINCT domain) as unique_domains FROM fetched_accounts")
-            unique_domains = cursor.fetchone()['unique_domains']
+            unique_domains = self.query(
+                cursor, "SELECT COUNT(DISTINCT domain) as unique_domains FROM fetched_accounts", fetch='one'
+            )['unique_domains']
             
             # Son güncelleme tarihi
-            cursor.execute("SELECT MAX(fetch_date) as last_update FROM fetched_accounts")
-            last_update_result = cursor.fetchone()
+            last_update_result = self.query(cursor, "SELECT MAX(fetch_date) as last_update FROM fetched_accounts", fetch='one')
             last_updated = str(last_update_result['last_update']) if last_update_result['last_update'] else 'Bilinmiyor'
             
             cursor.close()
@@ -125,8 +220,7 @@ class DatabaseManager:
             
             # Toplam sayı
             count_query = f"SELECT COUNT(*) as total FROM leak_logs {where_clause}"
-            cursor.execute(count_query, params)
-            total_count = cursor.fetchone()['total']
+            total_count = self.query(cursor, count_query, params, fetch='one')['total']
             
             # Sayfalama
             total_pages = (total_count + limit - 1) // limit
@@ -142,8 +236,7 @@ class DatabaseManager:
             """
             params.extend([limit, offset])
             
-            cursor.execute(query, params)
-            results = cursor.fetchall()
+            results = self.query(cursor, query, params)
             
             cursor.close()
             connection.close()
@@ -171,37 +264,33 @@ class DatabaseManager:
             cursor = connection.cursor(dictionary=True)
             
             # Toplam log sayısı
-            cursor.execute("SELECT COUNT(*) as total FROM leak_logs")
-            total_logs = cursor.fetchone()['total']
+            total_logs = self.query(cursor, "SELECT COUNT(*) as total FROM leak_logs", fetch='one')['total']
             
             # Source'lara göre dağılım
-            cursor.execute("""
+            sources = self.query(cursor, """
                 SELECT source, COUNT(*) as count 
                 FROM leak_logs 
                 GROUP BY source 
                 ORDER BY count DESC 
                 LIMIT 10
             """)
-            sources = cursor.fetchall()
             
             # Type'lara göre dağılım
-            cursor.execute("""
+            types = self.query(cursor, """
                 SELECT type, COUNT(*) as count 
                 FROM leak_logs 
                 GROUP BY type 
                 ORDER BY count DESC
             """)
-            types = cursor.fetchall()
             
             # Channel'lara göre dağılım
-            cursor.execute("""
+            channels = self.query(cursor, """
                 SELECT channel, COUNT(*) as count 
                 FROM leak_logs 
                 GROUP BY channel 
                 ORDER BY count DESC 
                 LIMIT 10
             """)
-            channels = cursor.fetchall()
             
             cursor.close()
             connection.close()
@@ -240,8 +329,7 @@ class DatabaseManager:
             
             # Toplam sayı
             count_query = f"SELECT COUNT(*) as total FROM leak_logs {where_clause}"
-            cursor.execute(count_query, params)
-            total_count = cursor.fetchone()['total']
+            total_count = self.query(cursor, count_query, params, fetch='one')['total']
             
             # Sayfalama
             total_pages = (total_count + limit - 1) // limit
@@ -257,8 +345,7 @@ class DatabaseManager:
             """
             params.extend([limit, offset])
             
-            cursor.execute(search_query, params)
-            results = cursor.fetchall()
+            results = self.query(cursor, search_query, params)
             
             cursor.close()
             connection.close()
@@ -287,8 +374,7 @@ class DatabaseManager:
             cursor = connection.cursor(dictionary=True)
             
             # Tablo yapısını öğren
-            cursor.execute("DESCRIBE fetched_accounts")
-            table_columns = cursor.fetchall()
+            table_columns = self.query(cursor, "DESCRIBE fetched_accounts")
             available_columns = [col['Field'] for col in table_columns]
             
             # Arama kolonlarını belirle
@@ -339,8 +425,7 @@ class DatabaseManager:
             
             # Toplam sayı
             count_query = f"SELECT COUNT(*) as total FROM fetched_accounts {where_clause}"
-            cursor.execute(count_query, params)
-            total_count = cursor.fetchone()['total']
+            total_count = self.query(cursor, count_query, params, fetch='one')['total']
             
             # Sayfalama
             total_pages = (total_count + limit - 1) // limit
@@ -365,8 +450,7 @@ class DatabaseManager:
             """
             params.extend([limit, offset])
             
-            cursor.execute(search_query, params)
-            results = cursor.fetchall()
+            results = self.query(cursor, search_query, params)
             
             cursor.close()
             connection.close()
@@ -396,20 +480,16 @@ class DatabaseManager:
             cursor = connection.cursor(dictionary=True)
             
             # Tablo yapısını al
-            cursor.execute("DESCRIBE fetched_accounts")
-            columns = cursor.fetchall()
+            columns = self.query(cursor, "DESCRIBE fetched_accounts")
             
             # Örnek veri al
-            cursor.execute("SELECT * FROM fetched_accounts LIMIT 1")
-            sample_data = cursor.fetchone()
+            sample_data = self.query(cursor, "SELECT * FROM fetched_accounts LIMIT 1", fetch='one')
             
             # Toplam kayıt sayısı
-            cursor.execute("SELECT COUNT(*) as total FROM fetched_accounts")
-            total_count = cursor.fetchone()['total']
+            total_count = self.query(cursor, "SELECT COUNT(*) as total FROM fetched_accounts", fetch='one')['total']
             
             # Domain örnekleri
-            cursor.execute("SELECT DISTINCT domain FROM fetched_accounts LIMIT 10")
-            sample_domains = [row['domain'] for row in cursor.fetchall()]
+            sample_domains = [row['domain'] for row in self.query(cursor, "SELECT DISTINCT domain FROM fetched_accounts LIMIT 10")]
             
             cursor.close()
             connection.close()
@@ -0,0 +1,77 @@
+import time
+import logging
+from flask import g, has_request_context
+from config import Config
+
+
+class DeadlineExceeded(Exception):
+    """İstek için ayrılan zaman bütçesi tükendi"""
+
+
+class Deadline:
+    """Tek bir gelen istek için toplam zaman bütçesi"""
+
+    def __init__(self, budget):
+        self.budget = max(float(budget), 0.0)
+        self.started_at = time.monotonic()
+
+    def elapsed(self):
+        """İsteğin başından bu yana geçen süre (saniye)"""
+        return time.monotonic() - self.started_at
+
+    def remaining(self):
+        """Kalan bütçe (saniye), en az 0"""
+        return max(self.budget - self.elapsed(), 0.0)
+
+    def expired(self):
+        """Bütçe, yeni bir deneme başlatılamayacak kadar azaldı mı?"""
+        return self.remaining() < Config.REQUEST_DEADLINE['min_attempt_timeout']
+
+    def timeout(self, cap):
+        """Bir deneme için kullanılacak timeout: kalan bütçe ile cap'in küçüğü"""
+        if self.expired():
+            raise DeadlineExceeded(
+                f"Zaman bütçesi tükendi ({self.elapsed():.1f}s / {self.budget:.1f}s)"
+            )
+        return min(float(cap), self.remaining())
+
+    def report(self):
+        """Yanıtlara eklenecek süre bilgisi"""
+        return {
+            'budget': round(self.budget, 3),
+            'elapsed': round(self.elapsed(), 3),
+            'remaining': round(self.remaining(), 3)
+        }
+
+
+def parse_deadline_header(value):
+    """X-Request-Deadline başlığını saniye cinsinden bütçeye çevir
+
+    Başlık, kalan süreyi saniye olarak taşır (örn: "30" veya "12.5").
+    Geçersiz veya pozitif olmayan değerler için None döner.
+    """
+    if not value:
+        return None
+    try:
+        budget = float(value)
+    except (TypeError, ValueError):
+        logging.warning(f"Geçersiz X-Request-Deadline başlığı: {value!r}")
+        return None
+    return budget if budget > 0 else None
+
+
+def new_deadline(header_value=None):
+    """Config ve opsiyonel başlıktan yeni bir Deadline oluştur"""
+    settings = Config.REQUEST_DEADLINE
+    budget = parse_deadline_header(header_value) or settings['default_budget']
+    return Deadline(min(budget, settings['max_budget']))
+
+
+def current_deadline():
+    """Aktif isteğin Deadline nesnesi; istek dışında config varsayılanı"""
+    if has_request_context():
+        deadline = getattr(g, 'deadline', None)
+        if deadline is None:
+            deadline = g.deadline = new_deadline()
+        return deadline
+    return new_deadline()
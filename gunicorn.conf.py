@@ -0,0 +1,176 @@
+"""Gunicorn üretim ayarları
+
+Çalıştırma:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Tüm ayarlar ortam değişkenleriyle değiştirilebilir (GUNICORN_*).
+
+- Worker sayısı varsayılan olarak (2 x CPU) + 1; GUNICORN_WORKERS ile sabitlenir.
+- preload_app: uygulama master süreçte bir kez yüklenir, worker'lar fork ile
+  açılır (hızlı başlatma, paylaşılan bellek). Fork sonrası her worker
+  HTTP oturumlarını ve sorgu profilini sıfırlar (app.reinit_after_fork).
+  Veritabanı bağlantıları istek başına açıldığı için worker'lar arasında
+  paylaşılan bağlantı yoktur. Kabul kontrolü (admission) slotları ve
+  kullanıcı kovaları master'da paylaşılan bellekte açılır; ADMISSION_*
+  sınırları tüm worker'lar için toplamdır (preload kapalıysa worker başına).
+- max_requests / max_requests_jitter: worker'lar belirtilen istek sayısından
+  sonra (jitter ile, hepsi aynı anda değil) yeniden başlatılır; yavaş bellek
+  sızıntıları birikmez.
+- timeout: istek zaman bütçesinin (REQUEST_MAX_BUDGET) üzerinde tutulur;
+  bütçe dolmadan worker öldürülmez.
+
+Yeniden yükleme:
+
+- ``kill -HUP <master_pid>``: ayarlar yeniden okunur, worker'lar sırayla
+  (graceful_timeout içinde mevcut istekleri bitirerek) yenilenir. preload_app
+  açıkken uygulama kodu master'da yüklü kaldığından kod değişiklikleri için
+  ``kill -USR2 <master_pid>`` (yeni master) ve ardından eski master'a
+  ``kill -QUIT`` gönderilir veya servis yeniden başlatılır.
+- ``kill -TTIN`` / ``kill -TTOU``: çalışırken worker sayısını artır/azalt.
+
+G/Ç havuzu (GUNICORN_POOL=io):
+
+``/api/proxy/*``, ``/api/search``, ``/helix-d/search`` ve ``/search-domain``
+zamanlarının neredeyse tamamını upstream HTTP yanıtı bekleyerek geçirir; sync
+worker'da her bekleyen istek bütün bir süreci kilitler. Bu yollar ayrı bir
+gevent (green thread) havuzunda çalıştırılır: socket/ssl/time/threading
+monkey-patch edilir, her worker ``GUNICORN_WORKER_CONNECTIONS`` kadar
+eşzamanlı isteği tek süreçte bekletir. Uygulama kodu değişmez; requests,
+mysql-connector ve parçalı aramadaki ThreadPoolExecutor green thread'lerle
+çalışır. mysql-connector'ın C eklentisi patch'lenemediği için bu havuzda
+saf Python sürücü kullanılır (DB_USE_PURE=true). Yüksek eşzamanlılıkta
+API_POOL_SIZE / API2_POOL_SIZE artırılmalıdır; havuz dolduğunda fazla
+bağlantılar yeniden kullanılmadan kapatılır.
+
+    # CPU havuzu (varsayılan): dashboard, leak-logs, admin, ...
+    gunicorn -c gunicorn.conf.py wsgi:app
+    # G/Ç havuzu
+    GUNICORN_POOL=io GUNICORN_BIND=127.0.0.1:7073 gunicorn -c gunicorn.conf.py wsgi:app
+
+Önündeki reverse proxy yalnızca G/Ç yollarını ikinci havuza yönlendirir;
+CPU'ya bağlı yollar sync worker'larda kalır ve bekleyen aramalardan
+etkilenmez (nginx örneği):
+
+    location ~ ^/(api/proxy/|api/search$|helix-d/search$|search-domain$) {
+        proxy_pass http://127.0.0.1:7073;
+        proxy_read_timeout 900s;
+        proxy_buffering off;    # helix-d akış modu
+    }
+    location / {
+        proxy_pass http://127.0.0.1:7072;
+    }
+
+Oturum çerezi her iki havuzda aynı SECRET_KEY ile doğrulanır.
+
+Metrikler (/metrics) worker'lar arasında toplanır: her worker değerlerini
+METRICS_MULTIPROC_DIR (varsayılan: geçici dizinde ``lapsus-metrics-<havuz>``)
+altındaki kendi dosyasına yazar, scrape hangi worker'a düşerse düşsün tüm
+dosyaları birleştirir. Dizin master başlarken temizlenir. İki havuz ayrı
+dizin kullanır; her biri ayrı scrape hedefidir. /debug/queries worker
+başına tutulur.
+
+Geliştirme sunucusu ile karşılaştırma (loadtest aracı, aynı stub upstream'ler):
+
+    python -m loadtest run --spawn-app --app-server dev \\
+        --scenarios dashboard account_search --users 20 --duration 60 --output dev.json
+    python -m loadtest run --spawn-app --app-server gunicorn \\
+        --scenarios dashboard account_search --users 20 --duration 60 --output gunicorn.json
+
+Karşılaştırılacak değerler: endpoint başına istek/sn, p95/p99 ve hata oranı.
+Aynı makinede, aynı veritabanı ve stub gecikmeleriyle çalıştırılmalıdır;
+kullanıcı sayısını worker sayısının birkaç katına çıkarmak geliştirme
+sunucusunun tek süreç sınırını görünür kılar.
+
+Ölçülen değerler (yukarıdaki komutlar, 1 CPU, varsayılan stub gecikmesi
+50±20 ms, veritabanına erişim yok - DB_HOST=127.0.0.1, bağlantı hemen
+reddedilir; hata oranı hepsinde %0):
+
+    sunucu                     toplam istek/sn   GET /api/search p50/p95/p99 ms
+    dev (thread'li)                 140.7             167 / 219 / 333
+    gunicorn (3 sync worker)         40.3             531 / 642 / 672
+    gunicorn-io (1 gevent)          123.5             171 / 251 / 1316
+
+Upstream bekleyen aramalar sync worker'ları kilitlediği için CPU havuzu
+bu yollarda en yavaşıdır; G/Ç havuzu geliştirme sunucusuna yakındır
+(tek worker'daki ara duraklamalar p99'u yükseltir). G/Ç yollarının ayrı
+havuza yönlendirilmesi bu yüzdendir. Gerçek veritabanı ve çok çekirdekli
+makinede ölçülmemiştir; CPU'ya bağlı yollarda sonuç farklı olabilir.
+"""
+import multiprocessing
+import os
+import tempfile
+
+pool = os.getenv('GUNICORN_POOL', 'cpu')
+
+if pool == 'io':
+    # Uygulama (preload) yüklenmeden önce; aksi halde master'da açılan
+    # socket ve lock'lar patch'lenmemiş kalır
+    from gevent import monkey
+    monkey.patch_all()
+    os.environ.setdefault('DB_USE_PURE', 'true')
+
+# Uygulama config'i okunmadan önce; /metrics tüm worker'ların toplamını verir
+os.environ.setdefault('METRICS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), f'lapsus-metrics-{pool}'))
+
+
+def _env(name, default, cast=int):
+    value = os.getenv(name)
+    return cast(value) if value not in (None, '') else default
+
+
+bind = os.getenv('GUNICORN_BIND', f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '7072')}")
+threads = _env('GUNICORN_THREADS', 1)
+if pool == 'io':
+    # Beklemeler süreç değil green thread tüketir; CPU başına bir worker yeterli
+    workers = _env('GUNICORN_WORKERS', multiprocessing.cpu_count())
+    worker_class = 'gevent'
+    worker_connections = _env('GUNICORN_WORKER_CONNECTIONS', 1000)
+else:
+    workers = _env('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+max_requests = _env('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+timeout = _env('GUNICORN_TIMEOUT', int(float(os.getenv('REQUEST_MAX_BUDGET', 900))) + 30)
+graceful_timeout = _env('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env('GUNICORN_KEEPALIVE', 5)
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+proc_name = f'lapsus-{pool}'
+
+
+def on_starting(server):
+    """Önceki çalıştırmadan kalan worker metrik dosyalarını sil"""
+    directory = os.environ['METRICS_MULTIPROC_DIR']
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+
+
+def when_ready(server):
+    """Master hazır: başlangıç kontrollerini bir kez çalıştır"""
+    from wsgi import startup_checks
+    startup_checks()
+    server.log.info(f"🚀 Lapsus gunicorn: {workers} worker ({worker_class}), {bind}")
+
+
+def post_fork(server, worker):
+    """Her worker'da fork sonrası süreç kaynaklarını yenile"""
+    from wsgi import reinit_after_fork
+    reinit_after_fork()
+    server.log.info(f"👷 Worker {worker.pid} hazır")
+
+
+def worker_exit(server, worker):
+    """Çıkan worker'ın son metrik değerlerini dosyasına yaz"""
+    from metrics import registry
+    registry.flush()
+
+
+def worker_abort(worker):
+    worker.log.warning(f"⏰ Worker {worker.pid} timeout nedeniyle sonlandırıldı")
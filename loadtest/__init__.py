@@ -0,0 +1,22 @@
+"""Flask uygulaması için HTTP yük testi aracı
+
+Dış API'lerin (API_CONFIG ve API2_CONFIG) yerine gecikme, hata ve zaman
+aşımı enjekte edilebilen yerel stub sunucular başlatır; uygulamanın
+gerçek endpoint'lerini senaryolu kullanıcı oturumlarıyla çalıştırır.
+
+Kullanım (repo kökünden):
+
+    # Stub'ları başlat, uygulamayı onlara yönlendirerek ayağa kaldır ve 60 sn yük üret
+    python -m loadtest run --spawn-app --users 20 --duration 60
+
+    # Yavaş API2 altında davranış
+    python -m loadtest run --spawn-app --api2-latency 5 --api2-timeout-rate 0.1 \\
+        --app-env API_TIMEOUT=10
+
+    # Geliştirme sunucusu ile gunicorn karşılaştırması (dashboard ve arama)
+    python -m loadtest run --spawn-app --app-server dev --scenarios dashboard account_search --output dev.json
+    python -m loadtest run --spawn-app --app-server gunicorn --scenarios dashboard account_search --output gunicorn.json
+
+    # Yalnızca stub'lar (uygulama elle API_BASE_URL / API2_BASE_URL ile başlatılır)
+    python -m loadtest stubs
+"""
@@ -0,0 +1,164 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmarks.runner import save
+from loadtest import runner, scenarios
+from loadtest.stubs import FaultProfile, StubServer, api_routes, api2_routes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_stubs(args):
+    """API ve API2 stub sunucularını başlat"""
+    api = StubServer('api', api_routes(args.api_results, args.seed), FaultProfile(
+        args.api_latency, args.api_jitter, args.api_error_rate, args.api_timeout_rate, args.hang
+    ), port=args.api_port, seed=args.seed).start()
+    api2 = StubServer('api2', api2_routes(args.api2_records, args.seed), FaultProfile(
+        args.api2_latency, args.api2_jitter, args.api2_error_rate, args.api2_timeout_rate, args.hang
+    ), port=args.api2_port, seed=args.seed).start()
+    logging.info(f"🧪 API stub: {api.url}  API2 stub: {api2.url}")
+    return api, api2
+
+
+def spawn_app(args, api, api2):
+    """Uygulamayı stub'lara yönlendirilmiş ortamla alt süreç olarak başlat"""
+    env = dict(os.environ, API_BASE_URL=api.url, API2_BASE_URL=api2.url,
+               FLASK_PORT=str(args.app_port), FLASK_HOST='127.0.0.1', FLASK_DEBUG='false')
+    for item in args.app_env:
+        key, _, value = item.partition('=')
+        env[key] = value
+    if args.app_server in ('gunicorn', 'gunicorn-io'):
+        env['GUNICORN_POOL'] = 'io' if args.app_server == 'gunicorn-io' else 'cpu'
+        env['GUNICORN_BIND'] = f"127.0.0.1:{args.app_port}"
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    else:
+        command = [sys.executable, 'app.py']
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL if args.quiet_app else None,
+                               stderr=subprocess.STDOUT if args.quiet_app else None)
+    target = f"http://127.0.0.1:{args.app_port}"
+    for _ in range(int(args.app_startup_timeout * 4)):
+        if process.poll() is not None:
+            raise RuntimeError(f"Uygulama başlatılamadı (çıkış kodu {process.returncode})")
+        try:
+            requests.get(f"{target}/debug/health", timeout=1)
+            return process, target
+        except requests.RequestException:
+            time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Uygulama zamanında hazır olmadı")
+
+
+def cmd_stubs(args):
+    api, api2 = start_stubs(args)
+    print(f"export API_BASE_URL={api.url}")
+    print(f"export API2_BASE_URL={api2.url}")
+    print("Ayarları değiştirmek için: curl -XPOST <stub>/__stub/faults -d '{\"latency\": 2}'")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.stop()
+        api2.stop()
+    return 0
+
+
+def cmd_run(args):
+    api = api2 = process = None
+    target = args.target
+    try:
+        if args.spawn_app or args.stubs:
+            api, api2 = start_stubs(args)
+        if args.spawn_app:
+            process, target = spawn_app(args, api, api2)
+
+        report = runner.run_load(
+            target, {'username': args.username, 'password': args.password},
+            users=args.users, duration=args.duration, ramp_up=args.ramp_up,
+            names=args.scenarios, seed=args.seed, think_time=args.think_time, timeout=args.timeout
+        )
+        report['target'] = target
+        if api:
+            report['upstreams'] = {
+                'api': dict(api.stats, faults=api.faults.to_dict()),
+                'api2': dict(api2.stats, faults=api2.faults.to_dict())
+            }
+    finally:
+        if process:
+            process.terminate()
+            process.wait(10)
+        for stub in (api, api2):
+            if stub:
+                stub.stop()
+
+    print(runner.format_report(report))
+    if 'upstreams' in report:
+        print(f"\nUpstream: {json.dumps(report['upstreams'], ensure_ascii=False)}")
+    if args.output:
+        save(report, args.output)
+        print(f"📄 Rapor: {args.output}")
+    return 0
+
+
+def add_stub_options(parser):
+    for name, label in (('api', 'API_CONFIG'), ('api2', 'API2_CONFIG')):
+        group = parser.add_argument_group(f"{label} stub")
+        group.add_argument(f'--{name}-port', type=int, default=0)
+        group.add_argument(f'--{name}-latency', type=float, default=0.05, help='Ek gecikme (sn)')
+        group.add_argument(f'--{name}-jitter', type=float, default=0.02, help='Gecikme sapması (± sn)')
+        group.add_argument(f'--{name}-error-rate', type=float, default=0.0, help='500 oranı (0-1)')
+        group.add_argument(f'--{name}-timeout-rate', type=float, default=0.0, help='--hang kadar bekletme oranı (0-1)')
+    parser.add_argument('--api-results', type=int, default=20, help='API arama sonucu başına kayıt')
+    parser.add_argument('--api2-records', type=int, default=200, help='API2 yanıtı başına kayıt')
+    parser.add_argument('--hang', type=float, default=30.0, help='Zaman aşımı enjeksiyonunda bekleme (sn)')
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description='Lapsus HTTP yük testi aracı')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    stubs = commands.add_parser('stubs', help='Yalnızca stub upstream sunucularını çalıştır')
+    add_stub_options(stubs)
+
+    run = commands.add_parser('run', help='Yük testini çalıştır')
+    run.add_argument('--target', default='http://127.0.0.1:7072', help='Uygulama adresi (--spawn-app yoksa)')
+    run.add_argument('--spawn-app', action='store_true', help="Stub'ları başlat ve app.py'yi onlara yönlendirerek çalıştır")
+    run.add_argument('--stubs', action='store_true', help="Uygulamayı başlatmadan stub'ları da çalıştır")
+    run.add_argument('--app-port', type=int, default=7099)
+    run.add_argument('--app-server', choices=['dev', 'gunicorn', 'gunicorn-io'], default='dev',
+                     help='--spawn-app için sunucu: Flask geliştirme sunucusu, gunicorn veya gunicorn G/Ç (gevent) havuzu')
+    run.add_argument('--app-env', action='append', default=[], metavar='KEY=VALUE',
+                     help='Başlatılan uygulamaya ek ortam değişkeni (örn. API_TIMEOUT=10)')
+    run.add_argument('--app-startup-timeout', type=float, default=30.0)
+    run.add_argument('--quiet-app', action='store_true', help='Uygulama çıktısını gizle')
+    run.add_argument('--users', type=int, default=10, help='Eşzamanlı sanal kullanıcı')
+    run.add_argument('--duration', type=float, default=60.0, help='Süre (sn)')
+    run.add_argument('--ramp-up', type=float, default=0.0, help='Kullanıcıların kademeli başlatılma süresi (sn)')
+    run.add_argument('--think-time', type=float, default=0.0, help='Adımlar arası ortalama bekleme (sn)')
+    run.add_argument('--timeout', type=float, default=60.0, help='İstemci istek timeout (sn)')
+    run.add_argument('--scenarios', nargs='+', choices=list(scenarios.SCENARIOS))
+    run.add_argument('--username', default=os.getenv('LOADTEST_USER', 'admin'))
+    run.add_argument('--password', default=os.getenv('LOADTEST_PASSWORD', 'admin123'))
+    run.add_argument('--output', help='Raporu JSON olarak kaydet')
+    add_stub_options(run)
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    args = build_parser().parse_args(argv)
+    return cmd_stubs(args) if args.command == 'stubs' else cmd_run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+
+from benchmarks.runner import percentile
+from loadtest import scenarios
+
+
+class Recorder:
+    """Endpoint başına gecikme, durum kodu ve hata kayıtları (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._statuses = defaultdict(Counter)
+        self._errors = Counter()
+        self.started = None
+        self.finished = None
+
+    def record(self, endpoint, latency, status, error=False):
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+            self._statuses[endpoint][str(status)] += 1
+            self._errors[endpoint] += bool(error)
+
+    def report(self):
+        """Endpoint başına throughput, yüzdelikler ve hata oranı"""
+        elapsed = max((self.finished or time.time()) - (self.started or time.time()), 1e-9)
+        endpoints = {}
+        with self._lock:
+            for endpoint, latencies in sorted(self._latencies.items()):
+                count = len(latencies)
+                endpoints[endpoint] = {
+                    'requests': count,
+                    'throughput_rps': round(count / elapsed, 2),
+                    'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+                    'p90_ms': round(percentile(latencies, 90) * 1000, 1),
+                    'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+                    'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+                    'max_ms': round(max(latencies) * 1000, 1),
+                    'error_rate': round(self._errors[endpoint] / count, 4),
+                    'statuses': dict(self._statuses[endpoint])
+                }
+        total = sum(stats['requests'] for stats in endpoints.values())
+        errors = sum(self._errors.values())
+        return {
+            'duration_seconds': round(elapsed, 1),
+            'total': {
+                'requests': total,
+                'throughput_rps': round(total / elapsed, 2),
+                'error_rate': round(errors / total, 4) if total else 0.0
+            },
+            'endpoints': endpoints
+        }
+
+
+class VirtualUser(threading.Thread):
+    """Giriş yapıp senaryoları sırayla çalıştıran sanal kullanıcı
+
+    Yönlendirmeler takip edilmez: oturum düşüp /login'e yönlendirilen
+    istekler başarı değil hata ('auth') olarak sayılır.
+    """
+
+    def __init__(self, index, target, credentials, recorder, stop_event, names,
+                 seed=1, think_time=0.0, timeout=60.0):
+        super().__init__(name=f"vu-{index}", daemon=True)
+        self.target = target.rstrip('/')
+        self.credentials = credentials
+        self.recorder = recorder
+        self.stop_event = stop_event
+        self.names = names
+        self.rng = scenarios.new_rng(seed, index)
+        self.think_time = think_time
+        self.timeout = timeout
+        self.state = {}
+        self.session = requests.Session()
+
+    def login(self):
+        started = time.perf_counter()
+        try:
+            response = self.session.post(f"{self.target}/login", data=self.credentials,
+                                         allow_redirects=False, timeout=self.timeout)
+            ok = response.status_code == 302 and '/login' not in response.headers.get('Location', '')
+            self.recorder.record('POST /login', time.perf_counter() - started, response.status_code, not ok)
+            return ok
+        except requests.RequestException as e:
+            self.recorder.record('POST /login', time.perf_counter() - started, type(e).__name__, True)
+            return False
+
+    def request(self, endpoint, method, path, kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.target}{path}", allow_redirects=False,
+                                            timeout=self.timeout, stream=True, **kwargs)
+            response.content
+            latency = time.perf_counter() - started
+        except requests.Timeout:
+            self.recorder.record(endpoint, time.perf_counter() - started, 'timeout', True)
+            return
+        except requests.RequestException as e:
+            self.recorder.record(endpoint, time.perf_counter() - started, type(e).__name__, True)
+            return
+
+        status = response.status_code
+        if status in (301, 302) and '/login' in response.headers.get('Location', ''):
+            status = 'auth'
+            self.state.pop('logged_in', None)
+        self.recorder.record(endpoint, latency, status, status == 'auth' or int(status) >= 400)
+
+        if endpoint == 'GET /leak-logs/api/list' and status == 200:
+            try:
+                results = response.json().get('results') or []
+                if results:
+                    self.state['leak_id'] = self.rng.choice(results).get('id')
+            except ValueError:
+                pass
+
+    def run(self):
+        while not self.stop_event.is_set():
+            if not self.state.get('logged_in'):
+                if not self.login():
+                    self.stop_event.wait(1.0)
+                    continue
+                self.state['logged_in'] = True
+            name = scenarios.pick(self.rng, self.names)
+            for endpoint, method, path, kwargs in scenarios.steps(name, self.rng, self.state):
+                if self.stop_event.is_set():
+                    break
+                self.request(endpoint, method, path, kwargs)
+                if self.think_time:
+                    self.stop_event.wait(self.rng.uniform(0, 2 * self.think_time))
+
+
+def run_load(target, credentials, users=10, duration=60, ramp_up=0.0, names=None,
+             seed=1, think_time=0.0, timeout=60.0, progress_interval=10):
+    """Belirtilen sürede ``users`` eşzamanlı sanal kullanıcı ile yük üret"""
+    names = names or list(scenarios.SCENARIOS)
+    recorder = Recorder()
+    stop_event = threading.Event()
+    recorder.started = time.time()
+    threads = []
+    for index in range(users):
+        user = VirtualUser(index, target, credentials, recorder, stop_event, names,
+                           seed=seed, think_time=think_time, timeout=timeout)
+        user.start()
+        threads.append(user)
+        if ramp_up and users > 1:
+            stop_event.wait(ramp_up / (users - 1))
+
+    deadline = recorder.started + duration
+    while time.time() < deadline:
+        stop_event.wait(min(progress_interval, max(deadline - time.time(), 0)))
+        total = recorder.report()['total']
+        logging.info(f"📈 {total['requests']} istek, {total['throughput_rps']} istek/sn, hata %{total['error_rate'] * 100:.1f}")
+
+    stop_event.set()
+    for user in threads:
+        user.join(timeout)
+    recorder.finished = time.time()
+    report = recorder.report()
+    report['config'] = {'users': users, 'duration': duration, 'ramp_up': ramp_up,
+                        'scenarios': names, 'think_time': think_time, 'timeout': timeout}
+    return report
+
+
+def format_report(report):
+    """Raporu tablo olarak hazırla"""
+    lines = [f"{'endpoint':<34} {'istek':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'hata%':>7}"]
+    for endpoint, stats in report['endpoints'].items():
+        lines.append(
+            f"{endpoint:<34} {stats['requests']:>7} {stats['throughput_rps']:>8.2f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+            f"{stats['error_rate'] * 100:>7.1f}"
+        )
+    total = report['total']
+    lines.append(f"\nToplam: {total['requests']} istek, {total['throughput_rps']} istek/sn, "
+                 f"hata %{total['error_rate'] * 100:.1f} ({report['duration_seconds']}s)")
+    return '\n'.join(lines)
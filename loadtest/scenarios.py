@@ -0,0 +1,68 @@
+import random
+
+# Kullanıcı senaryoları: (ağırlık, adım listesi)
+# Her adım: (metrik adı, HTTP metodu, yol, istek argümanları üreten fonksiyon)
+SEARCH_TERMS = ['gmail', 'hotmail', 'facebook', 'turkiye.gov', 'trendyol', 'garanti', 'edu.tr', 'netflix']
+HELIX_DOMAINS = ['gmail.com', 'hotmail.com', 'trendyol.com', 'turkiye.gov.tr', 'sahibinden.com']
+
+
+def _search(rng):
+    return {'params': {'q': rng.choice(SEARCH_TERMS), 'page': rng.randint(1, 3), 'limit': 20}}
+
+
+def _leak_list(rng):
+    return {'params': {'page': rng.randint(1, 5), 'limit': 50}}
+
+
+def _leak_search(rng):
+    return {'params': {'q': rng.choice(SEARCH_TERMS), 'limit': 50}}
+
+
+def _helix(rng):
+    return {'json': {'domain': rng.choice(HELIX_DOMAINS)}}
+
+
+def _helix_stream(rng):
+    return {'json': {'domain': rng.choice(HELIX_DOMAINS), 'stream': True, 'limit': 500}}
+
+
+SCENARIOS = {
+    'dashboard': (3, [
+        ('GET /', 'GET', '/', None)
+    ]),
+    'account_search': (4, [
+        ('GET /api/search', 'GET', '/api/search', _search),
+        ('GET /api/search', 'GET', '/api/search', _search)
+    ]),
+    'leak_logs': (3, [
+        ('GET /leak-logs/api/list', 'GET', '/leak-logs/api/list', _leak_list),
+        ('GET /leak-logs/api/search', 'GET', '/leak-logs/api/search', _leak_search),
+        ('GET /leak-logs/api/detail', 'GET', '/leak-logs/api/detail/{leak_id}', None)
+    ]),
+    'helix_d': (2, [
+        ('POST /helix-d/search', 'POST', '/helix-d/search', _helix)
+    ]),
+    'helix_d_stream': (1, [
+        ('POST /helix-d/search (stream)', 'POST', '/helix-d/search', _helix_stream)
+    ])
+}
+
+
+def pick(rng, names):
+    """Ağırlığa göre senaryo seç"""
+    return rng.choices(names, [SCENARIOS[name][0] for name in names])[0]
+
+
+def steps(name, rng, state):
+    """Senaryo adımlarını (ad, metot, yol, requests argümanları) olarak üret
+
+    ``state`` kullanıcıya ait değerleri taşır (örn. listeden alınan leak_id);
+    adımlar tembel üretildiği için önceki adımın yanıtı sonrakine yansır.
+    """
+    for metric, method, path, build in SCENARIOS[name][1]:
+        kwargs = build(rng) if build else {}
+        yield metric, method, path.format(leak_id=state.get('leak_id') or rng.randint(1, 1000)), kwargs
+
+
+def new_rng(seed, user_index):
+    return random.Random(f"{seed}:{user_index}")
@@ -0,0 +1,179 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FaultProfile:
+    """Stub yanıtlarına eklenen gecikme, hata ve zaman aşımı ayarları
+
+    - latency / jitter: her yanıta eklenen bekleme (saniye, jitter ± rastgele)
+    - error_rate: 500 döndürülen isteklerin oranı (0-1)
+    - timeout_rate: ``hang`` saniye bekletilip öyle yanıtlanan isteklerin oranı
+      (istemci timeout'u bundan kısaysa zaman aşımı olarak görünür)
+    """
+
+    FIELDS = ('latency', 'jitter', 'error_rate', 'timeout_rate', 'hang')
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, timeout_rate=0.0, hang=30.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+
+    def update(self, values):
+        for field in self.FIELDS:
+            if field in values:
+                setattr(self, field, float(values[field]))
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def decide(self, rng):
+        """Bu istek için (bekleme süresi, hata mı) kararı"""
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            return self.hang, False
+        delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        return delay, roll < self.timeout_rate + self.error_rate
+
+
+class StubServer:
+    """Arka planda çalışan, fault enjeksiyonlu sahte upstream
+
+    Çalışma sırasında ``POST /__stub/faults`` ile ayarlar değiştirilebilir,
+    ``GET /__stub/stats`` istek sayaçlarını döndürür.
+    """
+
+    def __init__(self, name, routes, faults=None, host='127.0.0.1', port=0, seed=None):
+        self.name = name
+        self.routes = routes
+        self.faults = faults or FaultProfile()
+        self.stats = {'requests': 0, 'errors': 0, 'hangs': 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"stub-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _decide(self):
+        with self._lock:
+            delay, error = self.faults.decide(self._rng)
+            self.stats['requests'] += 1
+            self.stats['errors'] += error
+            self.stats['hangs'] += delay >= self.faults.hang
+        return delay, error
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == '/__stub/stats':
+                    return self._send(200, dict(stub.stats, faults=stub.faults.to_dict()))
+                handler = stub.routes.get(url.path) or stub.routes.get(url.path.rsplit('/', 1)[0] + '/<id>')
+                if handler is None:
+                    return self._send(404, {'error': f"Stub route yok: {url.path}"})
+                delay, error = stub._decide()
+                if delay:
+                    time.sleep(delay)
+                if error:
+                    return self._send(500, {'error': 'Enjekte edilmiş stub hatası'})
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                self._send(200, handler(query, url.path))
+
+            def do_POST(self):
+                if urlparse(self.path).path != '/__stub/faults':
+                    return self.do_GET()
+                length = int(self.headers.get('Content-Length') or 0)
+                stub.faults.update(json.loads(self.rfile.read(length) or b'{}'))
+                self._send(200, stub.faults.to_dict())
+
+        return Handler
+
+
+def _fake_accounts(rng, count, query=''):
+    domain = query if '.' in query else f"{query or 'example'}.com"
+    return [{
+        'id': rng.randint(1, 10_000_000),
+        'domain': domain,
+        'username': f"user{rng.randint(1, 99999)}@{domain}",
+        'password': f"p{rng.getrandbits(32):x}",
+        'region': rng.choice(['TR', 'US', 'DE']),
+        'source': rng.choice(['TXT', 'Telegram', 'Stealer']),
+        'category': 'uncategorized',
+        'date': '2025-01-01T00:00:00'
+    } for _ in range(count)]
+
+
+def api_routes(results=20, seed=None):
+    """API_CONFIG upstream'inin (api_utils.APIManager) kullandığı endpoint'ler"""
+    rng = random.Random(seed)
+
+    def search(query, path):
+        limit = int(query.get('limit', results))
+        return {
+            'success': True,
+            'results': _fake_accounts(rng, min(limit, results), query.get('q', '')),
+            'pagination': {'page': int(query.get('page', 1)), 'pages': 10, 'total': results * 10,
+                           'has_next': True, 'has_prev': False},
+            'debug': {'data_source': 'stub_api'}
+        }
+
+    return {
+        '/api/search': search,
+        '/api/accounts': search,
+        '/api/accounts/<id>': lambda query, path: _fake_accounts(rng, 1)[0],
+        '/api/stats': lambda query, path: {'success': True, 'total_accounts': results * 1000, 'unique_domains': 500},
+        '/api/health': lambda query, path: {'status': 'ok'}
+    }
+
+
+def api2_routes(records=200, seed=None):
+    """API2_CONFIG upstream'inin (routes/api2_search.py) kullandığı /search endpoint'i"""
+    rng = random.Random(seed)
+
+    def search(query, path):
+        domain = query.get('domain', 'example.com')
+        return {
+            'domain': domain,
+            'start_date': query.get('start_date'),
+            'end_date': query.get('end_date'),
+            'results': _fake_accounts(rng, records, domain)
+        }
+
+    return {'/search': search}
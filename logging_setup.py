@@ -0,0 +1,280 @@
+"""Kuyruk tabanlı, yapılandırılmış loglama
+
+İstek thread'i yalnızca kaydı kuyruğa bırakır (QueueHandler); biçimlendirme
+ve dosya/konsol yazımı arka plandaki QueueListener thread'inde yapılır.
+
+- JSON kayıtlar: ts, level, logger, msg, request_id ve ``extra`` alanları
+- Tembel biçimlendirme: ``logging.info("... %s", value)`` mesajı yalnızca
+  seviye ve örnekleme filtrelerinden geçen kayıtlar için birleştirilir
+  (çağrı anındaki değerlerle, istek thread'inde); JSON/metin biçimlendirme
+  ve yazma listener thread'inde yapılır
+- Örnekleme: INFO ve altı kayıtların ``sample_rate`` oranı tutulur; karar
+  request id'ye göre verildiği için bir isteğin satırları birlikte kalır.
+  WARNING ve üstü hiçbir zaman elenmez
+- Rotasyon: boyut (max_bytes) veya zaman (when='midnight' vb.)
+- Kuyruk dolarsa kayıt beklemeden düşürülür ve sayılır (stats())
+
+Birden fazla süreç (gunicorn worker'ları) aynı dosyaya rotasyonla yazamaz;
+bu durumda dosya adında ``{pid}`` kullanın veya yalnızca konsola yazın.
+Fork sonrası listener thread'i çocuk süreçte otomatik yeniden başlatılır.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - [%(request_id)s] %(name)s - %(message)s'
+
+# LogRecord'un kendi alanları; bunların dışındakiler ``extra`` olarak yazılır
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id', 'sample'}
+
+_request_id = ContextVar('request_id', default=None)
+_pipeline = None
+
+
+# =====================================
+# İSTEK KİMLİĞİ
+# =====================================
+
+def new_request_id():
+    return uuid.uuid4().hex[:16]
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def set_request_id(value=None):
+    """Geçerli bağlam için request id ata; reset_request_id için token döner"""
+    return _request_id.set(value or new_request_id())
+
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+
+@contextmanager
+def request_context(value=None):
+    """Blok boyunca request id ata (bot komutları, arka plan işleri)"""
+    token = set_request_id(value)
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+# =====================================
+# FİLTRELER VE BİÇİMLENDİRİCİLER
+# =====================================
+
+class ContextFilter(logging.Filter):
+    """Kaydı üreten thread'de request id'yi kayda ekle"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = _request_id.get() or '-'
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """INFO ve altı kayıtları ``rate`` oranında tut"""
+
+    def __init__(self, rate=1.0, max_level=logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record):
+        if self.rate >= 1.0 or record.levelno > self.max_level or getattr(record, 'sample', True) is False:
+            return True
+        request_id = getattr(record, 'request_id', '-')
+        if request_id != '-':
+            return zlib.crc32(request_id.encode()) % 10000 < self.rate * 10000
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Tek satırlık JSON kayıt"""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'pid': record.process,
+            'thread': record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc'] = record.exc_text
+        if record.stack_info:
+            payload['stack'] = record.stack_info
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """Kaydı yalnızca mesajı birleştirerek kuyruğa bırakan, kuyruk doluysa düşüren handler
+
+    prepare() filtrelerden sonra çalışır: elenen kayıtların mesajı hiç
+    birleştirilmez. Geçen kayıtlarda ``msg % args`` burada yapılır; böylece
+    değiştirilebilir argümanlar çağrı anındaki haliyle yazılır ve listener
+    isteğe ait nesneleri başka thread'den okumaz. Standart prepare()'den
+    farkı, handler formatter'ının (JSON/metin) listener'a bırakılmasıdır.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Traceback ve çerçeveler istek thread'inde metne çevrilir
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# =====================================
+# PIPELINE
+# =====================================
+
+class LogPipeline:
+    """Kuyruk, kuyruk handler'ı ve arka plan listener'ı"""
+
+    def __init__(self, handlers, queue_size=10000, sample_rate=1.0, rebuild=None):
+        self.handlers = handlers
+        self.rebuild = rebuild
+        self.queue_size = queue_size
+        self.queue = queue.Queue(queue_size)
+        self.handler = LazyQueueHandler(self.queue)
+        self.handler.addFilter(ContextFilter())
+        self.handler.addFilter(SamplingFilter(sample_rate))
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+
+    def start(self):
+        self.listener.start()
+
+    def stop(self):
+        """Kuyruktaki kayıtları yazıp listener'ı durdur"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.handlers:
+            handler.flush()
+
+    def after_fork(self):
+        """Çocuk süreçte listener thread'i yoktur; yeni kuyruk ve listener kur"""
+        if self.rebuild is not None:
+            for handler in self.handlers:
+                handler.close()
+            self.handlers = self.rebuild()
+        self.queue = queue.Queue(self.queue_size)
+        self.handler.queue = self.queue
+        self.handler.dropped = 0
+        self.listener = QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stats(self):
+        return {'queued': self.queue.qsize(), 'queue_size': self.queue_size, 'dropped': self.handler.dropped}
+
+
+def _file_handler(path, max_bytes, backup_count, when):
+    path = path.format(pid=os.getpid())
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if when:
+        return TimedRotatingFileHandler(path, when=when, backupCount=backup_count, encoding='utf-8')
+    return RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+
+
+def _formatter(fmt, datefmt=None):
+    return JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT, datefmt)
+
+
+def configure(level='INFO', fmt='json', file=None, max_bytes=50 * 1024 * 1024, backup_count=5,
+              when='', console=True, console_level=None, console_format=None, file_level=None,
+              queue_size=10000, sample_rate=1.0, stream=None, quiet_loggers=(), datefmt=None):
+    """Root logger'ı kuyruk tabanlı pipeline'a bağla
+
+    Tekrar çağrılırsa önceki pipeline boşaltılıp kapatılır. Seviyeler
+    ('INFO' gibi) handler başına ayrı verilebilir; root seviyesi en düşüğüdür.
+    """
+    global _pipeline
+
+    def build_handlers():
+        handlers = []
+        if file:
+            file_handler = _file_handler(file, max_bytes, backup_count, when)
+            file_handler.setLevel(file_level or level)
+            file_handler.setFormatter(_formatter(fmt, datefmt))
+            handlers.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler(stream or sys.stderr)
+            console_handler.setLevel(console_level or level)
+            console_handler.setFormatter(_formatter(console_format or fmt, datefmt))
+            handlers.append(console_handler)
+        return handlers
+
+    handlers = build_handlers()
+
+    root = logging.getLogger()
+    if _pipeline is not None:
+        root.removeHandler(_pipeline.handler)
+        _pipeline.stop()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    # Dosya adı süreç kimliği içeriyorsa fork sonrası her süreç kendi dosyasını açar
+    rebuild = build_handlers if file and '{pid}' in file else None
+    _pipeline = LogPipeline(handlers, queue_size, sample_rate, rebuild)
+    root.addHandler(_pipeline.handler)
+    root.setLevel(min((handler.level for handler in handlers), default=logging.getLevelName(level)))
+    for name in quiet_loggers:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    _pipeline.start()
+    return _pipeline
+
+
+def stats():
+    """Kuyruk doluluğu ve düşürülen kayıt sayısı"""
+    return _pipeline.stats() if _pipeline is not None else None
+
+
+def _after_fork_in_child():
+    if _pipeline is not None:
+        _pipeline.after_fork()
+
+
+def _shutdown():
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+atexit.register(_shutdown)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
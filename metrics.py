@@ -0,0 +1,432 @@
+import os
+import re
+import json
+import time
+import atexit
+import logging
+import threading
+from bisect import bisect_left
+from flask import g, request, has_request_context
+
+try:
+    import fcntl
+except ImportError:  # Windows: çok süreçli mod kullanılmaz
+    fcntl = None
+
+# Varsayılan süre kovaları (saniye)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Etiketli metrik tabanı; her örnek tek bir lock ile güncellenir"""
+
+    kind = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: {len(self.labelnames)} etiket bekleniyordu")
+        return tuple(str(label) for label in labels)
+
+    def render(self, values=None):
+        """Metin çıktısı; ``values`` verilirse (birleştirilmiş değerler) onlar yazılır"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+    def snapshot(self):
+        """JSON'a yazılabilir [etiketler..., değer] listesi"""
+        with self._lock:
+            return [list(key) + [value] for key, value in self._values.items()]
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    @staticmethod
+    def combine(left, right):
+        return left + right
+
+
+class Counter(_Metric):
+    """Yalnızca artan sayaç"""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Artıp azalabilen anlık değer"""
+
+    kind = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Sabit kovalı histogram (kova sayaçları, toplam ve adet)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [list(key) + [[list(state[0]), state[1], state[2]]] for key, state in self._values.items()]
+
+    @staticmethod
+    def combine(left, right):
+        return [[a + b for a, b in zip(left[0], right[0])], left[1] + right[1], left[2] + right[2]]
+
+    def _render_sample(self, key, state):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MultiprocessStore:
+    """Gunicorn worker'ları için dosya tabanlı metrik birleştirme
+
+    Her süreç kendi değerlerini ``<dizin>/<pid>.json`` dosyasına periyodik
+    olarak ve çıkışta yazar; /metrics'e düşen worker kendi dosyasını
+    tazeleyip tüm dosyaları toplar. Böylece hangi worker'a düşerse düşsün
+    scrape aynı toplamı görür ve sayaçlar geri gitmez.
+
+    - Sayaç ve histogramlar ölen worker'ların son değerleriyle birlikte
+      toplanır; ölen worker dosyaları ``archive.json`` içine katlanıp silinir
+      (max_requests ile yenilenen worker'lar dosya biriktirmez)
+    - Gauge'lar yalnızca yaşayan süreçlerden toplanır
+    """
+
+    ARCHIVE = 'archive'
+
+    def __init__(self, directory, interval=5.0):
+        self.directory = directory
+        self.interval = interval
+        self._thread = None
+        self._pid = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, name, data):
+        path = self._path(name)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp, path)
+
+    def flush(self, registry):
+        """Bu sürecin değerlerini dosyasına yaz"""
+        try:
+            self._write(os.getpid(), registry.snapshot())
+        except OSError as e:
+            logging.warning("Metrik dosyası yazılamadı: %s", e)
+
+    def start(self, registry):
+        """Periyodik yazıcı thread'i başlat (fork sonrası çocukta tekrar çağrılır)"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(self.interval)
+                self.flush(registry)
+
+        self._thread = threading.Thread(target=run, name='metrics-flush', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def _merge(target, snapshot, metrics, kinds):
+        for name, samples in snapshot.items():
+            metric = metrics.get(name)
+            if metric is None or metric.kind not in kinds:
+                continue
+            values = target.setdefault(name, {})
+            for sample in samples:
+                key, value = tuple(sample[:-1]), sample[-1]
+                values[key] = metric.combine(values[key], value) if key in values else value
+
+    def collect(self, registry):
+        """Tüm süreçlerin değerleri: {metrik adı: {etiketler: değer}}"""
+        self.flush(registry)
+        metrics = {metric.name: metric for metric in registry.metrics}
+        cumulative = ('counter', 'histogram')
+        archived = {}
+        live = []
+        with open(os.path.join(self.directory, 'archive.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self._merge(archived, self._read(self._path(self.ARCHIVE)) or {}, metrics, cumulative)
+            dead = []
+            for name in os.listdir(self.directory):
+                stem = name[:-5] if name.endswith('.json') else ''
+                if not stem.isdigit():
+                    continue
+                snapshot = self._read(os.path.join(self.directory, name))
+                if snapshot is None:
+                    continue
+                if self._alive(int(stem)):
+                    live.append(snapshot)
+                else:
+                    # Ölen worker: sayaçları arşive katlanır, gauge'ları düşer
+                    self._merge(archived, snapshot, metrics, cumulative)
+                    dead.append(name)
+            if dead:
+                self._write(self.ARCHIVE, {
+                    name: [list(key) + [value] for key, value in values.items()]
+                    for name, values in archived.items()
+                })
+                for name in dead:
+                    os.remove(os.path.join(self.directory, name))
+
+        merged = archived
+        for snapshot in live:
+            self._merge(merged, snapshot, metrics, ('counter', 'histogram', 'gauge'))
+        return merged
+
+
+class Registry:
+    """Metriklerin kayıt sırası ile Prometheus metin formatında çıktısı
+
+    ``configure_multiprocess`` çağrılmışsa çıktı tüm worker'ların toplamıdır.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self.store = None
+
+    @property
+    def metrics(self):
+        return list(self._metrics)
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+    def configure_multiprocess(self, directory, interval=5.0):
+        """Worker başına dosyalarla süreçler arası toplamayı aç"""
+        self.store = MultiprocessStore(directory, interval)
+        self.store.start(self)
+        atexit.register(self.flush)
+
+    def flush(self):
+        if self.store is not None:
+            self.store.flush(self)
+
+    def render(self):
+        merged = self.store.collect(self) if self.store is not None else None
+        lines = []
+        for metric in self._metrics:
+            if merged is None:
+                lines.extend(metric.render())
+            else:
+                lines.extend(metric.render(merged.get(metric.name, {})))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# HTTP
+HTTP_REQUESTS = registry.counter(
+    'lapsus_http_requests_total', 'HTTP istek sayısı', ('endpoint', 'method', 'status'))
+HTTP_DURATION = registry.histogram(
+    'lapsus_http_request_duration_seconds', 'HTTP istek süresi', ('endpoint', 'method'))
+HTTP_IN_FLIGHT = registry.gauge(
+    'lapsus_http_requests_in_flight', 'İşlenmekte olan HTTP istekleri')
+HTTP_RESPONSE_SIZE = registry.histogram(
+    'lapsus_http_response_size_bytes', 'Yanıt gövdesi boyutu (stream yanıtlar hariç)',
+    ('endpoint',), SIZE_BUCKETS)
+
+# Veritabanı
+DB_QUERIES = registry.counter(
+    'lapsus_db_queries_total', 'Endpoint başına SQL sorgu sayısı', ('endpoint', 'outcome'))
+DB_DURATION = registry.histogram(
+    'lapsus_db_query_duration_seconds', 'SQL sorgu süresi (execute + fetch)', ('endpoint',))
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    'lapsus_db_queries_per_request', 'Bir istekte çalışan SQL sorgu sayısı', ('endpoint',), COUNT_BUCKETS)
+
+# Dış API çağrıları
+UPSTREAM_DURATION = registry.histogram(
+    'lapsus_upstream_request_duration_seconds', 'API/API2 çağrı süresi',
+    ('upstream', 'operation', 'outcome'))
+
+# Kabul kontrolü (admission)
+ADMISSION_IN_FLIGHT = registry.gauge(
+    'lapsus_admission_in_flight', 'Kabul edilip çalışan istekler', ('endpoint_class',))
+ADMISSION_QUEUED = registry.gauge(
+    'lapsus_admission_queued', 'Eşzamanlılık slotu bekleyen istekler', ('endpoint_class',))
+ADMISSION_REJECTED = registry.counter(
+    'lapsus_admission_rejected_total', 'Reddedilen istekler', ('endpoint_class', 'reason'))
+ADMISSION_WAIT = registry.histogram(
+    'lapsus_admission_wait_seconds', 'Slot için kuyrukta bekleme süresi', ('endpoint_class',))
+
+
+def current_endpoint():
+    """Metrik etiketi olarak aktif endpoint; istek dışında 'background'"""
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+
+def observe_db_query(duration, ok=True):
+    """Bir SQL sorgusunu endpoint etiketiyle ve istek sayaçlarına kaydet"""
+    endpoint = current_endpoint()
+    DB_QUERIES.inc(endpoint, 'ok' if ok else 'error')
+    DB_DURATION.observe(endpoint, value=duration)
+    if has_request_context():
+        g.db_query_count = g.get('db_query_count', 0) + 1
+        g.db_query_time = g.get('db_query_time', 0.0) + duration
+
+
+def observe_upstream(upstream, operation, duration, outcome):
+    """Dış API çağrısını kaydet (outcome: HTTP durum kodu veya hata türü)
+
+    Yoldaki sayısal id'ler ':id' ile değiştirilir, etiket sayısı sınırlı kalır.
+    """
+    operation = re.sub(r'/\d+(?=/|$)', '/:id', operation.split('?')[0])
+    UPSTREAM_DURATION.observe(upstream, operation, str(outcome), value=duration)
+
+
+def reinit_after_fork():
+    """Worker'da master'dan kopyalanan değerleri sıfırla ve dosya yazıcısını başlat"""
+    registry.reset()
+    if registry.store is not None:
+        registry.store.start(registry)
+
+
+def register_metrics(app, multiprocess_dir='', flush_interval=5.0):
+    """Tüm blueprint'ler için istek metrik hook'larını kaydet
+
+    ``multiprocess_dir`` verilirse değerler worker'lar arasında toplanır.
+    """
+    if multiprocess_dir and registry.store is None:
+        registry.configure_multiprocess(multiprocess_dir, flush_interval)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.db_query_count = 0
+        g.db_query_time = 0.0
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+        endpoint = current_endpoint()
+        HTTP_REQUESTS.inc(endpoint, request.method, response.status_code)
+        HTTP_DURATION.observe(endpoint, request.method, value=time.perf_counter() - started)
+        DB_QUERIES_PER_REQUEST.observe(endpoint, value=g.get('db_query_count', 0))
+        if not response.is_streamed:
+            HTTP_RESPONSE_SIZE.observe(endpoint, value=response.calculate_content_length() or 0)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if g.pop('metrics_started', None) is not None:
+            HTTP_IN_FLIGHT.dec()
@@ -0,0 +1,186 @@
+import re
+import time
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+
+_COMMENT_RE = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Sabitlerden arındırılmış, normalize SQL (aynı şekildeki sorgular aynı parmak izini alır)"""
+    text = _COMMENT_RE.sub(' ', sql)
+    text = _STRING_RE.sub('?', text)
+    text = _PLACEHOLDER_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = _IN_LIST_RE.sub('(?+)', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+def param_shape(params):
+    """Parametrelerin değer içermeyen şekli, örn: "like:%s%, str, int"
+
+    Baştaki % joker karakteri indeks kullanımını engellediği için ayrıca
+    işaretlenir.
+    """
+    if not params:
+        return ''
+    values = params.values() if isinstance(params, dict) else params
+    shape = []
+    for value in values:
+        if isinstance(value, str) and '%' in value:
+            prefix = '%' if value.startswith('%') else ''
+            suffix = '%' if value.endswith('%') else ''
+            shape.append(f"like:{prefix}s{suffix}")
+        else:
+            shape.append(type(value).__name__)
+    return ', '.join(shape)
+
+
+class QueryStats:
+    """Tek bir parmak izi için birikimli istatistikler"""
+
+    __slots__ = ('fingerprint', 'count', 'total', 'max', 'rows', 'slow_count',
+                 'callers', 'shapes', 'last_seen', 'explain', 'explained_at', 'full_scan')
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.slow_count = 0
+        self.callers = Counter()
+        self.shapes = Counter()
+        self.last_seen = 0.0
+        self.explain = None
+        self.explained_at = 0.0
+        self.full_scan = None
+
+    def to_dict(self):
+        return {
+            'fingerprint': self.fingerprint,
+            'count': self.count,
+            'total_seconds': round(self.total, 4),
+            'avg_seconds': round(self.total / self.count, 4) if self.count else 0.0,
+            'max_seconds': round(self.max, 4),
+            'avg_rows': round(self.rows / self.count, 1) if self.count else 0.0,
+            'slow_count': self.slow_count,
+            'callers': dict(self.callers.most_common(5)),
+            'param_shapes': dict(self.shapes.most_common(5)),
+            'last_seen': self.last_seen,
+            'full_scan': self.full_scan,
+            'explain': self.explain,
+            'explained_at': self.explained_at or None
+        }
+
+
+class QueryProfiler:
+    """Parmak izi başına sorgu istatistikleri ve yavaş sorgu EXPLAIN kaydı
+
+    Bellekte en fazla ``max_fingerprints`` parmak izi tutulur; dolunca
+    toplam süresi en düşük olan atılır. EXPLAIN, parmak izi başına
+    ``explain_interval`` saniyede bir ve toplamda dakikada en fazla
+    ``explain_per_minute`` kez çalıştırılır.
+    """
+
+    ORDERS = ('total', 'max', 'avg', 'count')
+
+    def __init__(self, slow_threshold=0.5, explain_interval=300, explain_per_minute=6,
+                 max_fingerprints=500):
+        self.slow_threshold = slow_threshold
+        self.explain_interval = explain_interval
+        self.explain_per_minute = explain_per_minute
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._explain_times = []
+
+    def record(self, sql, params, duration, rows, caller):
+        """Sorguyu kaydet; EXPLAIN alınması gerekiyorsa parmak izini döndür"""
+        key = fingerprint(sql)
+        now = time.time()
+        slow = duration >= self.slow_threshold
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    self._evict()
+                stats = self._stats[key] = QueryStats(key)
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            stats.rows += rows or 0
+            stats.callers[caller] += 1
+            stats.shapes[param_shape(params)] += 1
+            stats.last_seen = now
+            if not slow:
+                return None
+            stats.slow_count += 1
+            explain_due = self._explain_allowed(stats, now)
+
+        logging.warning(
+            f"🐢 Yavaş sorgu ({duration:.3f}s, {rows} satır) {caller}: {key[:200]} [{param_shape(params)}]"
+        )
+        return key if explain_due else None
+
+    def _evict(self):
+        victim = min(self._stats.values(), key=lambda stats: stats.total)
+        del self._stats[victim.fingerprint]
+
+    def _explain_allowed(self, stats, now):
+        if now - stats.explained_at < self.explain_interval:
+            return False
+        self._explain_times = [at for at in self._explain_times if now - at < 60]
+        if len(self._explain_times) >= self.explain_per_minute:
+            return False
+        self._explain_times.append(now)
+        stats.explained_at = now
+        return True
+
+    def store_explain(self, key, rows):
+        """EXPLAIN çıktısını sakla; tam tablo taraması varsa logla"""
+        plan = [{k: (v if isinstance(v, (int, float, str)) or v is None else str(v))
+                 for k, v in row.items()} for row in rows]
+        full_scan = any(row.get('type') == 'ALL' for row in plan)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                stats.explain = plan
+                stats.full_scan = full_scan
+        if full_scan:
+            tables = ', '.join(str(row.get('table')) for row in plan if row.get('type') == 'ALL')
+            logging.warning(f"🔎 Tam tablo taraması ({tables}): {key[:200]}")
+
+    def top(self, limit=20, order='total'):
+        """En pahalı parmak izleri"""
+        sort_keys = {
+            'total': lambda stats: stats.total,
+            'max': lambda stats: stats.max,
+            'avg': lambda stats: stats.total / stats.count if stats.count else 0.0,
+            'count': lambda stats: stats.count
+        }
+        with self._lock:
+            ranked = sorted(self._stats.values(), key=sort_keys[order], reverse=True)[:limit]
+            return [stats.to_dict() for stats in ranked]
+
+    def summary(self):
+        with self._lock:
+            return {
+                'fingerprints': len(self._stats),
+                'queries': sum(stats.count for stats in self._stats.values()),
+                'slow_queries': sum(stats.slow_count for stats in self._stats.values()),
+                'slow_threshold': self.slow_threshold
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._explain_times.clear()
@@ -3,6 +3,7 @@ import logging
 from auth import login_required
 from database import db
 from api_utils import api, formatter
+from admission import admit
 
 # Blueprint oluştur
 api_bp = Blueprint('api_bp', __name__, url_prefix='/api')
@@ -31,7 +32,7 @@ def proxy_search():
         api_response = api.search_accounts(query, page, limit, domain, region, source)
         
         # Log the search
-        logging.info(f"Arama yapıldı: '{query}' - Kullanıcı: {session.get('user_name')}")
+        logging.info("Arama yapıldı: '%s' - Kullanıcı: %s", query, session.get('user_name'))
         
         return jsonify(api_response)
         
@@ -174,14 +175,14 @@ def api_search():
                 'error': 'Arama sorgusu en az 2 karakter olmalıdır'
             }), 400
         
-        logging.info(f"API'den arama başlatılıyor: '{query}'")
+        logging.info("API'den arama başlatılıyor: '%s'", query)
         
         # API'den veri çek
         try:
             api_response = api.search_accounts(query, page, limit, domain_filter, region_filter, source_filter)
             
             # API yanıtını logla
-            logging.info(f"API arama başarılı: '{query}' - {len(api_response.get('results', []))} sonuç")
+            logging.info("API arama başarılı: '%s' - %d sonuç", query, len(api_response.get('results', [])))
             
             # Eğer API yanıtında debug bilgisi yoksa ekle
             if 'debug' not in api_response:
@@ -206,10 +207,11 @@ def api_search():
             'data_source': 'error'
         }), 500
 
+@admit('search')
 def fallback_database_search(query, page=1, limit=20, domain_filter='', region_filter='', source_filter=''):
     """API başarısız olduğunda veritabanından arama yap"""
     try:
-        logging.info(f"Fallback veritabanı araması başlatılıyor: '{query}'")
+        logging.info("Fallback veritabanı araması başlatılıyor: '%s'", query)
         
         # Veritabanından arama yap
         search_result = db.search_accounts(query, page, limit, domain_filter, region_filter, source_filter)
@@ -250,7 +252,7 @@ def fallback_database_search(query, page=1, limit=20, domain_filter='', region_f
             }
         }
         
-        logging.info(f"Fallback arama tamamlandı: '{query}' - {len(formatted_results)} sonuç")
+        logging.info("Fallback arama tamamlandı: '%s' - %d sonuç", query, len(formatted_results))
         return jsonify(response_data)
         
     except Exception as e:
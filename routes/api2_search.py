@@ -1,12 +1,54 @@
+import json
+import time
+import codecs
+import logging
 import requests
-from datetime import datetime
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Iterable
+from requests.adapters import HTTPAdapter
 from config import Config
+from deadline import Deadline, DeadlineExceeded, current_deadline
+from metrics import observe_upstream
 
 # API2 Config'i class'tan al
 API2_CONFIG = Config.API2_CONFIG
 
-def search_domain(domain: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[Any, Any]:
+# API2 yanıt nesnesinde kayıt listesini taşıyan alanlar; birden fazlası
+# varsa belgede ilk gelen kullanılır (akış ayrıştırıcısıyla aynı kural)
+RECORD_KEYS = ('results', 'data', 'records')
+
+# Parçalama (shard) granülariteleri, kabadan inceye
+SHARD_GRANULARITIES = ['month', 'week', 'day']
+
+_session = None
+
+def get_session() -> requests.Session:
+    """API2 için paylaşılan, connection pool'lu HTTP oturumu"""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=API2_CONFIG['pool_size'],
+            pool_maxsize=API2_CONFIG['pool_size']
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _session = session
+    return _session
+
+def reset_session():
+    """Paylaşılan oturumu kapat; bir sonraki istekte yenisi açılır
+    
+    Fork edilen worker'lar master'ın soketlerini paylaşmamalı.
+    """
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+
+def search_domain(domain: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  timeout: Optional[float] = None) -> Dict[Any, Any]:
     """
     Domain arama işlemi yapar
     
@@ -14,6 +56,7 @@ def search_domain(domain: str, start_date: Optional[str] = None, end_date: Optio
         domain: Aranacak domain (örn: app.szutest.com.tr, gmail.com)
         start_date: Başlangıç tarihi (YYYY-MM-DD formatında, opsiyonel)
         end_date: Bitiş tarihi (YYYY-MM-DD formatında, opsiyonel)
+        timeout: Bu deneme için timeout (saniye, varsayılan: API2 config)
     
     Returns:
         API'den dönen response
@@ -34,13 +77,16 @@ def search_domain(domain: str, start_date: Optional[str] = None, end_date: Optio
     if end_date:
         params['end_date'] = end_date
     
+    started = time.perf_counter()
+    outcome = 'error'
     try:
-        # API isteği gönder
-        response = requests.get(
+        # API isteği gönder (paylaşılan connection pool üzerinden)
+        response = get_session().get(
             url, 
             params=params, 
-            timeout=API2_CONFIG['timeout']
+            timeout=timeout or API2_CONFIG['timeout']
         )
+        outcome = response.status_code
         
         # Status code kontrolü
         response.raise_for_status()
@@ -48,40 +94,526 @@ def search_domain(domain: str, start_date: Optional[str] = None, end_date: Optio
         # JSON response'u döndür
         return response.json()
         
+    except requests.exceptions.Timeout as e:
+        outcome = 'timeout'
+        logging.warning("API isteği zaman aşımı: %s", e)
+        return {"error": str(e)}
     except requests.exceptions.RequestException as e:
-        print(f"API isteği sırasında hata: {e}")
+        logging.warning("API isteği sırasında hata: %s", e)
         return {"error": str(e)}
     except Exception as e:
-        print(f"Beklenmeyen hata: {e}")
+        logging.warning("Beklenmeyen hata: %s", e)
         return {"error": str(e)}
+    finally:
+        observe_upstream('api2', '/search', time.perf_counter() - started, outcome)
 
-def search_domain_with_retry(domain: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[Any, Any]:
+def search_domain_with_retry(domain: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                             deadline: Optional[Deadline] = None) -> Dict[Any, Any]:
     """
     Retry mekanizması ile domain arama
+    
+    Denemeler isteğin zaman bütçesini paylaşır: her deneme kalan bütçeyi
+    timeout olarak kullanır ve bütçe bitince yeni deneme yapılmaz.
     """
     max_retries = API2_CONFIG['max_retries']
+    deadline = deadline or current_deadline()
+    last_error = None
     
     for attempt in range(max_retries):
         try:
-            result = search_domain(domain, start_date, end_date)
+            timeout = deadline.timeout(API2_CONFIG['timeout'])
+        except DeadlineExceeded as e:
+            logging.warning("Deneme %d yapılmadı: %s", attempt + 1, e)
+            if last_error:
+                return {"error": f"{e} - son hata: {last_error}"}
+            return {"error": str(e)}
+        
+        try:
+            result = search_domain(domain, start_date, end_date, timeout=timeout)
             
             # Eğer error yoksa başarılı
             if "error" not in result:
                 return result
+            last_error = result["error"]
                 
             # Son deneme değilse tekrar dene
             if attempt < max_retries - 1:
-                print(f"Deneme {attempt + 1} başarısız, tekrar deneniyor...")
+                logging.warning("Deneme %d başarısız, tekrar deneniyor...", attempt + 1)
                 continue
             else:
                 return result
                 
         except Exception as e:
+            last_error = str(e)
             if attempt < max_retries - 1:
-                print(f"Deneme {attempt + 1} başarısız: {e}, tekrar deneniyor...")
+                logging.warning("Deneme %d başarısız: %s, tekrar deneniyor...", attempt + 1, e)
                 continue
             else:
                 return {"error": f"Tüm denemeler başarısız: {e}"}
+    
+    return {"error": last_error or "API2 isteği yapılmadı"}
+
+def _parse_date(value: str) -> datetime:
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def choose_granularity(start_date: str, end_date: str) -> str:
+    """Tarih aralığının uzunluğuna göre shard granülaritesi seç"""
+    days = (_parse_date(end_date) - _parse_date(start_date)).days + 1
+    if days <= 14:
+        return 'day'
+    if days <= 120:
+        return 'week'
+    return 'month'
+
+def split_date_range(start_date: str, end_date: str, granularity: str = 'auto') -> List[Tuple[str, str]]:
+    """
+    Tarih aralığını birbiriyle çakışmayan alt pencerelere böler
+    
+    Args:
+        start_date: Başlangıç tarihi (YYYY-MM-DD, dahil)
+        end_date: Bitiş tarihi (YYYY-MM-DD, dahil)
+        granularity: 'day', 'week', 'month' veya 'auto'
+    
+    Returns:
+        (başlangıç, bitiş) tarih çiftleri, ikisi de dahil
+    """
+    if granularity == 'auto':
+        granularity = choose_granularity(start_date, end_date)
+    if granularity not in SHARD_GRANULARITIES:
+        raise ValueError(f"Geçersiz granülarite: {granularity}")
+    
+    start = _parse_date(start_date)
+    end = _parse_date(end_date)
+    if start > end:
+        raise ValueError("start_date, end_date'ten sonra olamaz")
+    
+    shards = []
+    current = start
+    while current <= end:
+        if granularity == 'day':
+            next_start = current + timedelta(days=1)
+        elif granularity == 'week':
+            next_start = current + timedelta(days=7)
+        else:
+            # Bir sonraki ayın ilk günü
+            next_start = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        shard_end = min(next_start - timedelta(days=1), end)
+        shards.append((current.strftime('%Y-%m-%d'), shard_end.strftime('%Y-%m-%d')))
+        current = next_start
+    return shards
+
+def _finer_granularity(shard: Tuple[str, str]) -> Optional[str]:
+    """Başarısız bir shard'ı bölmek için bir alt granülarite; tek günse None"""
+    days = (_parse_date(shard[1]) - _parse_date(shard[0])).days + 1
+    if days <= 1:
+        return None
+    return 'day' if days <= 7 else 'week'
+
+def record_field(result: Any) -> Optional[str]:
+    """Yanıt nesnesinde kayıt listesini taşıyan ilk RECORD_KEYS alanı"""
+    if not isinstance(result, dict):
+        return None
+    return next((key for key, value in result.items()
+                 if key in RECORD_KEYS and isinstance(value, list)), None)
+
+def extract_records(result: Any) -> List[Any]:
+    """API2 yanıtından kayıt listesini çıkar"""
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict):
+        key = record_field(result)
+        if key:
+            return result[key]
+        return [result] if result else []
+    return []
+
+def _record_key(record: Any) -> str:
+    """Tekilleştirme anahtarı: id varsa id, yoksa kaydın kendisi"""
+    if isinstance(record, dict) and record.get('id') is not None:
+        return f"id:{record['id']}"
+    return json.dumps(record, sort_keys=True, default=str)
+
+def merge_records(record_lists: List[List[Any]]) -> List[Any]:
+    """Shard sonuçlarını sırayı koruyarak birleştir ve tekilleştir"""
+    seen = set()
+    merged = []
+    for records in record_lists:
+        for record in records:
+            key = _record_key(record)
+            if key not in seen:
+                seen.add(key)
+                merged.append(record)
+    return merged
+
+def _fetch_shard(domain: str, shard: Tuple[str, str], deadline: Deadline) -> Dict[str, Any]:
+    """Tek bir tarih penceresini kalan bütçe ile sorgula"""
+    try:
+        timeout = deadline.timeout(API2_CONFIG['timeout'])
+    except DeadlineExceeded as e:
+        return {"error": str(e)}
+    return search_domain(domain, shard[0], shard[1], timeout=timeout)
+
+def _merged_result(template: Any, records: List[Any], domain: str, start_date: str, end_date: str) -> Any:
+    """Birleştirilmiş kayıtları tek çağrı yanıtıyla aynı biçime koy"""
+    if isinstance(template, list):
+        return records
+    # Kayıt alanı olmayan nesne tek kayıt olarak sayılır; zarf yeniden kurulur
+    record_key = record_field(template)
+    envelope = dict(template) if record_key else {}
+    envelope.update({
+        "domain": domain,
+        "start_date": start_date,
+        "end_date": end_date,
+        record_key or 'results': records
+    })
+    return envelope
+
+def search_domain_sharded(domain: str, start_date: str, end_date: str, granularity: str = 'auto',
+                          deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """
+    Geniş tarih aralıklarını paralel alt pencerelerle arar
+    
+    Aralık günlük/haftalık/aylık parçalara bölünür ve paylaşılan connection
+    pool üzerinden eşzamanlı sorgulanır. Başlangıç granülaritesi aralığın
+    uzunluğundan tahmin edilir; ardından sonuç hacmine göre uyarlanır:
+    ``shard_split_records`` veya daha fazla kayıt dönen parça (upstream
+    sonuçları kırpmış olabilir) daha küçük pencerelerle yeniden sorgulanır,
+    kayıtlar tekilleştirilerek birleştirilir. Başarısız parçalar diğerlerini
+    tekrarlamadan tek başına yeniden denenir; birden fazla gün kapsayan
+    parçalar yeniden denenmeden önce daha küçük pencerelere bölünür.
+    
+    Returns:
+        result: tek çağrıyla aynı biçimde yanıt (upstream nesnesi, kayıt
+            alanı birleştirilmiş kayıtlarla değiştirilmiş)
+        shards: her pencere için kayıt sayısı (hacim nedeniyle bölünenler split)
+        failed_shards: tüm denemelere rağmen başarısız kalan pencereler
+    """
+    deadline = deadline or current_deadline()
+    pending = split_date_range(start_date, end_date, granularity)
+    split_at = API2_CONFIG['shard_split_records']
+    completed = {}
+    attempts = {}
+    errors = {}
+    split = set()
+    template = None
+    
+    with ThreadPoolExecutor(max_workers=API2_CONFIG['shard_workers']) as executor:
+        while pending and not deadline.expired():
+            futures = [
+                (shard, executor.submit(_fetch_shard, domain, shard, deadline))
+                for shard in pending
+            ]
+            pending = []
+            
+            for shard, future in futures:
+                result = future.result()
+                attempts[shard] = attempts.get(shard, 0) + 1
+                
+                if isinstance(result, dict) and "error" in result:
+                    errors[shard] = result["error"]
+                    logging.warning("Shard %s..%s başarısız: %s", shard[0], shard[1], result['error'])
+                    if attempts[shard] >= API2_CONFIG['max_retries']:
+                        continue
+                    
+                    # Büyük pencereyi böl, tek günlük pencereyi aynen tekrar dene
+                    finer = _finer_granularity(shard)
+                    if finer:
+                        errors.pop(shard)
+                        for sub_shard in split_date_range(shard[0], shard[1], finer):
+                            attempts[sub_shard] = attempts[shard]
+                            pending.append(sub_shard)
+                    else:
+                        pending.append(shard)
+                else:
+                    errors.pop(shard, None)
+                    completed[shard] = extract_records(result)
+                    if template is None:
+                        template = result
+                    
+                    # Kalabalık pencere: kayıtlar korunur, alt pencerelerle tamamlanır
+                    finer = _finer_granularity(shard)
+                    if split_at and finer and len(completed[shard]) >= split_at:
+                        split.add(shard)
+                        pending.extend(split_date_range(shard[0], shard[1], finer))
+    
+    for shard in pending:
+        errors.setdefault(shard, "Zaman bütçesi tükendi")
+    
+    ordered = sorted(completed)
+    return {
+        "result": _merged_result(template, merge_records([completed[shard] for shard in ordered]),
+                                 domain, start_date, end_date),
+        "shards": [
+            {"start_date": shard[0], "end_date": shard[1], "count": len(completed[shard]),
+             "split": shard in split}
+            for shard in ordered
+        ],
+        "failed_shards": [
+            {"start_date": shard[0], "end_date": shard[1], "error": error}
+            for shard, error in sorted(errors.items())
+        ]
+    }
+
+def parse_sharded(value: Any) -> Optional[bool]:
+    """Sorgu parametresi veya JSON'dan gelen sharded bayrağı; yoksa None (otomatik)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+def should_shard(start_date: Optional[str], end_date: Optional[str]) -> bool:
+    """Aralık, otomatik parçalama eşiğinden geniş mi?"""
+    if not start_date or not end_date:
+        return False
+    try:
+        days = (_parse_date(end_date) - _parse_date(start_date)).days + 1
+    except ValueError:
+        return False
+    return days > API2_CONFIG['shard_auto_days']
+
+def run_domain_search(domain: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      sharded: Optional[bool] = None, granularity: str = 'auto') -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """
+    Route'lar için ortak giriş noktası: tek çağrı veya parçalı arama
+    
+    Args:
+        sharded: True/False zorlar; None ise aralık genişliğine göre seçilir
+        granularity: Parçalı modda 'day', 'week', 'month' veya 'auto'
+    
+    Returns:
+        (sonuç, shard raporu) - tek çağrıda shard raporu None'dır
+    """
+    if sharded is None:
+        sharded = should_shard(start_date, end_date)
+    if not (sharded and start_date and end_date):
+        return search_domain_with_retry(domain, start_date, end_date), None
+    
+    if granularity == 'auto':
+        granularity = choose_granularity(start_date, end_date)
+    sharded_result = search_domain_sharded(domain, start_date, end_date, granularity)
+    report = {
+        "granularity": granularity,
+        "shards": sharded_result["shards"],
+        "failed_shards": sharded_result["failed_shards"]
+    }
+    if not sharded_result["shards"] and sharded_result["failed_shards"]:
+        first_error = sharded_result["failed_shards"][0]["error"]
+        return {"error": f"Tüm tarih parçaları başarısız: {first_error}"}, report
+    return sharded_result["result"], report
+
+class _NeedMoreData(Exception):
+    """Tampondaki veri bir sonraki JSON değerini çözmek için yetersiz"""
+
+_NO_RECORD = object()
+
+class StreamingRecordParser:
+    """
+    API2 yanıtını parça parça çözen artımlı JSON ayrıştırıcı
+    
+    Üst seviye bir dizinin (veya üst seviye nesnedeki RECORD_KEYS
+    alanlarından belgede ilk gelenin, extract_records ile aynı) elemanlarını çözüldükçe tek tek verir;
+    gövdenin tamamı bellekte tutulmaz. Diğer dizi alanları (örn. "tags")
+    bütün olarak çözülüp diğer alanlarla saklanır. Kayıt alanı olmayan
+    yanıtlar extract_records ile aynı şekilde tek kayıt olarak verilir.
+    """
+    
+    _WHITESPACE = ' \t\n\r'
+    
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._state = 'start'
+        self._in_object = False
+        self._streamed = False
+        self._fields = {}
+        self._eof = False
+    
+    def feed(self, text: str) -> Iterator[Any]:
+        """Yeni metin parçasını ekle ve tamamlanan kayıtları ver"""
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return self._drain()
+    
+    def close(self) -> Iterator[Any]:
+        """Akış bitti; kalan veriyi çöz"""
+        self._eof = True
+        return self._drain()
+    
+    def _skip_whitespace(self):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in self._WHITESPACE:
+            self._pos += 1
+        if self._pos >= len(self._buffer):
+            raise _NeedMoreData()
+        return self._buffer[self._pos]
+    
+    def _decode_value(self):
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            raise _NeedMoreData()
+        # Tampon sonunda kesilen sayı ("12" -> "123", "1." -> "1.5") devamını bekler
+        if isinstance(value, (int, float)) and not self._eof:
+            if end >= len(self._buffer) or self._buffer[end] in '.eE+-':
+                raise _NeedMoreData()
+        self._pos = end
+        return value
+    
+    def _drain(self) -> Iterator[Any]:
+        while self._state != 'done':
+            checkpoint = self._pos
+            try:
+                record = self._step()
+            except _NeedMoreData:
+                self._pos = checkpoint
+                if self._eof:
+                    raise ValueError("API2 yanıtı beklenmedik şekilde sona erdi")
+                return
+            if record is not _NO_RECORD:
+                yield record
+    
+    def _step(self):
+        if self._state == 'start':
+            char = self._skip_whitespace()
+            if char == '[':
+                self._pos += 1
+                self._state = 'array'
+            elif char == '{':
+                self._pos += 1
+                self._in_object = True
+                self._state = 'object'
+            else:
+                # Dizi veya nesne değil: tamamını tek değer olarak çöz
+                if not self._eof:
+                    raise _NeedMoreData()
+                self._state = 'done'
+                return self._decode_value()
+            return _NO_RECORD
+        
+        if self._state == 'array':
+            char = self._skip_whitespace()
+            if char == ',':
+                self._pos += 1
+                return _NO_RECORD
+            if char == ']':
+                self._pos += 1
+                self._state = 'object' if self._in_object else 'done'
+                return _NO_RECORD
+            return self._decode_value()
+        
+        # Nesne: ilk kayıt alanını akıt, diğer alanları sakla
+        char = self._skip_whitespace()
+        if char == ',':
+            self._pos += 1
+            return _NO_RECORD
+        if char == '}':
+            self._pos += 1
+            self._state = 'done'
+            if not self._streamed and self._fields:
+                return self._fields
+            return _NO_RECORD
+        key = self._decode_value()
+        if self._skip_whitespace() != ':':
+            raise ValueError("API2 yanıtında geçersiz JSON nesnesi")
+        self._pos += 1
+        if self._skip_whitespace() == '[' and not self._streamed and key in RECORD_KEYS:
+            self._streamed = True
+            self._pos += 1
+            self._state = 'array'
+            return _NO_RECORD
+        value = self._decode_value()
+        if not self._streamed:
+            self._fields[key] = value
+        return _NO_RECORD
+
+def iter_json_records(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Bayt parçalarından API2 kayıtlarını artımlı olarak çöz"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parser = StreamingRecordParser()
+    for chunk in chunks:
+        yield from parser.feed(decoder.decode(chunk))
+    yield from parser.feed(decoder.decode(b'', final=True))
+    yield from parser.close()
+
+def open_search_stream(domain: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                       deadline: Optional[Deadline] = None) -> requests.Response:
+    """
+    API2 aramasını stream=True ile başlat
+    
+    Yalnızca bağlantı ve yanıt başlıkları aşaması yeniden denenir; gövde
+    akmaya başladıktan sonra yeniden deneme yapılmaz. 4xx yanıtlar yeniden
+    denenmez, zaman aşımı ve 5xx yanıtlar denenir.
+    """
+    deadline = deadline or current_deadline()
+    params = {
+        'domain': domain,
+        'key': API2_CONFIG['api_key']
+    }
+    if start_date:
+        params['start_date'] = start_date
+    if end_date:
+        params['end_date'] = end_date
+    
+    # API_MAX_RETRIES=0 olsa da en az bir deneme yapılır
+    last_error = None
+    for attempt in range(max(1, API2_CONFIG['max_retries'])):
+        timeout = deadline.timeout(API2_CONFIG['timeout'])
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = get_session().get(
+                f"{API2_CONFIG['base_url']}/search",
+                params=params,
+                timeout=timeout,
+                stream=True
+            )
+            outcome = response.status_code
+            response.raise_for_status()
+            return response
+        except requests.exceptions.Timeout as e:
+            outcome = 'timeout'
+            last_error = e
+            logging.warning("Stream denemesi %d zaman aşımı: %s", attempt + 1, e)
+        except requests.exceptions.HTTPError as e:
+            # stream=True yanıtı kapatılmazsa bağlantı havuza dönmez
+            response.close()
+            if response.status_code < 500:
+                raise
+            last_error = e
+            logging.warning("Stream denemesi %d başarısız: %s", attempt + 1, e)
+        except requests.exceptions.RequestException as e:
+            last_error = e
+            logging.warning("Stream denemesi %d başarısız: %s", attempt + 1, e)
+        finally:
+            # Yalnızca yanıt başlıklarına kadar geçen süre; gövde akışı dahil değil
+            observe_upstream('api2', '/search:stream', time.perf_counter() - started, outcome)
+    raise last_error
+
+def stream_domain_records(response: requests.Response, offset: int = 0, limit: Optional[int] = None,
+                          deadline: Optional[Deadline] = None) -> Iterator[Any]:
+    """
+    Açık bir API2 yanıtından kayıtları çözüldükçe ver
+    
+    Args:
+        offset: Atlanacak kayıt sayısı (sunucu tarafı sayfa penceresi)
+        limit: En fazla verilecek kayıt sayısı; dolunca bağlantı kapatılır
+    """
+    emitted = 0
+    try:
+        for index, record in enumerate(iter_json_records(response.iter_content(chunk_size=65536))):
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded("Zaman bütçesi akış sırasında tükendi")
+            if index < offset:
+                continue
+            if limit is not None and emitted >= limit:
+                break
+            emitted += 1
+            yield record
+    finally:
+        response.close()
 
 # Test fonksiyonu - sadece manuel test için
 def example_usage():
@@ -1,8 +1,10 @@
-from flask import Blueprint, jsonify, session, current_app
+from flask import Blueprint, jsonify, session, current_app, request
 from datetime import datetime
 import logging
 from auth import login_required
 from database import db
+import logging_setup
+import admission
 
 # Blueprint oluştur
 debug_bp = Blueprint('debug_bp', __name__, url_prefix='/debug')
@@ -104,10 +106,51 @@ def health_check():
             'timestamp': datetime.now().isoformat(),
             'database': 'connected' if db_status else 'disconnected',
             'session_active': 'user_id' in session,
+            'logging': logging_setup.stats(),
+            'admission': admission.controller.stats(),
             'version': '1.0.0'
         })
     except Exception as e:
         return jsonify({
             'status': 'unhealthy',
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@debug_bp.route('/queries')
+@login_required
+def debug_queries():
+    """En yavaş / en pahalı SQL parmak izleri (sorgu profili)"""
+    if db.profiler is None:
+        return jsonify({
+            'success': False,
+            'error': 'Sorgu profili kapalı (QUERY_PROFILER_ENABLED=false)'
+        }), 404
+    
+    order = request.args.get('order', 'total')
+    if order not in db.profiler.ORDERS:
+        return jsonify({
+            'success': False,
+            'error': f"Geçersiz sıralama: {order}",
+            'orders': list(db.profiler.ORDERS)
+        }), 400
+    
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+    except ValueError:
+        limit = 20
+    
+    return jsonify({
+        'success': True,
+        'order': order,
+        'summary': db.profiler.summary(),
+        'queries': db.profiler.top(limit, order)
+    })
+
+@debug_bp.route('/queries/reset', methods=['POST'])
+@login_required
+def debug_queries_reset():
+    """Sorgu profilini sıfırla"""
+    if db.profiler is None:
+        return jsonify({'success': False, 'error': 'Sorgu profili kapalı'}), 404
+    db.profiler.reset()
+    return jsonify({'success': True})
@@ -1,4 +1,5 @@
-from flask import Blueprint, render_template, session, redirect, url_for, jsonify, request
+from flask import Blueprint, render_template, session, redirect, url_for, jsonify, request, Response, stream_with_context
+import json
 import logging
 
 # Blueprint oluştur
@@ -8,7 +9,9 @@ main_bp = Blueprint('main_bp', __name__)
 from auth import login_required
 from database import db
 from api_utils import formatter
-from routes.api2_search import search_domain_with_retry
+from routes.api2_search import run_domain_search, parse_sharded, open_search_stream, stream_domain_records
+from deadline import current_deadline, DeadlineExceeded
+from admission import admit
 
 
 @main_bp.route('/')
@@ -43,7 +46,7 @@ def dashboard():
             stats.update(total_stats)
             stats['categories'] = chart_data
             
-            logging.info(f"Dashboard verileri yüklendi: {len(categories)} kategori, toplam {total_count} kayıt")
+            logging.info("Dashboard verileri yüklendi: %d kategori, toplam %s kayıt", len(categories), total_count)
         else:
             error = "fetched_accounts tablosunda veri bulunamadı!"
             logging.warning("fetched_accounts tablosunda veri bulunamadı")
@@ -103,7 +106,7 @@ def leak_logs_page():
                 'author': log.get('author', 'Anonim')
             })
 
-        logging.info(f"🔥 LEAK LOGS - TÜM VERİLER YÜKLENDİ: {len(recent_data)} kayıt")
+        logging.info("🔥 LEAK LOGS - TÜM VERİLER YÜKLENDİ: %d kayıt", len(recent_data))
         
         return render_template('leak_logs.html', 
                              total_assets=total_assets,
@@ -131,6 +134,7 @@ def leak_logs_page():
 
 @main_bp.route('/leak-logs/api/all')
 @login_required
+@admit('bulk')
 def api_leak_logs_all():
     """🔥 TÜM LEAK LOGS VERİLERİNİ AL - LİMİT YOK"""
     try:
@@ -181,7 +185,7 @@ def api_leak_logs_all():
             }
         }
         
-        logging.info(f"🔥 TÜM leak logs başarılı - {len(formatted_results)} kayıt döndürüldü")
+        logging.info("🔥 TÜM leak logs başarılı - %d kayıt döndürüldü", len(formatted_results))
         return jsonify(response_data)
         
     except Exception as e:
@@ -193,6 +197,7 @@ def api_leak_logs_all():
 
 @main_bp.route('/leak-logs/api/list')
 @login_required
+@admit('bulk')
 def api_leak_logs_list():
     """Leak logs listesi API - ŞİMDİ LİMİTSİZ"""
     try:
@@ -250,6 +255,7 @@ def api_leak_logs_list():
 
 @main_bp.route('/leak-logs/api/search')
 @login_required
+@admit('search')
 def api_leak_logs_search():
     """Leak logs arama API - LİMİTSİZ"""
     try:
@@ -326,6 +332,18 @@ def helix_d_page():
                          user_name=session.get('user_name'),
                          user_role=session.get('user_role'))
 
+def _non_negative_int(value, default):
+    """JSON'dan gelen sayıyı doğrula; yoksa default, geçersizse None"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 else None
+
 @main_bp.route('/helix-d/search', methods=['POST'])
 @login_required
 def helix_d_search():
@@ -343,9 +361,30 @@ def helix_d_search():
                 "error": "Domain parametresi gerekli"
             }), 400
         
+        # Akış modu: kayıtlar çözüldükçe istemciye iletilir
+        if data.get('stream'):
+            offset = _non_negative_int(data.get('offset'), 0)
+            if offset is None:
+                return jsonify({
+                    "success": False,
+                    "error": "offset negatif olmayan bir tam sayı olmalıdır"
+                }), 400
+            limit = _non_negative_int(data.get('limit'), None)
+            if limit is None and data.get('limit') is not None:
+                return jsonify({
+                    "success": False,
+                    "error": "limit negatif olmayan bir tam sayı olmalıdır"
+                }), 400
+            logging.info("Helix-D akış araması başlatıldı: %s", domain)
+            return helix_d_stream(domain, start_date, end_date, offset, limit)
+        
         # API2 search çağır
-        logging.info(f"Helix-D arama başlatıldı: {domain}")
-        result = search_domain_with_retry(domain, start_date, end_date)
+        logging.info("Helix-D arama başlatıldı: %s", domain)
+        result, sharding = run_domain_search(
+            domain, start_date, end_date,
+            sharded=parse_sharded(data.get('sharded')),
+            granularity=data.get('granularity', 'auto')
+        )
         
         # Hata kontrolü
         if "error" in result:
@@ -353,21 +392,31 @@ def helix_d_search():
             return jsonify({
                 "success": False,
                 "error": result["error"],
-                "domain": domain
+                "domain": domain,
+                "timing": current_deadline().report()
             }), 500
         
         # Başarılı sonuç
-        logging.info(f"Helix-D arama başarılı: {domain}")
-        return jsonify({
+        logging.info("Helix-D arama başarılı: %s", domain)
+        response_data = {
             "success": True,
             "data": result,
             "domain": domain,
             "search_params": {
                 "start_date": start_date or "Belirtilmedi",
                 "end_date": end_date or "Belirtilmedi"
-            }
-        })
+            },
+            "timing": current_deadline().report()
+        }
+        if sharding:
+            response_data["sharding"] = sharding
+        return jsonify(response_data)
         
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": f"Geçersiz tarih aralığı: {str(e)}"
+        }), 400
     except Exception as e:
         logging.error(f"Helix-D search hatası: {e}")
         return jsonify({
@@ -376,6 +425,64 @@ def helix_d_search():
         }), 500
 
 
+def helix_d_stream(domain, start_date, end_date, offset=0, limit=None):
+    """API2 yanıtını ayrıştırarak kayıt kayıt istemciye aktar
+    
+    Yanıt zarfı normal modla aynıdır ({"success", "data", ...}); kayıtlar
+    API2'den çözüldükçe yazılır, böylece bellek kullanımı sonuç boyutuyla
+    büyümez. Akış başladıktan sonra oluşan hatalar "error" alanıyla bildirilir.
+    """
+    deadline = current_deadline()
+    try:
+        upstream = open_search_stream(domain, start_date, end_date, deadline)
+    except DeadlineExceeded as e:
+        logging.warning("Helix-D akışı başlatılamadı, zaman bütçesi tükendi: %s - %s", domain, e)
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "domain": domain,
+            "timing": deadline.report()
+        }), 504
+    except Exception as e:
+        logging.error(f"Helix-D akış hatası: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "domain": domain,
+            "timing": deadline.report()
+        }), 500
+    
+    def generate():
+        yield json.dumps({
+            "success": True,
+            "domain": domain,
+            "streamed": True,
+            "search_params": {
+                "start_date": start_date or "Belirtilmedi",
+                "end_date": end_date or "Belirtilmedi"
+            },
+            "window": {"offset": offset, "limit": limit}
+        }, ensure_ascii=False)[:-1] + ', "data": ['
+        
+        count = 0
+        error = None
+        try:
+            for record in stream_domain_records(upstream, offset, limit, deadline):
+                yield (',' if count else '') + json.dumps(record, ensure_ascii=False, default=str)
+                count += 1
+        except Exception as e:
+            error = str(e)
+            logging.error(f"Helix-D akış sırasında hata: {domain} - {e}")
+        
+        trailer = {"count": count, "timing": deadline.report()}
+        if error:
+            trailer["error"] = error
+        yield '], ' + json.dumps(trailer, ensure_ascii=False)[1:]
+        logging.info("Helix-D akış tamamlandı: %s - %d kayıt", domain, count)
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
 @main_bp.route('/leak-logs/api/detail/<int:log_id>')
 @login_required
 def api_leak_log_detail(log_id):
@@ -389,11 +496,9 @@ def api_leak_log_detail(log_id):
             }), 500
         
         cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
+        log = db.query(cursor, """
             SELECT * FROM leak_logs WHERE id = %s
-        """, (log_id,))
-        
-        log = cursor.fetchone()
+        """, (log_id,), fetch='one')
         cursor.close()
         connection.close()
         
@@ -0,0 +1,31 @@
+from flask import Blueprint, Response, request, jsonify
+import hmac
+from config import Config
+from metrics import registry
+
+# Blueprint oluştur
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+def _token_valid():
+    """METRICS_TOKEN tanımlıysa Bearer başlığı veya ?token= ile doğrula
+    
+    Token tanımlı değilse yalnızca doğrudan localhost'tan gelen istekler
+    kabul edilir; reverse proxy üzerinden gelenler (X-Forwarded-For) reddedilir.
+    """
+    expected = Config.METRICS_CONFIG['token']
+    if not expected:
+        forwarded = request.headers.get('X-Forwarded-For') or request.headers.get('X-Real-IP')
+        return request.remote_addr in LOCAL_ADDRESSES and not forwarded
+    header = request.headers.get('Authorization', '')
+    provided = header[7:] if header.startswith('Bearer ') else request.args.get('token', '')
+    return hmac.compare_digest(provided, expected)
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Prometheus metin formatında uygulama metrikleri"""
+    if not _token_valid():
+        return jsonify({'success': False, 'error': 'Geçersiz metrics token'}), 401
+    
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -21,9 +21,9 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 import platform
-import schedule
 import time
-from threading import Thread
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import pymysql
 from telegram import Update, BotCommand, InlineKeyboardButton, InlineKeyboardMarkup
@@ -37,6 +37,20 @@ from telegram.ext import (
 from telegram.constants import ParseMode
 from telegram.error import TelegramError
 
+import query_builder
+from daily_aggregates import DailyAggregateStore
+from result_cache import AsyncTTLCache, DayResultCache
+from report_scheduler import DailyReportScheduler, ReportStateStore, parse_run_time
+from outbound import OutboundMessageQueue, TelegramRateLimiter
+from service_metrics import ServiceMetricsRecorder
+from log_tail import JournalTailer, LogChunk, split_log_message
+from db_perf import METRICS as DB_PERF_METRICS, MySQLPerfSampler
+import command_metrics
+
+# Shared logging pipeline lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import logging_setup
+
 # =====================================
 # CONFIGURATION & CONSTANTS
 # =====================================
@@ -54,9 +68,51 @@ class BotConfig:
     max_retry_attempts: int = 3
     connection_timeout: int = 30
     log_level: str = "INFO"
+    log_format: str = "json"
+    log_file: str = "logs/enhanced_lapsus_bot.log"
+    log_rotate_when: str = "midnight"
+    log_backup_count: int = 14
+    log_queue_size: int = 10000
+    log_info_sample_rate: float = 1.0
     service_check_interval: int = 30
     auto_restart_failed_services: bool = False
     service_notification_enabled: bool = True
+    service_history_hours: float = 24
+    service_rss_growth_alert_mb_per_hour: float = 0
+    service_cpu_alert_percent: float = 0
+    log_tail_max_lines: int = 200
+    log_follow_interval: float = 5.0
+    log_follow_max_seconds: int = 600
+    db_perf_enabled: bool = True
+    db_perf_interval: int = 15
+    db_perf_history_hours: float = 24
+    db_perf_alert_threads_running: float = 0
+    db_perf_alert_slow_per_min: float = 0
+    db_perf_alert_lock_waits_per_min: float = 0
+    db_perf_alert_long_query_seconds: float = 0
+    db_perf_alert_min_hit_ratio: float = 0
+    db_pool_enabled: bool = True
+    db_pool_min_size: int = 2
+    db_pool_max_size: int = 10
+    db_pool_idle_timeout: int = 300
+    db_pool_ping_interval: int = 30
+    aggregates_enabled: bool = True
+    aggregates_refresh_interval: int = 60
+    aggregates_batch_size: int = 50000
+    aggregates_fold_lag: int = 30
+    result_cache_enabled: bool = True
+    result_cache_path: str = "cache/bot_results.sqlite3"
+    result_cache_today_ttl: int = 300
+    analytics_cache_enabled: bool = True
+    analytics_cache_check_interval: int = 10
+    daily_report_time: str = "00:05"
+    report_state_path: str = "state/report_scheduler.json"
+    outbound_global_rate: float = 25.0
+    outbound_private_chat_rate: float = 1.0
+    outbound_group_chat_per_minute: int = 20
+    outbound_coalesce_window: float = 3.0
+    outbound_workers: int = 4
+    outbound_max_attempts: int = 5
 
 class Config:
     """Configuration manager with secure defaults"""
@@ -75,11 +131,61 @@ class Config:
             max_retry_attempts=int(os.getenv("MAX_RETRY_ATTEMPTS", "3")),
             connection_timeout=int(os.getenv("CONNECTION_TIMEOUT", "30")),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
+            log_format=os.getenv("LOG_FORMAT", "json"),
+            log_file=os.getenv("LOG_FILE", "logs/enhanced_lapsus_bot.log"),
+            log_rotate_when=os.getenv("LOG_ROTATE_WHEN", "midnight"),
+            log_backup_count=int(os.getenv("LOG_BACKUP_COUNT", "14")),
+            log_queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+            log_info_sample_rate=float(os.getenv("LOG_INFO_SAMPLE_RATE", "1")),
             service_check_interval=int(os.getenv("SERVICE_CHECK_INTERVAL", "30")),
             auto_restart_failed_services=os.getenv("AUTO_RESTART_SERVICES", "false").lower() == "true",
-            service_notification_enabled=os.getenv("SERVICE_NOTIFICATIONS", "true").lower() == "true"
+            service_notification_enabled=os.getenv("SERVICE_NOTIFICATIONS", "true").lower() == "true",
+            service_history_hours=float(os.getenv("SERVICE_HISTORY_HOURS", "24")),
+            service_rss_growth_alert_mb_per_hour=float(os.getenv("SERVICE_RSS_GROWTH_ALERT_MB_PER_HOUR", "0")),
+            service_cpu_alert_percent=float(os.getenv("SERVICE_CPU_ALERT_PERCENT", "0")),
+            log_tail_max_lines=int(os.getenv("LOG_TAIL_MAX_LINES", "200")),
+            log_follow_interval=float(os.getenv("LOG_FOLLOW_INTERVAL", "5")),
+            log_follow_max_seconds=int(os.getenv("LOG_FOLLOW_MAX_SECONDS", "600")),
+            db_perf_enabled=os.getenv("DB_PERF_ENABLED", "true").lower() == "true",
+            db_perf_interval=int(os.getenv("DB_PERF_INTERVAL", "15")),
+            db_perf_history_hours=float(os.getenv("DB_PERF_HISTORY_HOURS", "24")),
+            db_perf_alert_threads_running=float(os.getenv("DB_PERF_ALERT_THREADS_RUNNING", "0")),
+            db_perf_alert_slow_per_min=float(os.getenv("DB_PERF_ALERT_SLOW_PER_MIN", "0")),
+            db_perf_alert_lock_waits_per_min=float(os.getenv("DB_PERF_ALERT_LOCK_WAITS_PER_MIN", "0")),
+            db_perf_alert_long_query_seconds=float(os.getenv("DB_PERF_ALERT_LONG_QUERY_SECONDS", "0")),
+            db_perf_alert_min_hit_ratio=float(os.getenv("DB_PERF_ALERT_MIN_HIT_RATIO", "0")),
+            db_pool_enabled=os.getenv("DB_POOL_ENABLED", "true").lower() == "true",
+            db_pool_min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            db_pool_max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            db_pool_idle_timeout=int(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+            db_pool_ping_interval=int(os.getenv("DB_POOL_PING_INTERVAL", "30")),
+            aggregates_enabled=os.getenv("AGGREGATES_ENABLED", "true").lower() == "true",
+            aggregates_refresh_interval=int(os.getenv("AGGREGATES_REFRESH_INTERVAL", "60")),
+            aggregates_batch_size=int(os.getenv("AGGREGATES_BATCH_SIZE", "50000")),
+            aggregates_fold_lag=int(os.getenv("AGGREGATES_FOLD_LAG", "30")),
+            result_cache_enabled=os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true",
+            result_cache_path=os.getenv("RESULT_CACHE_PATH", "cache/bot_results.sqlite3"),
+            result_cache_today_ttl=int(os.getenv("RESULT_CACHE_TODAY_TTL", "300")),
+            analytics_cache_enabled=os.getenv("ANALYTICS_CACHE_ENABLED", "true").lower() == "true",
+            analytics_cache_check_interval=int(os.getenv("ANALYTICS_CACHE_CHECK_INTERVAL", "10")),
+            daily_report_time=os.getenv("DAILY_REPORT_TIME", "00:05"),
+            report_state_path=os.getenv("REPORT_STATE_PATH", "state/report_scheduler.json"),
+            outbound_global_rate=float(os.getenv("OUTBOUND_GLOBAL_RATE", "25")),
+            outbound_private_chat_rate=float(os.getenv("OUTBOUND_PRIVATE_CHAT_RATE", "1")),
+            outbound_group_chat_per_minute=int(os.getenv("OUTBOUND_GROUP_CHAT_PER_MINUTE", "20")),
+            outbound_coalesce_window=float(os.getenv("OUTBOUND_COALESCE_WINDOW", "3")),
+            outbound_workers=int(os.getenv("OUTBOUND_WORKERS", "4")),
+            outbound_max_attempts=int(os.getenv("OUTBOUND_MAX_ATTEMPTS", "5"))
         )
 
+# Seconds a rendered global analytics reply is shared before it is rebuilt
+ANALYTICS_CACHE_TTLS = {
+    'statistics': 60,
+    'regions': 300,
+    'popular_domains': 300,
+    'sources': 600,
+}
+
 # =====================================
 # SERVICE MANAGER
 # =====================================
@@ -102,6 +208,8 @@ class ServiceInfo:
 class SystemServiceManager:
     """System service management class"""
     
+    SHOW_PROPERTIES = ['Id', 'LoadState', 'ActiveState', 'UnitFileState', 'MainPID', 'ActiveEnterTimestamp']
+    
     def __init__(self):
         self.monitored_services = [
             "flaskapi.service",
@@ -122,87 +230,158 @@ class SystemServiceManager:
             "ubu-monitor.service": "System monitoring service"
         }
         self.previous_status = {}
+        self._processes: Dict[str, psutil.Process] = {}
     
     async def get_service_status(self, service_name: str) -> ServiceInfo:
         """Get detailed service status"""
+        return (await self.collect_status([service_name]))[0]
+    
+    async def get_all_services_status(self) -> List[ServiceInfo]:
+        """Get status of all monitored services"""
+        return await self.collect_status(self.monitored_services)
+    
+    async def collect_status(self, services: List[str]) -> List[ServiceInfo]:
+        """Status of several units from a single ``systemctl show`` call"""
         try:
-            # Get systemctl status
-            result = await asyncio.create_subprocess_exec(
-                'systemctl', 'show', service_name,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await result.communicate()
-            
-            if result.returncode != 0:
-                return ServiceInfo(
-                    name=service_name,
-                    display_name=self.service_display_names.get(service_name, service_name),
-                    description=self.service_descriptions.get(service_name, "Unknown service"),
-                    status="not-found",
-                    active=False,
-                    enabled=False
-                )
-            
-            # Parse systemctl output
-            status_data = {}
-            for line in stdout.decode().strip().split('\n'):
+            units = await self._systemctl_show(services)
+        except Exception as e:
+            logging.error(f"Error getting service status for {', '.join(services)}: {e}")
+            return [self._placeholder_info(service, "error") for service in services]
+        
+        return [
+            self._build_service_info(service, units[service]) if service in units
+            else self._placeholder_info(service, "not-found")
+            for service in services
+        ]
+    
+    async def _systemctl_show(self, services: List[str]) -> Dict[str, Dict[str, str]]:
+        """Run one ``systemctl show -p ...`` for all units and split its output
+
+        systemctl prints one blank-line separated property block per unit,
+        in argument order.
+        """
+        result = await asyncio.create_subprocess_exec(
+            'systemctl', 'show', '-p', ','.join(self.SHOW_PROPERTIES), *services,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await result.communicate()
+        
+        blocks = []
+        for chunk in stdout.decode(errors='replace').strip().split('\n\n'):
+            properties = {}
+            for line in chunk.splitlines():
                 if '=' in line:
                     key, value = line.split('=', 1)
-                    status_data[key] = value
-            
-            # Get process info if active
+                    properties[key] = value
+            if properties:
+                blocks.append(properties)
+        
+        if result.returncode != 0 and not blocks:
+            logging.debug(f"systemctl show failed: {stderr.decode(errors='replace').strip()}")
+            return {}
+        
+        if len(blocks) == len(services):
+            return dict(zip(services, blocks))
+        return {block['Id']: block for block in blocks if block.get('Id')}
+    
+    def _placeholder_info(self, service_name: str, status: str) -> ServiceInfo:
+        return ServiceInfo(
+            name=service_name,
+            display_name=self.service_display_names.get(service_name, service_name),
+            description=self.service_descriptions.get(service_name, "Unknown service"),
+            status=status,
+            active=False,
+            enabled=False
+        )
+    
+    def _build_service_info(self, service_name: str, status_data: Dict[str, str]) -> ServiceInfo:
+        if status_data.get('LoadState') == 'not-found':
+            self._processes.pop(service_name, None)
+            return self._placeholder_info(service_name, "not-found")
+        
+        # Get process info if active
+        pid = None
+        memory_usage = None
+        cpu_usage = None
+        
+        try:
+            pid = int(status_data.get('MainPID', '0')) or None
+        except ValueError:
             pid = None
-            memory_usage = None
-            cpu_usage = None
-            
-            if status_data.get('MainPID', '0') != '0':
-                try:
-                    pid = int(status_data['MainPID'])
-                    process = psutil.Process(pid)
-                    memory_usage = process.memory_info().rss / 1024 / 1024  # MB
-                    cpu_usage = process.cpu_percent()
-                except (psutil.NoSuchProcess, ValueError):
-                    pass
-            
-            # Calculate uptime
-            uptime = None
-            if status_data.get('ActiveEnterTimestamp'):
+        
+        if pid:
+            process, is_new = self._get_process(service_name, pid)
+            if process is not None:
                 try:
-                    start_time = datetime.fromtimestamp(int(status_data['ActiveEnterTimestamp']) / 1000000)
-                    uptime_delta = datetime.now() - start_time
-                    uptime = self._format_uptime(uptime_delta)
-                except (ValueError, TypeError):
-                    pass
-            
-            return ServiceInfo(
-                name=service_name,
-                display_name=self.service_display_names.get(service_name, service_name),
-                description=self.service_descriptions.get(service_name, "Unknown service"),
-                status=status_data.get('ActiveState', 'unknown'),
-                active=status_data.get('ActiveState') == 'active',
-                enabled=status_data.get('UnitFileState') == 'enabled',
-                uptime=uptime,
-                memory_usage=memory_usage,
-                cpu_usage=cpu_usage,
-                pid=pid
-            )
-            
-        except Exception as e:
-            logging.error(f"Error getting service status for {service_name}: {e}")
-            return ServiceInfo(
-                name=service_name,
-                display_name=self.service_display_names.get(service_name, service_name),
-                description=self.service_descriptions.get(service_name, "Unknown service"),
-                status="error",
-                active=False,
-                enabled=False
-            )
+                    with process.oneshot():
+                        memory_usage = process.memory_info().rss / 1024 / 1024  # MB
+                        cpu_usage = process.cpu_percent()
+                    if is_new:
+                        cpu_usage = None  # First reading has no interval to measure
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    self._processes.pop(service_name, None)
+                    memory_usage = cpu_usage = None
+        else:
+            self._processes.pop(service_name, None)
+        
+        # Calculate uptime
+        uptime = None
+        start_time = self._parse_systemd_timestamp(status_data.get('ActiveEnterTimestamp'))
+        if start_time:
+            uptime = self._format_uptime(datetime.now() - start_time)
+        
+        return ServiceInfo(
+            name=service_name,
+            display_name=self.service_display_names.get(service_name, service_name),
+            description=self.service_descriptions.get(service_name, "Unknown service"),
+            status=status_data.get('ActiveState', 'unknown'),
+            active=status_data.get('ActiveState') == 'active',
+            enabled=status_data.get('UnitFileState') == 'enabled',
+            uptime=uptime,
+            memory_usage=memory_usage,
+            cpu_usage=cpu_usage,
+            pid=pid
+        )
     
-    async def get_all_services_status(self) -> List[ServiceInfo]:
-        """Get status of all monitored services"""
-        tasks = [self.get_service_status(service) for service in self.monitored_services]
-        return await asyncio.gather(*tasks)
+    def _get_process(self, service_name: str, pid: int) -> tuple:
+        """Persistent handle per service so cpu_percent() measures since the last sample
+
+        Returns ``(process, is_new)``; a new handle has no CPU baseline yet.
+        """
+        process = self._processes.get(service_name)
+        if process is not None and process.pid == pid:
+            return process, False
+        try:
+            process = psutil.Process(pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._processes.pop(service_name, None)
+            return None, False
+        self._processes[service_name] = process
+        return process, True
+    
+    @staticmethod
+    def _parse_systemd_timestamp(value: Optional[str]) -> Optional[datetime]:
+        """Parse ActiveEnterTimestamp (microseconds, '@epoch' or systemd's text form)"""
+        if not value or value in ('0', 'n/a'):
+            return None
+        try:
+            return datetime.fromtimestamp(int(value) / 1000000)
+        except ValueError:
+            pass
+        if value.startswith('@'):
+            try:
+                return datetime.fromtimestamp(float(value[1:]))
+            except ValueError:
+                return None
+        # e.g. "Mon 2024-01-01 10:00:00 UTC"; the zone name is dropped, systemd prints local time
+        parts = value.split()
+        if len(parts) >= 3:
+            try:
+                return datetime.strptime(f"{parts[1]} {parts[2]}", "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                pass
+        return None
     
     async def control_service(self, service_name: str, action: str) -> Dict[str, Any]:
         """Control service (start, stop, restart, enable, disable)"""
@@ -298,16 +477,224 @@ class SystemServiceManager:
 # DATABASE MANAGER
 # =====================================
 
+@dataclass
+class PooledConnection:
+    """Connection held by the pool with its bookkeeping timestamps"""
+    connection: pymysql.Connection
+    created_at: float
+    last_used: float
+    running: Optional[Future] = None
+
+class AsyncConnectionPool:
+    """Bounded pymysql connection pool bound to a dedicated thread pool
+
+    All blocking driver calls (connect, ping, queries) run on the pool's own
+    executor so they never block the event loop or compete with the default
+    executor. Idle connections are recycled after ``idle_timeout`` seconds and
+    pinged before reuse when they have been idle longer than ``ping_interval``.
+    """
+    
+    def __init__(self, factory, min_size: int, max_size: int,
+                 idle_timeout: int, ping_interval: int):
+        self._factory = factory
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.executor = ThreadPoolExecutor(max_workers=self.max_size, thread_name_prefix="db-pool")
+        self._idle: List[PooledConnection] = []
+        self._borrowed: Dict[int, PooledConnection] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._size = 0
+        self._waiting = 0
+        self._metrics = {
+            'acquired': 0,
+            'created': 0,
+            'recycled': 0,
+            'ping_failures': 0,
+            'broken': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0
+        }
+    
+    async def run(self, func, *args):
+        """Run a blocking call on the pool's dedicated executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+    
+    async def run_on(self, connection, func, *args):
+        """Run ``func(connection, *args)`` on the executor for a borrowed connection
+
+        The executor future is remembered, so a cancelled caller does not hand
+        the connection back while the query is still running on it.
+        """
+        future = self.executor.submit(func, connection, *args)
+        pooled = self._borrowed.get(id(connection))
+        if pooled is not None:
+            pooled.running = future
+        return await asyncio.wrap_future(future)
+    
+    async def start(self):
+        """Open the minimum number of connections up front"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_size)
+        while self._size + len(self._idle) < self.min_size:
+            self._idle.append(await self._open())
+    
+    async def _open(self) -> PooledConnection:
+        connection = await self.run(self._factory)
+        now = time.monotonic()
+        self._metrics['created'] += 1
+        return PooledConnection(connection, created_at=now, last_used=now)
+    
+    def _discard(self, pooled: PooledConnection):
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+    
+    async def _checkout(self) -> PooledConnection:
+        """Take a healthy idle connection or open a new one"""
+        now = time.monotonic()
+        while self._idle:
+            pooled = self._idle.pop()
+            idle_for = now - pooled.last_used
+            if idle_for > self.idle_timeout:
+                self._metrics['recycled'] += 1
+                await self.run(self._discard, pooled)
+                continue
+            if idle_for > self.ping_interval:
+                try:
+                    await self.run(pooled.connection.ping, False)
+                except pymysql.Error as e:
+                    logging.warning(f"Pooled connection failed liveness ping: {e}")
+                    self._metrics['ping_failures'] += 1
+                    await self.run(self._discard, pooled)
+                    continue
+            return pooled
+        return await self._open()
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a connection, waiting if the pool is at max size"""
+        if self._semaphore is None:
+            await self.start()
+        
+        wait_started = time.monotonic()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        waited = time.monotonic() - wait_started
+        self._metrics['acquired'] += 1
+        self._metrics['wait_total'] += waited
+        self._metrics['wait_max'] = max(self._metrics['wait_max'], waited)
+        
+        try:
+            pooled = await self._checkout()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self._size += 1
+        self._borrowed[id(pooled.connection)] = pooled
+        healthy = True
+        try:
+            yield pooled.connection
+        except (pymysql.OperationalError, pymysql.InterfaceError, asyncio.CancelledError):
+            # Connection state is unknown after a driver failure or a
+            # cancelled in-flight query, so it is never handed out again
+            healthy = False
+            raise
+        finally:
+            del self._borrowed[id(pooled.connection)]
+            running, pooled.running = pooled.running, None
+            if running is not None and not running.done():
+                # A cancelled query is still running on an executor thread: the
+                # connection is closed and its slot freed only once it finishes
+                self._metrics['broken'] += 1
+                loop = asyncio.get_running_loop()
+                running.add_done_callback(lambda _: loop.call_soon_threadsafe(self._retire, pooled))
+            elif healthy:
+                self._size -= 1
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+                self._prune_idle()
+                self._semaphore.release()
+            else:
+                self._metrics['broken'] += 1
+                self._retire(pooled)
+    
+    def _retire(self, pooled: PooledConnection):
+        """Close a broken connection and give its slot back"""
+        self._size -= 1
+        self.executor.submit(self._discard, pooled)
+        self._semaphore.release()
+    
+    def _prune_idle(self):
+        """Close idle connections above min size that exceeded the idle timeout"""
+        now = time.monotonic()
+        keep = []
+        for pooled in sorted(self._idle, key=lambda p: p.last_used, reverse=True):
+            if len(keep) >= self.min_size and now - pooled.last_used > self.idle_timeout:
+                self._metrics['recycled'] += 1
+                self.executor.submit(self._discard, pooled)
+            else:
+                keep.append(pooled)
+        self._idle = keep
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and acquire-wait metrics"""
+        acquired = self._metrics['acquired']
+        return {
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'in_use': self._size,
+            'idle': len(self._idle),
+            'waiting': self._waiting,
+            'acquired': acquired,
+            'created': self._metrics['created'],
+            'recycled': self._metrics['recycled'],
+            'ping_failures': self._metrics['ping_failures'],
+            'broken': self._metrics['broken'],
+            'wait_avg_ms': (self._metrics['wait_total'] / acquired * 1000) if acquired else 0.0,
+            'wait_max_ms': self._metrics['wait_max'] * 1000
+        }
+    
+    def close(self):
+        """Close idle connections and stop the executor"""
+        for pooled in self._idle:
+            self._discard(pooled)
+        self._idle = []
+        self.executor.shutdown(wait=False)
+
 class DatabaseManager:
     """Professional database connection and query manager"""
     
     def __init__(self, config: BotConfig):
         self.config = config
-        self._connection_pool = []
+        self._batch_semaphore: Optional[asyncio.Semaphore] = None
+        self.pool: Optional[AsyncConnectionPool] = None
+        if config.db_pool_enabled:
+            self.pool = AsyncConnectionPool(
+                self._create_connection,
+                min_size=config.db_pool_min_size,
+                max_size=config.db_pool_max_size,
+                idle_timeout=config.db_pool_idle_timeout,
+                ping_interval=config.db_pool_ping_interval
+            )
         
     @asynccontextmanager
     async def get_connection(self):
         """Get database connection with proper cleanup"""
+        if self.pool:
+            try:
+                async with self.pool.acquire() as connection:
+                    yield connection
+            except pymysql.Error as e:
+                logging.error(f"Database connection error: {e}")
+                raise
+            return
+        
         connection = None
         try:
             connection = await asyncio.get_event_loop().run_in_executor(
@@ -321,6 +708,12 @@ class DatabaseManager:
             if connection:
                 connection.close()
     
+    async def _run_blocking(self, func, conn, *args):
+        """Run a blocking driver call on ``conn`` off the event loop"""
+        if self.pool:
+            return await self.pool.run_on(conn, func, *args)
+        return await asyncio.get_event_loop().run_in_executor(None, func, conn, *args)
+    
     def _create_connection(self) -> pymysql.Connection:
         """Create new database connection"""
         return pymysql.connect(
@@ -337,32 +730,88 @@ class DatabaseManager:
             write_timeout=self.config.connection_timeout
         )
     
+    @staticmethod
+    def _fetch_all(conn: pymysql.Connection, query: str, params: Optional[tuple]) -> List[Dict[str, Any]]:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    
     async def execute_query(self, query: str, params: Optional[tuple] = None) -> Optional[List[Dict[str, Any]]]:
         """Execute database query with error handling and retries"""
-        for attempt in range(self.config.max_retry_attempts):
-            try:
-                async with self.get_connection() as conn:
-                    with conn.cursor() as cursor:
-                        cursor.execute(query, params)
-                        return cursor.fetchall()
-            except pymysql.Error as e:
-                logging.error(f"Database query error (attempt {attempt + 1}): {e}")
-                if attempt == self.config.max_retry_attempts - 1:
-                    raise
-                await asyncio.sleep(1)
+        with command_metrics.track('db'):
+            for attempt in range(self.config.max_retry_attempts):
+                try:
+                    async with self.get_connection() as conn:
+                        return await self._run_blocking(self._fetch_all, conn, query, params)
+                except pymysql.Error as e:
+                    logging.error(f"Database query error (attempt {attempt + 1}): {e}")
+                    if attempt == self.config.max_retry_attempts - 1:
+                        command_metrics.mark_error()
+                        raise
+                    await asyncio.sleep(1)
         return None
     
+    async def execute_batch(self, queries: Dict[str, Union[str, tuple]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Run independent queries concurrently
+
+        ``queries`` maps a result key to either a SQL string or a
+        ``(sql, params)`` tuple. Concurrency is bounded by a semaphore sized
+        to the connection pool so a batch never opens more connections than
+        the pool allows. Empty results are returned as ``[]``.
+        """
+        if self._batch_semaphore is None:
+            self._batch_semaphore = asyncio.Semaphore(max(1, self.config.db_pool_max_size))
+        
+        async def run(query):
+            sql, params = (query, None) if isinstance(query, str) else query
+            async with self._batch_semaphore:
+                return await self.execute_query(sql, params) or []
+        
+        keys = list(queries)
+        results = await asyncio.gather(*(run(queries[key]) for key in keys))
+        return dict(zip(keys, results))
+    
+    @staticmethod
+    def _transaction(conn: pymysql.Connection, func):
+        conn.begin()
+        try:
+            result = func(conn)
+            conn.commit()
+            return result
+        except Exception:
+            conn.rollback()
+            raise
+    
+    async def run_in_transaction(self, func):
+        """Run blocking ``func(connection)`` inside a single transaction
+
+        Committed on success, rolled back on any error. Not retried; the
+        caller decides whether the work is safe to repeat.
+        """
+        with command_metrics.track('db'):
+            async with self.get_connection() as conn:
+                return await self._run_blocking(self._transaction, conn, func)
+    
     async def test_connection(self) -> bool:
         """Test database connectivity"""
         try:
+            if self.pool:
+                await self.pool.start()
             async with self.get_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute("SELECT 1")
-                    result = cursor.fetchone()
-                    return result is not None
+                result = await self._run_blocking(self._fetch_all, conn, "SELECT 1", None)
+                return bool(result)
         except Exception as e:
             logging.error(f"Database connection test failed: {e}")
             return False
+    
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Connection pool metrics, None when pooling is disabled"""
+        return self.pool.stats() if self.pool else None
+    
+    def close(self):
+        """Release pooled connections"""
+        if self.pool:
+            self.pool.close()
 
 # =====================================
 # AUTHORIZATION MANAGER
@@ -446,8 +895,8 @@ class MessageFormatter:
         return dt.strftime("%Y-%m-%d %H:%M:%S")
     
     @staticmethod
-    def format_service_status(service: ServiceInfo) -> str:
-        """Format service status for display"""
+    def format_service_status(service: ServiceInfo, memory_trend: Optional[Dict[str, Any]] = None) -> str:
+        """Format service status for display, with an optional memory history summary"""
         status_emoji = {
             'active': '🟢',
             'inactive': '🔴', 
@@ -474,8 +923,23 @@ class MessageFormatter:
         if service.pid:
             status_text += f"   PID: `{service.pid}`\n"
         
+        if memory_trend and memory_trend['samples'] > 1:
+            status_text += (
+                f"   Trend: `{memory_trend['sparkline']}` "
+                f"(avg `{memory_trend['avg']:.1f}` / p95 `{memory_trend['p95']:.1f}` MB)\n"
+            )
+        
         return status_text
     
+    @staticmethod
+    def format_resource_summary(label: str, summary: Dict[str, Any], unit: str) -> str:
+        """min/avg/max/p95 line plus sparkline for a recorded service metric"""
+        return (
+            f"   {label}: `{summary['min']:.1f}` / `{summary['avg']:.1f}` / "
+            f"`{summary['max']:.1f}` / `{summary['p95']:.1f}` {unit}\n"
+            f"   `{summary['sparkline']}`\n"
+        )
+    
     @staticmethod
     def get_region_flag(region: str) -> str:
         """Get flag emoji for region"""
@@ -527,10 +991,67 @@ class LapsusBotHandler:
         self.formatter = MessageFormatter()
         self.service_manager = SystemServiceManager()
         self.daily_report_enabled = True
-        self.report_chat_ids = set()
+        self.report_store = ReportStateStore(config.report_state_path)
+        self.report_chat_ids = self.report_store.subscribers
+        self.report_scheduler = DailyReportScheduler(
+            self, self.report_store, parse_run_time(config.daily_report_time)
+        )
+        # Shared by replies (via the application) and the outbound queue
+        self.rate_limiter = TelegramRateLimiter(
+            global_rate=config.outbound_global_rate,
+            private_chat_rate=config.outbound_private_chat_rate,
+            group_chat_per_minute=config.outbound_group_chat_per_minute
+        )
+        self.outbound = OutboundMessageQueue(
+            self._outbound_bot,
+            workers=config.outbound_workers,
+            coalesce_window=config.outbound_coalesce_window,
+            max_attempts=config.outbound_max_attempts,
+            on_permanent_failure=self._on_permanent_send_failure
+        )
         self.service_monitor_enabled = True
         self.service_monitor_chats = set()
+        self.service_metrics = ServiceMetricsRecorder(
+            config.service_check_interval,
+            history_hours=config.service_history_hours,
+            rss_growth_alert_mb_per_hour=config.service_rss_growth_alert_mb_per_hour,
+            cpu_alert_percent=config.service_cpu_alert_percent
+        )
+        self.log_tailer = JournalTailer(
+            max_lines=config.log_tail_max_lines,
+            follow_interval=config.log_follow_interval,
+            follow_max_seconds=config.log_follow_max_seconds
+        )
+        self.command_metrics = command_metrics.CommandMetrics()
+        self.db_perf: Optional[MySQLPerfSampler] = None
+        if config.db_perf_enabled:
+            self.db_perf = MySQLPerfSampler(
+                self.db_manager,
+                interval=config.db_perf_interval,
+                history_hours=config.db_perf_history_hours,
+                thresholds={
+                    'threads_running': config.db_perf_alert_threads_running,
+                    'slow_per_min': config.db_perf_alert_slow_per_min,
+                    'lock_waits_per_min': config.db_perf_alert_lock_waits_per_min,
+                    'longest_query_seconds': config.db_perf_alert_long_query_seconds,
+                    'buffer_pool_hit_ratio': config.db_perf_alert_min_hit_ratio,
+                }
+            )
         self.application = None
+        self.aggregates: Optional[DailyAggregateStore] = None
+        if config.aggregates_enabled:
+            self.aggregates = DailyAggregateStore(
+                self.db_manager,
+                refresh_interval=config.aggregates_refresh_interval,
+                batch_size=config.aggregates_batch_size,
+                fold_lag=config.aggregates_fold_lag
+            )
+        self.result_cache: Optional[DayResultCache] = None
+        if config.result_cache_enabled:
+            self.result_cache = DayResultCache(config.result_cache_path, today_ttl=config.result_cache_today_ttl)
+        self.analytics_cache: Optional[AsyncTTLCache] = AsyncTTLCache() if config.analytics_cache_enabled else None
+        self._analytics_max_id: Optional[int] = None
+        self._analytics_checked_at = 0.0
     
     async def initialize(self) -> bool:
         """Initialize bot and test connections"""
@@ -552,6 +1073,18 @@ class LapsusBotHandler:
         
         logging.info("✅ Database connection successful")
         
+        # Date-range analytics depend on an index over accs.date
+        await query_builder.check_indexes(self.db_manager)
+        
+        # Daily aggregate store (reports fall back to raw queries without it)
+        if self.aggregates:
+            try:
+                await self.aggregates.ensure_schema()
+                logging.info("✅ Daily aggregate tables ready")
+            except Exception as e:
+                logging.warning(f"Daily aggregates disabled, schema setup failed: {e}")
+                self.aggregates = None
+        
         # Initialize service monitoring
         try:
             services = await self.service_manager.get_all_services_status()
@@ -606,6 +1139,91 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
     
+    def _aggregates_ready(self) -> bool:
+        """Whether report commands can read the daily aggregate store"""
+        return self.aggregates is not None and self.aggregates.ready
+    
+    async def _get_cached_day(self, kind: str, day: str) -> Optional[Dict[str, Any]]:
+        """Per-day results from the on-disk cache, if enabled"""
+        if self.result_cache is None:
+            return None
+        return await self.result_cache.get(kind, day)
+    
+    async def _store_cached_day(self, kind: str, day: str, results: Dict[str, Any]):
+        if self.result_cache is not None:
+            await self.result_cache.set(kind, day, results)
+    
+    def _outbound_bot(self):
+        """Bot for the outbound queue, once the application is running"""
+        if self.application is not None and getattr(self.application, 'running', False):
+            return self.application.bot
+        return None
+    
+    def _on_permanent_send_failure(self, chat_id: int, error: Exception):
+        """Stop pushing to chats that blocked the bot or no longer exist
+
+        Only called for Forbidden or chat-gone BadRequests (outbound.is_chat_gone);
+        a single malformed message never unsubscribes a chat.
+        """
+        if chat_id in self.service_monitor_chats:
+            self.service_monitor_chats.discard(chat_id)
+            logging.warning(f"Removed chat {chat_id} from service monitoring: {error}")
+        if chat_id in self.report_chat_ids:
+            self.report_chat_ids.discard(chat_id)
+            self.report_store.save()
+            logging.warning(f"Removed chat {chat_id} from daily reports: {error}")
+    
+    async def _check_analytics_freshness(self):
+        """Invalidate cached analytics when new accs rows have arrived
+
+        MAX(id) is checked at most once per analytics_cache_check_interval.
+        """
+        now = time.monotonic()
+        if now - self._analytics_checked_at < self.config.analytics_cache_check_interval:
+            return
+        self._analytics_checked_at = now
+        try:
+            result = await self.db_manager.execute_query("SELECT MAX(id) AS max_id FROM accs")
+        except Exception as e:
+            logging.warning(f"Analytics cache freshness check failed: {e}")
+            return
+        max_id = result[0]['max_id'] if result else None
+        if max_id != self._analytics_max_id:
+            if self._analytics_max_id is not None:
+                self.analytics_cache.invalidate()
+            self._analytics_max_id = max_id
+    
+    async def _reply_analytics(self, update: Update, key: str, loading_text: str, render):
+        """Reply with rendered analytics text, shared across users via the cache
+
+        A fresh cached message is sent straight away; otherwise the loading
+        message is shown while ``render()`` runs (once, for concurrent callers).
+        """
+        if self.analytics_cache is not None:
+            await self._check_analytics_freshness()
+            text = self.analytics_cache.peek(key)
+            if text is not None:
+                await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+                return
+        
+        loading_msg = await update.message.reply_text(loading_text, parse_mode=ParseMode.MARKDOWN)
+        # Render time minus its queries is the command's formatting time
+        render = command_metrics.timed('format')(render)
+        if self.analytics_cache is not None:
+            text = await self.analytics_cache.get_or_load(key, ANALYTICS_CACHE_TTLS[key], render)
+        else:
+            text = await render()
+        
+        await loading_msg.delete()
+        await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+    
+    async def _total_records(self) -> int:
+        """Total accs row count, from the aggregates when they are current"""
+        if self._aggregates_ready():
+            return await self.aggregates.total()
+        result = await self.db_manager.execute_query("SELECT COUNT(*) as total FROM accs")
+        return result[0]['total'] if result else 0
+    
     def _check_auth(self, user_id: int) -> bool:
         """Check user authorization"""
         return self.auth_manager.is_authorized(user_id)
@@ -641,56 +1259,62 @@ class LapsusBotHandler:
     # DATABASE COMMANDS
     # =====================================
     
-    async def cmd_statistics(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Enhanced database statistics"""
-        if not self._check_auth(update.effective_user.id):
-            return await self._unauthorized_response(update)
-        
-        await self._track_command_usage(update, "statistics")
-        
-        try:
-            loading_msg = await update.message.reply_text(
-                "📊 **Loading statistics...**", 
-                parse_mode=ParseMode.MARKDOWN
-            )
-            
-            # Multiple queries for comprehensive stats
-            queries = {
-                'total': "SELECT COUNT(*) as total FROM accs",
-                'today': "SELECT COUNT(*) as today_total FROM accs WHERE DATE(date) = CURDATE()",
-                'week': "SELECT COUNT(*) as week_total FROM accs WHERE DATE(date) >= CURDATE() - INTERVAL 7 DAY",
-                'month': "SELECT COUNT(*) as month_total FROM accs WHERE DATE(date) >= CURDATE() - INTERVAL 30 DAY",
-                'regions': "SELECT COUNT(DISTINCT region) as region_count FROM accs WHERE region IS NOT NULL",
-                'domains': "SELECT COUNT(DISTINCT domain) as domain_count FROM accs WHERE domain IS NOT NULL"
-            }
-            
-            results = {}
-            for key, query in queries.items():
-                result = await self.db_manager.execute_query(query)
-                results[key] = result[0] if result else {f"{key}_total" if key != 'total' else key: 0}
-            
-            # Calculate growth rates
-            yesterday_query = "SELECT COUNT(*) as yesterday_total FROM accs WHERE DATE(date) = CURDATE() - INTERVAL 1 DAY"
-            yesterday_result = await self.db_manager.execute_query(yesterday_query)
-            yesterday_count = yesterday_result[0]['yesterday_total'] if yesterday_result else 0
-            
-            today_count = results['today']['today_total']
-            growth_rate = ((today_count - yesterday_count) / max(yesterday_count, 1)) * 100
-            
-            stats_msg = f"""
+    async def _render_statistics(self) -> str:
+        """Build the /istatistik message"""
+        if self._aggregates_ready():
+            results = await self.aggregates.statistics()
+        else:
+            # Table-wide totals, plus windowed counts over the last month only
+            today = query_builder.today_window()
+            yesterday = query_builder.yesterday_window()
+            week = query_builder.week_window()
+            month = query_builder.month_window()
+            
+            batch = await self.db_manager.execute_batch({
+                'totals': """
+                    SELECT 
+                        COUNT(*) AS total,
+                        COUNT(DISTINCT region) AS region_count,
+                        COUNT(DISTINCT domain) AS domain_count
+                    FROM accs
+                """,
+                'windows': (f"""
+                    SELECT 
+                        {today.count_if('today_total')},
+                        {yesterday.count_if('yesterday_total')},
+                        {week.count_if('week_total')},
+                        COUNT(*) AS month_total
+                    FROM accs
+                    WHERE {month.condition()}
+                """, today.params() + yesterday.params() + week.params() + month.params())
+            })
+            row = {}
+            for rows in batch.values():
+                row.update(rows[0] if rows else {})
+            results = {key: int(row.get(key) or 0) for key in (
+                'total', 'today_total', 'yesterday_total', 'week_total',
+                'month_total', 'region_count', 'domain_count'
+            )}
+        
+        # Calculate growth rates
+        yesterday_count = results['yesterday_total']
+        today_count = results['today_total']
+        growth_rate = ((today_count - yesterday_count) / max(yesterday_count, 1)) * 100
+        
+        stats_msg = f"""
 📊 **Comprehensive Database Analytics**
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 📈 **Record Statistics:**
-• Total Records: **{self.formatter.format_number(results['total']['total'])}**
+• Total Records: **{self.formatter.format_number(results['total'])}**
 • Today: **{self.formatter.format_number(today_count)}** ({growth_rate:+.1f}% vs yesterday)
-• This Week: **{self.formatter.format_number(results['week']['week_total'])}**
-• This Month: **{self.formatter.format_number(results['month']['month_total'])}**
+• This Week: **{self.formatter.format_number(results['week_total'])}**
+• This Month: **{self.formatter.format_number(results['month_total'])}**
 
 🌍 **Diversity Metrics:**
-• Unique Regions: **{results['regions']['region_count']}**
-• Unique Domains: **{results['domains']['domain_count']}**
+• Unique Regions: **{results['region_count']}**
+• Unique Domains: **{results['domain_count']}**
 
 🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`
 
@@ -700,10 +1324,20 @@ class LapsusBotHandler:
 • `/bolgeler` - Regional distribution
 • `/enpopulerdomain` - Popular domains
 • `/son7gun` - Weekly trend analysis
-            """
-            
-            await loading_msg.delete()
-            await update.message.reply_text(stats_msg, parse_mode=ParseMode.MARKDOWN)
+        """
+        return stats_msg
+    
+    async def cmd_statistics(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Enhanced database statistics"""
+        if not self._check_auth(update.effective_user.id):
+            return await self._unauthorized_response(update)
+        
+        await self._track_command_usage(update, "statistics")
+        
+        try:
+            await self._reply_analytics(
+                update, 'statistics', "📊 **Loading statistics...**", self._render_statistics
+            )
             
         except Exception as e:
             logging.error(f"Statistics command error: {e}")
@@ -712,6 +1346,51 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
     
+    async def _render_regions(self) -> str:
+        """Build the /bolgeler message"""
+        query_text = """
+            SELECT 
+                COALESCE(NULLIF(region, ''), 'Unspecified') as region, 
+                COUNT(*) AS count
+            FROM accs 
+            GROUP BY region 
+            ORDER BY count DESC 
+            LIMIT 15
+        """
+        
+        # Percentages use a separate total instead of a per-query subquery
+        batch = await self.db_manager.execute_batch({
+            'rows': query_text,
+            'total': "SELECT COUNT(*) AS total FROM accs"
+        })
+        result = batch['rows']
+        total = batch['total'][0]['total'] if batch['total'] else 0
+        
+        if not result:
+            return "🌍 **Regional Analysis**\n\nNo regional data found."
+        
+        total_records = sum(row['count'] for row in result)
+        
+        regions_text = "🌍 **Regional Distribution Analysis**\n\n"
+        regions_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        
+        for i, row in enumerate(result, 1):
+            region = row['region']
+            count = row['count']
+            percentage = round(count * 100.0 / max(total, 1), 2)
+            flag = self.formatter.get_region_flag(region)
+            
+            # Create visual bar
+            bar_length = int((count / result[0]['count']) * 20)
+            bar = "█" * bar_length + "░" * (20 - bar_length)
+            
+            regions_text += f"{i:2d}. {flag} **{region}**\n"
+            regions_text += f"    `{bar}` {self.formatter.format_number(count)} ({percentage}%)\n\n"
+        
+        regions_text += f"📊 **Total Analyzed:** {self.formatter.format_number(total_records)}\n"
+        regions_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
+        return regions_text
+    
     async def cmd_regions(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Regional distribution analysis with enhanced visualization"""
         if not self._check_auth(update.effective_user.id):
@@ -720,56 +1399,10 @@ class LapsusBotHandler:
         await self._track_command_usage(update, "regions")
         
         try:
-            loading_msg = await update.message.reply_text(
-                "🌍 **Loading regional analysis...**", 
-                parse_mode=ParseMode.MARKDOWN
+            await self._reply_analytics(
+                update, 'regions', "🌍 **Loading regional analysis...**", self._render_regions
             )
             
-            query = """
-                SELECT 
-                    COALESCE(NULLIF(region, ''), 'Unspecified') as region, 
-                    COUNT(*) AS count,
-                    ROUND((COUNT(*) * 100.0 / (SELECT COUNT(*) FROM accs)), 2) as percentage
-                FROM accs 
-                GROUP BY region 
-                ORDER BY count DESC 
-                LIMIT 15
-            """
-            
-            result = await self.db_manager.execute_query(query)
-            
-            if not result:
-                await loading_msg.delete()
-                await update.message.reply_text(
-                    "🌍 **Regional Analysis**\n\nNo regional data found.", 
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                return
-            
-            total_records = sum(row['count'] for row in result)
-            
-            regions_text = "🌍 **Regional Distribution Analysis**\n\n"
-            regions_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            
-            for i, row in enumerate(result, 1):
-                region = row['region']
-                count = row['count']
-                percentage = row['percentage']
-                flag = self.formatter.get_region_flag(region)
-                
-                # Create visual bar
-                bar_length = int((count / result[0]['count']) * 20)
-                bar = "█" * bar_length + "░" * (20 - bar_length)
-                
-                regions_text += f"{i:2d}. {flag} **{region}**\n"
-                regions_text += f"    `{bar}` {self.formatter.format_number(count)} ({percentage}%)\n\n"
-            
-            regions_text += f"📊 **Total Analyzed:** {self.formatter.format_number(total_records)}\n"
-            regions_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
-            
-            await loading_msg.delete()
-            await update.message.reply_text(regions_text, parse_mode=ParseMode.MARKDOWN)
-            
         except Exception as e:
             logging.error(f"Regions command error: {e}")
             await update.message.reply_text(
@@ -777,6 +1410,52 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
     
+    async def _render_popular_domains(self) -> str:
+        """Build the /enpopulerdomain message"""
+        query_text = """
+            SELECT 
+                domain, 
+                COUNT(*) AS count
+            FROM accs 
+            WHERE domain IS NOT NULL AND domain != ''
+            GROUP BY domain 
+            ORDER BY count DESC 
+            LIMIT 15
+        """
+        
+        # Percentages use a separate total instead of a per-query subquery
+        batch = await self.db_manager.execute_batch({
+            'rows': query_text,
+            'total': "SELECT COUNT(*) AS total FROM accs WHERE domain IS NOT NULL AND domain != ''"
+        })
+        result = batch['rows']
+        total = batch['total'][0]['total'] if batch['total'] else 0
+        
+        if not result:
+            return "📧 **Domain Analysis**\n\nNo domain data found."
+        
+        total_domains = sum(row['count'] for row in result)
+        
+        domains_text = "📧 **Popular Email Domains Analysis**\n\n"
+        domains_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        
+        for i, row in enumerate(result, 1):
+            domain = row['domain']
+            count = row['count']
+            percentage = round(count * 100.0 / max(total, 1), 2)
+            emoji = self.formatter.get_domain_emoji(domain)
+            
+            # Create visual bar
+            bar_length = int((count / result[0]['count']) * 20)
+            bar = "█" * bar_length + "░" * (20 - bar_length)
+            
+            domains_text += f"{i:2d}. {emoji} **{domain}**\n"
+            domains_text += f"    `{bar}` {self.formatter.format_number(count)} ({percentage}%)\n\n"
+        
+        domains_text += f"📊 **Total Analyzed:** {self.formatter.format_number(total_domains)}\n"
+        domains_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
+        return domains_text
+    
     async def cmd_popular_domains(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Most popular domains analysis"""
         if not self._check_auth(update.effective_user.id):
@@ -785,57 +1464,10 @@ class LapsusBotHandler:
         await self._track_command_usage(update, "popular_domains")
         
         try:
-            loading_msg = await update.message.reply_text(
-                "📧 **Loading domain analysis...**", 
-                parse_mode=ParseMode.MARKDOWN
+            await self._reply_analytics(
+                update, 'popular_domains', "📧 **Loading domain analysis...**", self._render_popular_domains
             )
             
-            query = """
-                SELECT 
-                    domain, 
-                    COUNT(*) AS count,
-                    ROUND((COUNT(*) * 100.0 / (SELECT COUNT(*) FROM accs WHERE domain IS NOT NULL AND domain != '')), 2) as percentage
-                FROM accs 
-                WHERE domain IS NOT NULL AND domain != ''
-                GROUP BY domain 
-                ORDER BY count DESC 
-                LIMIT 15
-            """
-            
-            result = await self.db_manager.execute_query(query)
-            
-            if not result:
-                await loading_msg.delete()
-                await update.message.reply_text(
-                    "📧 **Domain Analysis**\n\nNo domain data found.", 
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                return
-            
-            total_domains = sum(row['count'] for row in result)
-            
-            domains_text = "📧 **Popular Email Domains Analysis**\n\n"
-            domains_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            
-            for i, row in enumerate(result, 1):
-                domain = row['domain']
-                count = row['count']
-                percentage = row['percentage']
-                emoji = self.formatter.get_domain_emoji(domain)
-                
-                # Create visual bar
-                bar_length = int((count / result[0]['count']) * 20)
-                bar = "█" * bar_length + "░" * (20 - bar_length)
-                
-                domains_text += f"{i:2d}. {emoji} **{domain}**\n"
-                domains_text += f"    `{bar}` {self.formatter.format_number(count)} ({percentage}%)\n\n"
-            
-            domains_text += f"📊 **Total Analyzed:** {self.formatter.format_number(total_domains)}\n"
-            domains_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
-            
-            await loading_msg.delete()
-            await update.message.reply_text(domains_text, parse_mode=ParseMode.MARKDOWN)
-            
         except Exception as e:
             logging.error(f"Popular domains command error: {e}")
             await update.message.reply_text(
@@ -856,18 +1488,22 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
             
-            query = """
+            week = query_builder.week_window()
+            query = f"""
                 SELECT 
                     DATE(date) as day,
                     COUNT(*) as count,
                     DAYNAME(date) as day_name
                 FROM accs 
-                WHERE DATE(date) >= CURDATE() - INTERVAL 7 DAY
+                WHERE {week.condition()}
                 GROUP BY DATE(date), DAYNAME(date)
                 ORDER BY day DESC
             """
             
-            result = await self.db_manager.execute_query(query)
+            if self._aggregates_ready():
+                result = await self.aggregates.trend(week)
+            else:
+                result = await self.db_manager.execute_query(query, week.params())
             
             if not result:
                 await loading_msg.delete()
@@ -877,37 +1513,38 @@ class LapsusBotHandler:
                 )
                 return
             
-            total_week = sum(row['count'] for row in result)
-            avg_daily = total_week / len(result) if result else 0
-            max_count = max(row['count'] for row in result) if result else 0
+            with command_metrics.track('format'):
+                total_week = sum(row['count'] for row in result)
+                avg_daily = total_week / len(result) if result else 0
+                max_count = max(row['count'] for row in result) if result else 0
             
-            trend_text = "📈 **Last 7 Days Activity Analysis**\n\n"
-            trend_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                trend_text = "📈 **Last 7 Days Activity Analysis**\n\n"
+                trend_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
             
-            for i, row in enumerate(reversed(result), 1):  # Show oldest to newest
-                day = row['day']
-                count = row['count']
-                day_name = row['day_name']
+                for i, row in enumerate(reversed(result), 1):  # Show oldest to newest
+                    day = row['day']
+                    count = row['count']
+                    day_name = row['day_name']
                 
-                # Create visual bar
-                bar_length = int((count / max_count) * 15) if max_count > 0 else 0
-                bar = "█" * bar_length + "░" * (15 - bar_length)
+                    # Create visual bar
+                    bar_length = int((count / max_count) * 15) if max_count > 0 else 0
+                    bar = "█" * bar_length + "░" * (15 - bar_length)
                 
-                # Trend indicator
-                if count > avg_daily * 1.2:
-                    trend = "📈"
-                elif count < avg_daily * 0.8:
-                    trend = "📉"
-                else:
-                    trend = "➡️"
+                    # Trend indicator
+                    if count > avg_daily * 1.2:
+                        trend = "📈"
+                    elif count < avg_daily * 0.8:
+                        trend = "📉"
+                    else:
+                        trend = "➡️"
                 
-                trend_text += f"**{day}** ({day_name[:3]})\n"
-                trend_text += f"{trend} `{bar}` **{self.formatter.format_number(count)}**\n\n"
+                    trend_text += f"**{day}** ({day_name[:3]})\n"
+                    trend_text += f"{trend} `{bar}` **{self.formatter.format_number(count)}**\n\n"
             
-            trend_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            trend_text += f"📊 **Week Total:** {self.formatter.format_number(total_week)}\n"
-            trend_text += f"📊 **Daily Average:** {self.formatter.format_number(int(avg_daily))}\n"
-            trend_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
+                trend_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                trend_text += f"📊 **Week Total:** {self.formatter.format_number(total_week)}\n"
+                trend_text += f"📊 **Daily Average:** {self.formatter.format_number(int(avg_daily))}\n"
+                trend_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
             
             await loading_msg.delete()
             await update.message.reply_text(trend_text, parse_mode=ParseMode.MARKDOWN)
@@ -919,6 +1556,62 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
     
+    async def _render_sources(self) -> str:
+        """Build the /kaynaklar message"""
+        query_text = """
+            SELECT 
+                COALESCE(NULLIF(source, ''), 'Unspecified') as source,
+                COUNT(*) as count
+            FROM accs 
+            GROUP BY source 
+            ORDER BY count DESC 
+            LIMIT 10
+        """
+        
+        # Percentages use a separate total instead of a per-query subquery
+        batch = await self.db_manager.execute_batch({
+            'rows': query_text,
+            'total': "SELECT COUNT(*) AS total FROM accs"
+        })
+        result = batch['rows']
+        total = batch['total'][0]['total'] if batch['total'] else 0
+        
+        if not result:
+            return "🔗 **Source Analysis**\n\nNo source data found."
+        
+        total_sources = sum(row['count'] for row in result)
+        
+        sources_text = "🔗 **Data Source Analysis**\n\n"
+        sources_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        
+        source_emojis = {
+            'api': '🔌', 'import': '📦', 'manual': '👤', 'auto': '🤖',
+            'web': '🌐', 'form': '📝', 'migration': '🔄', 'unspecified': '❓'
+        }
+        
+        for i, row in enumerate(result, 1):
+            source = row['source']
+            count = row['count']
+            percentage = round(count * 100.0 / max(total, 1), 2)
+            
+            # Get appropriate emoji
+            emoji = '📂'
+            for key, emoji_val in source_emojis.items():
+                if key.lower() in source.lower():
+                    emoji = emoji_val
+                    break
+            
+            # Create visual bar
+            bar_length = int((count / result[0]['count']) * 20)
+            bar = "█" * bar_length + "░" * (20 - bar_length)
+            
+            sources_text += f"{i:2d}. {emoji} **{source}**\n"
+            sources_text += f"    `{bar}` {self.formatter.format_number(count)} ({percentage}%)\n\n"
+        
+        sources_text += f"📊 **Total Analyzed:** {self.formatter.format_number(total_sources)}\n"
+        sources_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
+        return sources_text
+    
     async def cmd_sources(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Source-based categorization analysis"""
         if not self._check_auth(update.effective_user.id):
@@ -927,67 +1620,10 @@ class LapsusBotHandler:
         await self._track_command_usage(update, "sources")
         
         try:
-            loading_msg = await update.message.reply_text(
-                "🔗 **Loading source analysis...**", 
-                parse_mode=ParseMode.MARKDOWN
+            await self._reply_analytics(
+                update, 'sources', "🔗 **Loading source analysis...**", self._render_sources
             )
             
-            query = """
-                SELECT 
-                    COALESCE(NULLIF(source, ''), 'Unspecified') as source,
-                    COUNT(*) as count,
-                    ROUND((COUNT(*) * 100.0 / (SELECT COUNT(*) FROM accs)), 2) as percentage
-                FROM accs 
-                GROUP BY source 
-                ORDER BY count DESC 
-                LIMIT 10
-            """
-            
-            result = await self.db_manager.execute_query(query)
-            
-            if not result:
-                await loading_msg.delete()
-                await update.message.reply_text(
-                    "🔗 **Source Analysis**\n\nNo source data found.", 
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                return
-            
-            total_sources = sum(row['count'] for row in result)
-            
-            sources_text = "🔗 **Data Source Analysis**\n\n"
-            sources_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            
-            source_emojis = {
-                'api': '🔌', 'import': '📦', 'manual': '👤', 'auto': '🤖',
-                'web': '🌐', 'form': '📝', 'migration': '🔄', 'unspecified': '❓'
-            }
-            
-            for i, row in enumerate(result, 1):
-                source = row['source']
-                count = row['count']
-                percentage = row['percentage']
-                
-                # Get appropriate emoji
-                emoji = '📂'
-                for key, emoji_val in source_emojis.items():
-                    if key.lower() in source.lower():
-                        emoji = emoji_val
-                        break
-                
-                # Create visual bar
-                bar_length = int((count / result[0]['count']) * 20)
-                bar = "█" * bar_length + "░" * (20 - bar_length)
-                
-                sources_text += f"{i:2d}. {emoji} **{source}**\n"
-                sources_text += f"    `{bar}` {self.formatter.format_number(count)} ({percentage}%)\n\n"
-            
-            sources_text += f"📊 **Total Analyzed:** {self.formatter.format_number(total_sources)}\n"
-            sources_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
-            
-            await loading_msg.delete()
-            await update.message.reply_text(sources_text, parse_mode=ParseMode.MARKDOWN)
-            
         except Exception as e:
             logging.error(f"Sources command error: {e}")
             await update.message.reply_text(
@@ -1039,19 +1675,20 @@ class LapsusBotHandler:
                 )
                 return
             
-            record = result[0]
-            
-            # Format the record information
-            record_text = f"🔍 **SPID Search Result**\n\n"
-            record_text += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            record_text += f"🆔 **SPID:** `{record.get('id', 'N/A')}`\n"
-            record_text += f"📧 **Email:** `{record.get('email', 'N/A')}`\n"
-            record_text += f"🔑 **Password:** `{record.get('password', 'N/A')}`\n"
-            record_text += f"🌍 **Domain:** `{record.get('domain', 'N/A')}`\n"
-            record_text += f"🌎 **Region:** `{record.get('region', 'N/A')}`\n"
-            record_text += f"🔗 **Source:** `{record.get('source', 'N/A')}`\n"
-            record_text += f"📅 **Date:** `{record.get('date', 'N/A')}`\n"
-            record_text += f"\n🕒 **Retrieved:** `{self.formatter.format_datetime(datetime.now())}`"
+            with command_metrics.track('format'):
+                record = result[0]
+            
+                # Format the record information
+                record_text = f"🔍 **SPID Search Result**\n\n"
+                record_text += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                record_text += f"🆔 **SPID:** `{record.get('id', 'N/A')}`\n"
+                record_text += f"📧 **Email:** `{record.get('email', 'N/A')}`\n"
+                record_text += f"🔑 **Password:** `{record.get('password', 'N/A')}`\n"
+                record_text += f"🌍 **Domain:** `{record.get('domain', 'N/A')}`\n"
+                record_text += f"🌎 **Region:** `{record.get('region', 'N/A')}`\n"
+                record_text += f"🔗 **Source:** `{record.get('source', 'N/A')}`\n"
+                record_text += f"📅 **Date:** `{record.get('date', 'N/A')}`\n"
+                record_text += f"\n🕒 **Retrieved:** `{self.formatter.format_datetime(datetime.now())}`"
             
             await update.message.reply_text(record_text, parse_mode=ParseMode.MARKDOWN)
             
@@ -1117,21 +1754,22 @@ class LapsusBotHandler:
                 )
                 return
             
-            total_matches = sum(row['count'] for row in result)
+            with command_metrics.track('format'):
+                total_matches = sum(row['count'] for row in result)
             
-            search_text = f"🔍 **Search Results for: `{keyword}`**\n\n"
-            search_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                search_text = f"🔍 **Search Results for: `{keyword}`**\n\n"
+                search_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
             
-            for i, row in enumerate(result, 1):
-                domain = row['domain']
-                count = row['count']
-                emoji = self.formatter.get_domain_emoji(domain)
+                for i, row in enumerate(result, 1):
+                    domain = row['domain']
+                    count = row['count']
+                    emoji = self.formatter.get_domain_emoji(domain)
                 
-                search_text += f"{i:2d}. {emoji} **{domain}**\n"
-                search_text += f"    📊 {self.formatter.format_number(count)} records\n\n"
+                    search_text += f"{i:2d}. {emoji} **{domain}**\n"
+                    search_text += f"    📊 {self.formatter.format_number(count)} records\n\n"
             
-            search_text += f"📊 **Total Matches:** {self.formatter.format_number(total_matches)}\n"
-            search_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
+                search_text += f"📊 **Total Matches:** {self.formatter.format_number(total_matches)}\n"
+                search_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
             
             await update.message.reply_text(search_text, parse_mode=ParseMode.MARKDOWN)
             
@@ -1176,42 +1814,45 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
             
-            # Get records for specific date
-            queries = {
-                'total': "SELECT COUNT(*) as count FROM accs WHERE DATE(date) = %s",
-                'domains': """
-                    SELECT domain, COUNT(*) as count 
-                    FROM accs 
-                    WHERE DATE(date) = %s AND domain IS NOT NULL AND domain != ''
-                    GROUP BY domain 
-                    ORDER BY count DESC 
-                    LIMIT 5
-                """,
-                'regions': """
-                    SELECT region, COUNT(*) as count 
-                    FROM accs 
-                    WHERE DATE(date) = %s AND region IS NOT NULL AND region != ''
-                    GROUP BY region 
-                    ORDER BY count DESC 
-                    LIMIT 5
-                """,
-                'hourly': """
-                    SELECT HOUR(date) as hour, COUNT(*) as count 
-                    FROM accs 
-                    WHERE DATE(date) = %s
-                    GROUP BY HOUR(date)
-                    ORDER BY hour
-                """
-            }
-            
-            results = {}
-            for key, query in queries.items():
-                result = await self.db_manager.execute_query(query, (date_str,))
-                results[key] = result if result else []
+            # Independent breakdowns run concurrently; the total is the sum of the hourly buckets
+            day = query_builder.day_window(date_str)
+            cached = await self._get_cached_day('date_query', date_str)
+            if cached is not None:
+                results = cached
+            elif self._aggregates_ready():
+                results = await self.aggregates.date_breakdown(day)
+            else:
+                results = await self.db_manager.execute_batch({
+                    'domains': (f"""
+                        SELECT domain, COUNT(*) as count 
+                        FROM accs 
+                        WHERE {day.condition()} AND domain IS NOT NULL AND domain != ''
+                        GROUP BY domain 
+                        ORDER BY count DESC 
+                        LIMIT 5
+                    """, day.params()),
+                    'regions': (f"""
+                        SELECT region, COUNT(*) as count 
+                        FROM accs 
+                        WHERE {day.condition()} AND region IS NOT NULL AND region != ''
+                        GROUP BY region 
+                        ORDER BY count DESC 
+                        LIMIT 5
+                    """, day.params()),
+                    'hourly': (f"""
+                        SELECT HOUR(date) as hour, COUNT(*) as count 
+                        FROM accs 
+                        WHERE {day.condition()}
+                        GROUP BY HOUR(date)
+                        ORDER BY hour
+                    """, day.params())
+                })
+            if cached is None:
+                await self._store_cached_day('date_query', date_str, results)
             
             await loading_msg.delete()
             
-            total_count = results['total'][0]['count'] if results['total'] else 0
+            total_count = sum(row['count'] for row in results['hourly'])
             
             if total_count == 0:
                 await update.message.reply_text(
@@ -1220,32 +1861,33 @@ class LapsusBotHandler:
                 )
                 return
             
-            date_text = f"📅 **Date Query Results: {date_str}**\n\n"
-            date_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            date_text += f"📊 **Total Records:** {self.formatter.format_number(total_count)}\n\n"
-            
-            # Top domains for the date
-            if results['domains']:
-                date_text += "🌐 **Top Domains:**\n"
-                for i, row in enumerate(results['domains'], 1):
-                    emoji = self.formatter.get_domain_emoji(row['domain'])
-                    date_text += f"{i}. {emoji} {row['domain']}: {row['count']}\n"
-                date_text += "\n"
-            
-            # Top regions for the date
-            if results['regions']:
-                date_text += "🌍 **Top Regions:**\n"
-                for i, row in enumerate(results['regions'], 1):
-                    flag = self.formatter.get_region_flag(row['region'])
-                    date_text += f"{i}. {flag} {row['region']}: {row['count']}\n"
-                date_text += "\n"
-            
-            # Hourly distribution
-            if results['hourly']:
-                peak_hour = max(results['hourly'], key=lambda x: x['count'])
-                date_text += f"⏰ **Peak Activity:** {peak_hour['hour']:02d}:00 ({peak_hour['count']} records)\n\n"
-            
-            date_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
+            with command_metrics.track('format'):
+                date_text = f"📅 **Date Query Results: {date_str}**\n\n"
+                date_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                date_text += f"📊 **Total Records:** {self.formatter.format_number(total_count)}\n\n"
+            
+                # Top domains for the date
+                if results['domains']:
+                    date_text += "🌐 **Top Domains:**\n"
+                    for i, row in enumerate(results['domains'], 1):
+                        emoji = self.formatter.get_domain_emoji(row['domain'])
+                        date_text += f"{i}. {emoji} {row['domain']}: {row['count']}\n"
+                    date_text += "\n"
+            
+                # Top regions for the date
+                if results['regions']:
+                    date_text += "🌍 **Top Regions:**\n"
+                    for i, row in enumerate(results['regions'], 1):
+                        flag = self.formatter.get_region_flag(row['region'])
+                        date_text += f"{i}. {flag} {row['region']}: {row['count']}\n"
+                    date_text += "\n"
+            
+                # Hourly distribution
+                if results['hourly']:
+                    peak_hour = max(results['hourly'], key=lambda x: x['count'])
+                    date_text += f"⏰ **Peak Activity:** {peak_hour['hour']:02d}:00 ({peak_hour['count']} records)\n\n"
+            
+                date_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
             
             await update.message.reply_text(date_text, parse_mode=ParseMode.MARKDOWN)
             
@@ -1280,42 +1922,32 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
             
-            # Get detailed domain information
-            queries = {
-                'total': "SELECT COUNT(*) as count FROM accs WHERE LOWER(domain) = %s",
-                'recent': """
-                    SELECT COUNT(*) as count 
+            # One pass for the domain summary, regional breakdown alongside it
+            week = query_builder.week_window()
+            results = await self.db_manager.execute_batch({
+                'summary': (f"""
+                    SELECT 
+                        COUNT(*) AS count,
+                        {week.count_if('recent_count')},
+                        MIN(date) AS first_date,
+                        MAX(date) AS last_date
                     FROM accs 
-                    WHERE LOWER(domain) = %s AND DATE(date) >= CURDATE() - INTERVAL 7 DAY
-                """,
-                'regions': """
+                    WHERE LOWER(domain) = %s
+                """, week.params() + (domain,)),
+                'regions': ("""
                     SELECT region, COUNT(*) as count 
                     FROM accs 
                     WHERE LOWER(domain) = %s AND region IS NOT NULL AND region != ''
                     GROUP BY region 
                     ORDER BY count DESC 
                     LIMIT 5
-                """,
-                'first_seen': """
-                    SELECT MIN(date) as first_date 
-                    FROM accs 
-                    WHERE LOWER(domain) = %s
-                """,
-                'last_seen': """
-                    SELECT MAX(date) as last_date 
-                    FROM accs 
-                    WHERE LOWER(domain) = %s
-                """
-            }
-            
-            results = {}
-            for key, query in queries.items():
-                result = await self.db_manager.execute_query(query, (domain,))
-                results[key] = result[0] if result else {}
+                """, (domain,))
+            })
             
             await loading_msg.delete()
             
-            total_count = results['total'].get('count', 0)
+            summary = results['summary'][0] if results['summary'] else {}
+            total_count = int(summary.get('count') or 0)
             
             if total_count == 0:
                 await update.message.reply_text(
@@ -1324,29 +1956,30 @@ class LapsusBotHandler:
                 )
                 return
             
-            recent_count = results['recent'].get('count', 0)
-            first_seen = results['first_seen'].get('first_date')
-            last_seen = results['last_seen'].get('last_date')
+            with command_metrics.track('format'):
+                recent_count = int(summary.get('recent_count') or 0)
+                first_seen = summary.get('first_date')
+                last_seen = summary.get('last_date')
             
-            domain_text = f"🌐 **Domain Analysis: {domain}**\n\n"
-            domain_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            domain_text += f"📊 **Total Records:** {self.formatter.format_number(total_count)}\n"
-            domain_text += f"🔄 **Recent (7 days):** {self.formatter.format_number(recent_count)}\n"
+                domain_text = f"🌐 **Domain Analysis: {domain}**\n\n"
+                domain_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                domain_text += f"📊 **Total Records:** {self.formatter.format_number(total_count)}\n"
+                domain_text += f"🔄 **Recent (7 days):** {self.formatter.format_number(recent_count)}\n"
             
-            if first_seen:
-                domain_text += f"👀 **First Seen:** `{first_seen}`\n"
-            if last_seen:
-                domain_text += f"👁️ **Last Seen:** `{last_seen}`\n"
+                if first_seen:
+                    domain_text += f"👀 **First Seen:** `{first_seen}`\n"
+                if last_seen:
+                    domain_text += f"👁️ **Last Seen:** `{last_seen}`\n"
             
-            # Regional distribution
-            if results['regions']:
-                domain_text += "\n🌍 **Regional Distribution:**\n"
-                for row in results['regions']:
-                    flag = self.formatter.get_region_flag(row['region'])
-                    percentage = (row['count'] / total_count) * 100
-                    domain_text += f"{flag} {row['region']}: {row['count']} ({percentage:.1f}%)\n"
+                # Regional distribution
+                if results['regions']:
+                    domain_text += "\n🌍 **Regional Distribution:**\n"
+                    for row in results['regions']:
+                        flag = self.formatter.get_region_flag(row['region'])
+                        percentage = (row['count'] / total_count) * 100
+                        domain_text += f"{flag} {row['region']}: {row['count']} ({percentage:.1f}%)\n"
             
-            domain_text += f"\n🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
+                domain_text += f"\n🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
             
             await update.message.reply_text(domain_text, parse_mode=ParseMode.MARKDOWN)
             
@@ -1380,7 +2013,9 @@ class LapsusBotHandler:
             services_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
             
             for service in services:
-                services_text += self.formatter.format_service_status(service) + "\n"
+                services_text += self.formatter.format_service_status(
+                    service, self.service_metrics.summary(service.name, 'memory')
+                ) + "\n"
             
             # Add system resources
             try:
@@ -1535,7 +2170,12 @@ class LapsusBotHandler:
             return
         
         service_name = context.args[0]
-        lines = int(context.args[1]) if len(context.args) > 1 else 20
+        # An explicit line count restarts from the end of the journal
+        reset = len(context.args) > 1
+        try:
+            lines = int(context.args[1]) if reset else 20
+        except ValueError:
+            lines = 20
         
         if service_name not in self.service_manager.monitored_services:
             await update.message.reply_text(
@@ -1550,21 +2190,82 @@ class LapsusBotHandler:
             parse_mode=ParseMode.MARKDOWN
         )
         
-        logs = await self.service_manager.get_service_logs(service_name, lines)
+        chunk = await self.log_tailer.tail(update.effective_chat.id, service_name, lines, reset=reset)
         
         await loading_msg.delete()
         
-        # Split logs if too long
-        if len(logs) > 4000:
-            logs = logs[-4000:]
-            logs = "...(truncated)\n" + logs
+        for message in self._format_log_messages(service_name, chunk, lines):
+            await update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
+    
+    def _format_log_messages(self, service_name: str, chunk: LogChunk, lines: int) -> List[str]:
+        """Telegram-sized messages for a journal read"""
+        display_name = self.service_manager.service_display_names.get(service_name, service_name)
+        if chunk.error:
+            return [f"❌ **Logs: {display_name}**\n\nError getting logs: `{chunk.error[:500]}`"]
+        
+        if chunk.incremental:
+            if not chunk.lines:
+                return [f"📋 **Logs: {display_name}**\n\nNo new log lines since your last view."]
+            header = f"📋 **Logs: {display_name}** ({len(chunk.lines)} new lines)"
+            if chunk.truncated:
+                header += f"\n⚠️ More than {self.log_tailer.max_lines} new lines, showing the latest"
+        else:
+            header = f"📋 **Logs: {display_name}** (last {lines} lines)"
+        return split_log_message(header, chunk.lines)
+    
+    async def cmd_service_follow(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Stream new service log lines to this chat for a limited time"""
+        if not self._check_auth(update.effective_user.id):
+            return await self._unauthorized_response(update)
+        
+        await self._track_command_usage(update, "service_follow")
+        
+        if not context.args or context.args[0] not in self.service_manager.monitored_services:
+            await update.message.reply_text(
+                "👁️ **Follow Service Logs**\n\n"
+                "Usage: `/servistakip <service> [minutes]` or `/servistakip <service> stop`\n\n"
+                f"Available services: {', '.join(self.service_manager.monitored_services)}",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        service_name = context.args[0]
+        chat_id = update.effective_chat.id
         
+        if len(context.args) > 1 and context.args[1].lower() in ('stop', 'dur'):
+            stopped = self.log_tailer.stop_follow(chat_id, service_name)
+            await update.message.reply_text(
+                f"⏹️ **Stopped following {service_name}**" if stopped else f"ℹ️ Not following `{service_name}`",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        try:
+            minutes = float(context.args[1]) if len(context.args) > 1 else 5
+        except ValueError:
+            minutes = 5
+        
+        duration = self._start_log_follow(chat_id, service_name, minutes * 60)
         await update.message.reply_text(
-            f"📋 **Logs for {service_name}** (last {lines} lines)\n\n"
-            f"```\n{logs}\n```",
+            f"👁️ **Following {service_name}** for {duration / 60:.0f} min\n\n"
+            f"New lines are sent every {self.log_tailer.follow_interval:.0f}s.\n"
+            f"Stop with `/servistakip {service_name} stop`.",
             parse_mode=ParseMode.MARKDOWN
         )
     
+    def _start_log_follow(self, chat_id: int, service_name: str, seconds: float) -> float:
+        """Start a follow session that delivers through the outbound queue"""
+        def send(chunk: LogChunk):
+            for message in self._format_log_messages(service_name, chunk, 0):
+                self.outbound.enqueue(chat_id, message, coalesce_key=f"logs:{service_name}")
+        
+        def finished():
+            self.outbound.enqueue(
+                chat_id, f"⏹️ Log follow for `{service_name}` ended.", coalesce_key=f"logs:{service_name}"
+            )
+        
+        return self.log_tailer.start_follow(chat_id, service_name, seconds, send, finished)
+    
     async def cmd_service_monitor(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Toggle service monitoring for this chat"""
         if not self._check_auth(update.effective_user.id):
@@ -1594,73 +2295,76 @@ class LapsusBotHandler:
     # DAILY REPORT SYSTEM
     # =====================================
     
+    @command_metrics.timed('format')
     async def generate_daily_report(self) -> str:
         """Generate comprehensive daily report"""
         try:
             yesterday = datetime.now() - timedelta(days=1)
             yesterday_str = yesterday.strftime('%Y-%m-%d')
             
-            # Get daily statistics
-            daily_query = "SELECT COUNT(*) as daily_count FROM accs WHERE DATE(date) = %s"
-            daily_result = await self.db_manager.execute_query(daily_query, (yesterday_str,))
-            daily_count = daily_result[0]['daily_count'] if daily_result else 0
-            
-            # Get regional distribution
-            regions_query = """
-                SELECT 
-                    COALESCE(region, 'Unspecified') as region, 
-                    COUNT(*) as count,
-                    ROUND((COUNT(*) * 100.0 / %s), 2) as percentage
-                FROM accs 
-                WHERE DATE(date) = %s
-                GROUP BY region 
-                ORDER BY count DESC 
-                LIMIT 10
-            """
-            regions_result = await self.db_manager.execute_query(regions_query, (max(daily_count, 1), yesterday_str))
-            
-            # Get domain distribution
-            domains_query = """
-                SELECT 
-                    domain, 
-                    COUNT(*) as count,
-                    ROUND((COUNT(*) * 100.0 / %s), 2) as percentage
-                FROM accs 
-                WHERE DATE(date) = %s AND domain IS NOT NULL AND domain != ''
-                GROUP BY domain 
-                ORDER BY count DESC 
-                LIMIT 10
-            """
-            domains_result = await self.db_manager.execute_query(domains_query, (max(daily_count, 1), yesterday_str))
-            
-            # Get hourly distribution
-            hourly_query = """
-                SELECT 
-                    HOUR(date) as hour,
-                    COUNT(*) as count
-                FROM accs 
-                WHERE DATE(date) = %s
-                GROUP BY HOUR(date)
-                ORDER BY hour
-            """
-            hourly_result = await self.db_manager.execute_query(hourly_query, (yesterday_str,))
+            # All report sections are independent; percentages are computed locally.
+            # Sections for a finished day are cached, the all-time total is always live.
+            day = query_builder.day_window(yesterday)
+            week = query_builder.range_window(yesterday - timedelta(days=6), yesterday)
+            total_task = asyncio.create_task(self._total_records())
+            cached = await self._get_cached_day('daily_report', yesterday_str)
+            if cached is not None:
+                results = cached
+            elif self._aggregates_ready():
+                results = await self.aggregates.daily_report(day, week)
+            else:
+                results = await self.db_manager.execute_batch({
+                    'regions': (f"""
+                        SELECT 
+                            COALESCE(region, 'Unspecified') as region, 
+                            COUNT(*) as count
+                        FROM accs 
+                        WHERE {day.condition()}
+                        GROUP BY region 
+                        ORDER BY count DESC 
+                        LIMIT 10
+                    """, day.params()),
+                    'domains': (f"""
+                        SELECT 
+                            domain, 
+                            COUNT(*) as count
+                        FROM accs 
+                        WHERE {day.condition()} AND domain IS NOT NULL AND domain != ''
+                        GROUP BY domain 
+                        ORDER BY count DESC 
+                        LIMIT 10
+                    """, day.params()),
+                    'hourly': (f"""
+                        SELECT 
+                            HOUR(date) as hour,
+                            COUNT(*) as count
+                        FROM accs 
+                        WHERE {day.condition()}
+                        GROUP BY HOUR(date)
+                        ORDER BY hour
+                    """, day.params()),
+                    'week': (f"""
+                        SELECT 
+                            DATE(date) as date,
+                            COUNT(*) as count
+                        FROM accs 
+                        WHERE {week.condition()}
+                        GROUP BY DATE(date)
+                        ORDER BY date DESC
+                    """, week.params())
+                })
+            if cached is None:
+                await self._store_cached_day('daily_report', yesterday_str, results)
             
-            # Get total statistics
-            total_query = "SELECT COUNT(*) as total FROM accs"
-            total_result = await self.db_manager.execute_query(total_query)
-            total_count = total_result[0]['total'] if total_result else 0
+            hourly_result = results['hourly']
+            daily_count = sum(row['count'] for row in hourly_result)
+            total_count = await total_task
+            week_result = results['week']
             
-            # Get week comparison
-            week_comparison_query = """
-                SELECT 
-                    DATE(date) as date,
-                    COUNT(*) as count
-                FROM accs 
-                WHERE DATE(date) >= %s - INTERVAL 6 DAY AND DATE(date) <= %s
-                GROUP BY DATE(date)
-                ORDER BY date DESC
-            """
-            week_result = await self.db_manager.execute_query(week_comparison_query, (yesterday_str, yesterday_str))
+            regions_result = results['regions']
+            domains_result = results['domains']
+            for row in regions_result + domains_result:
+                row['percentage'] = round(row['count'] * 100.0 / max(daily_count, 1), 2)
             
             # Generate report
             report = f"""
@@ -1766,7 +2470,7 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
             
-            report = await self.generate_daily_report()
+            report = self.report_scheduler.get_cached_report() or await self.generate_daily_report()
             
             await loading_msg.delete()
             await update.message.reply_text(report, parse_mode=ParseMode.MARKDOWN)
@@ -1794,9 +2498,10 @@ class LapsusBotHandler:
             )
         else:
             self.report_chat_ids.add(chat_id)
+            self.report_store.save()
             await update.message.reply_text(
                 "📔 **Abonelik Başarılı!**\n\n"
-                "Bu chat artık her gece saat 00:00'da günlük rapor alacak.\n\n"
+                f"Bu chat artık her gece ({self.config.daily_report_time}) günlük rapor alacak.\n\n"
                 "📋 Abonelikten çıkmak için: `/raporiptal`",
                 parse_mode=ParseMode.MARKDOWN
             )
@@ -1813,6 +2518,7 @@ class LapsusBotHandler:
         
         if chat_id in self.report_chat_ids:
             self.report_chat_ids.remove(chat_id)
+            self.report_store.save()
             await update.message.reply_text(
                 "📕 **Abonelik İptal Edildi**\n\nBu chat artık günlük rapor almayacak.",
                 parse_mode=ParseMode.MARKDOWN
@@ -1851,16 +2557,18 @@ class LapsusBotHandler:
                 'table_size': "SELECT ROUND(((data_length + index_length) / 1024 / 1024), 2) AS 'size_mb' FROM information_schema.tables WHERE table_schema = %s AND table_name = 'accs'"
             }
             
-            db_results = {}
-            for key, query in db_queries.items():
+            async def run_db_query(key, query):
                 try:
                     if key in ['table_count', 'table_size']:
                         result = await self.db_manager.execute_query(query, (self.config.db_name,))
                     else:
                         result = await self.db_manager.execute_query(query)
-                    db_results[key] = result[0] if result else {}
+                    return result[0] if result else {}
                 except Exception as e:
-                    db_results[key] = {'error': str(e)}
+                    return {'error': str(e)}
+            
+            db_values = await asyncio.gather(*(run_db_query(key, query) for key, query in db_queries.items()))
+            db_results = dict(zip(db_queries, db_values))
             
             # System diagnostics
             try:
@@ -1913,18 +2621,55 @@ class LapsusBotHandler:
                 debug_text += f"   Boot Time: {self.formatter.format_datetime(system_info['boot_time'])}\n\n"
             
             # Services Status
-            debug_text += f"🛠️ **Services Status:**\n"
+            debug_text += "🛠️ **Services Status:**\n"
             debug_text += f"   Total Services: {len(services)}\n"
             debug_text += f"   Active Services: {active_services}\n"
             debug_text += f"   Failed Services: {failed_services}\n\n"
             
             # Bot Status
-            debug_text += f"🤖 **Bot Status:**\n"
+            debug_text += "🤖 **Bot Status:**\n"
             debug_text += f"   Active Sessions: {bot_info['active_sessions']}\n"
             debug_text += f"   Admin Users: {bot_info['admin_users']}\n"
             debug_text += f"   Report Subscribers: {bot_info['report_subscribers']}\n"
             debug_text += f"   Monitor Subscribers: {bot_info['monitor_subscribers']}\n\n"
             
+            # Connection pool
+            pool_stats = self.db_manager.pool_stats()
+            if pool_stats:
+                debug_text += "🔌 **DB Connection Pool:**\n"
+                debug_text += f"   Size: {pool_stats['in_use']} in use / {pool_stats['idle']} idle (max {pool_stats['max_size']})\n"
+                debug_text += f"   Waiting: {pool_stats['waiting']}\n"
+                debug_text += f"   Acquires: {self.formatter.format_number(pool_stats['acquired'])}\n"
+                debug_text += f"   Acquire Wait: avg {pool_stats['wait_avg_ms']:.1f} ms / max {pool_stats['wait_max_ms']:.1f} ms\n"
+                debug_text += f"   Created/Recycled: {pool_stats['created']}/{pool_stats['recycled']}\n"
+                debug_text += f"   Ping Failures: {pool_stats['ping_failures']}\n\n"
+            
+            outbound_stats = self.outbound.stats()
+            limiter_stats = self.rate_limiter.stats()
+            debug_text += "📬 **Outbound Messages:**\n"
+            debug_text += f"   Queue Depth: {outbound_stats['depth']} ({outbound_stats['pending_coalesce']} coalescing)\n"
+            debug_text += f"   Sent/Failed: {outbound_stats['sent']}/{outbound_stats['failed']} (retries {outbound_stats['retries']}, coalesced {outbound_stats['coalesced']})\n"
+            debug_text += f"   Latency: avg {outbound_stats['latency_avg_ms']:.0f} ms / p95 {outbound_stats['latency_p95_ms']:.0f} ms / max {outbound_stats['latency_max_ms']:.0f} ms\n"
+            debug_text += f"   Rate Limiter: {limiter_stats['throttled']} throttled ({limiter_stats['wait_total']}s), {limiter_stats['retry_after']} flood waits\n\n"
+            
+            if self.analytics_cache:
+                cache_stats = self.analytics_cache.stats()
+                debug_text += "🗃️ **Analytics Cache:**\n"
+                debug_text += f"   Entries: {cache_stats['entries']} ({cache_stats['inflight']} loading)\n"
+                debug_text += f"   Hits/Misses: {cache_stats['hits']}/{cache_stats['misses']} (coalesced {cache_stats['coalesced']})\n"
+                debug_text += f"   Invalidations: {cache_stats['invalidations']}\n\n"
+            
+            if self.aggregates:
+                aggregate_stats = self.aggregates.stats()
+                debug_text += "📦 **Daily Aggregates:**\n"
+                debug_text += f"   Status: {'✅ Serving reports' if aggregate_stats['ready'] else '⏳ Catching up (raw queries)'}\n"
+                debug_text += f"   Watermark: id {aggregate_stats['watermark']}\n"
+                if aggregate_stats['last_refresh_age'] is not None:
+                    debug_text += f"   Last Refresh: {aggregate_stats['last_refresh_age']}s ago\n"
+                if aggregate_stats['last_error']:
+                    debug_text += f"   Last Error: `{aggregate_stats['last_error'][:100]}`\n"
+                debug_text += "\n"
+            
             debug_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
             
             await loading_msg.delete()
@@ -1937,6 +2682,113 @@ class LapsusBotHandler:
                 parse_mode=ParseMode.MARKDOWN
             )
     
+    async def cmd_db_perf(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """MySQL server performance: current values, trends and long-running queries"""
+        if not self._check_auth(update.effective_user.id):
+            return await self._unauthorized_response(update)
+        
+        await self._track_command_usage(update, "db_perf")
+        
+        if not self.db_perf:
+            await update.message.reply_text(
+                "ℹ️ **DB performance sampling is disabled** (`DB_PERF_ENABLED=false`)",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        if not self.db_perf.latest:
+            await update.message.reply_text(
+                "⏳ **Collecting samples...**\n\n"
+                f"The first values are available about {self.db_perf.interval * 2}s after startup.",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        try:
+            window = 3600
+            perf_text = "🩺 **MySQL Performance**\n\n"
+            perf_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            perf_text += "📍 **Current** (last interval):\n"
+            for metric, (label, unit) in DB_PERF_METRICS.items():
+                value = self.db_perf.latest.get(metric)
+                if value is None or value != value:  # NaN: no buffer pool reads in the interval
+                    continue
+                perf_text += f"   {label}: `{value:.1f}{unit}`\n"
+            
+            perf_text += "\n📈 **Last Hour** (min / avg / max / p95):\n"
+            for metric in ('qps', 'threads_running', 'slow_per_min', 'buffer_pool_hit_ratio', 'lock_waits_per_min'):
+                summary = self.db_perf.summary(metric, window)
+                if summary:
+                    label, unit = DB_PERF_METRICS[metric]
+                    perf_text += self.formatter.format_resource_summary(label, summary, unit)
+            
+            if self.db_perf.long_queries:
+                perf_text += "\n🐢 **Longest Running Queries:**\n"
+                for row in self.db_perf.long_queries:
+                    query_text = row['query'].replace('`', "'")
+                    perf_text += f"   `{row['time']}s` {row['user']} ({row['state'] or '-'})\n   `{query_text}`\n"
+            
+            if self.db_perf.thresholds:
+                rules = ", ".join(f"{name} {value:g}" for name, value in self.db_perf.thresholds.items())
+                perf_text += f"\n🔔 **Alert Thresholds:** `{rules}`\n"
+            if self.db_perf.last_error:
+                perf_text += f"\n⚠️ Last sampler error: `{self.db_perf.last_error[:200]}`\n"
+            
+            perf_text += f"\n🕒 **Samples:** `{self.db_perf.timestamps.count}` every `{self.db_perf.interval}s`"
+            
+            await update.message.reply_text(perf_text[:4096], parse_mode=ParseMode.MARKDOWN)
+            
+        except Exception as e:
+            logging.error(f"DB perf command error: {e}")
+            await update.message.reply_text(
+                "❌ **Error**\n\nFailed to build the performance report.",
+                parse_mode=ParseMode.MARKDOWN
+            )
+    
+    async def cmd_perf(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Per-command latency percentiles with DB / format / send / other breakdown (admin only)"""
+        if not self._check_auth(update.effective_user.id):
+            return await self._unauthorized_response(update)
+        
+        if not self._check_admin(update.effective_user.id):
+            return await self._admin_only_response(update)
+        
+        window_name = context.args[0] if context.args else '1h'
+        if window_name not in command_metrics.WINDOWS:
+            await update.message.reply_text(
+                f"❌ Unknown window `{window_name}`. Use one of: {', '.join(command_metrics.WINDOWS)}",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        rows = self.command_metrics.summary(command_metrics.WINDOWS[window_name])
+        if not rows:
+            await update.message.reply_text(
+                f"⏱️ **Command Latency ({window_name})**\n\nNo commands handled in this window.",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+        
+        perf_text = f"⏱️ **Command Latency ({window_name})**\n"
+        perf_text += "_p50 / p95 / p99 total, p95 of db / fmt / send / other, ms_\n"
+        perf_text += "_fmt `-`: formatting not tracked, included in other_\n\n"
+        for row in rows:
+            fmt = "-" if row['format_p95'] is None else f"{row['format_p95'] * 1000:.0f}"
+            entry = (
+                f"**/{row['command']}** `{row['count']}` calls"
+                + (f", `{row['errors']}` errors" if row['errors'] else "")
+                + "\n"
+                f"   `{row['p50'] * 1000:.0f} / {row['p95'] * 1000:.0f} / {row['p99'] * 1000:.0f}` "
+                f"(db `{row['db_p95'] * 1000:.0f}` fmt `{fmt}` send `{row['send_p95'] * 1000:.0f}` "
+                f"other `{row['other_p95'] * 1000:.0f}`)\n"
+            )
+            if len(perf_text) + len(entry) > 4000:
+                perf_text += "…\n"
+                break
+            perf_text += entry
+        
+        await update.message.reply_text(perf_text, parse_mode=ParseMode.MARKDOWN)
+    
     async def cmd_sessions(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show active user sessions (admin only)"""
         if not self._check_auth(update.effective_user.id):
@@ -2015,7 +2867,8 @@ class LapsusBotHandler:
 
 🛠️ **System Service Management:**
 • `/servisler` - View all services status
-• `/servisloglari <service>` - View service logs
+• `/servisloglari <service> [lines]` - New service log lines (a line count shows the latest lines)
+• `/servistakip <service> [minutes]` - Follow service logs for a while
 • `/servisizleme` - Toggle service monitoring
 
 📊 **Daily Report System:**
@@ -2025,6 +2878,8 @@ class LapsusBotHandler:
 
 🛠️ **System Commands:**
 • `/debug` - System diagnostics & analysis
+• `/dbperf` - MySQL performance trends & slow queries
+• `/perf [5m|1h|24h]` - Command latency breakdown (admin)
 • `/status` - Bot & database status
 • `/help` - This help menu
 
@@ -2156,6 +3011,13 @@ class LapsusBotHandler:
         elif data.startswith("logs_"):
             service_name = data.replace("logs_", "")
             await self._handle_service_logs(query, service_name)
+        elif data.startswith("logsfull_"):
+            service_name = data.replace("logsfull_", "")
+            await self._handle_service_logs(query, service_name, reset=True)
+        elif data.startswith("follow_"):
+            await self._handle_log_follow(query, data.replace("follow_", "", 1), start=True)
+        elif data.startswith("unfollow_"):
+            await self._handle_log_follow(query, data.replace("unfollow_", "", 1), start=False)
     
     async def _handle_services_refresh(self, query):
         """Handle services refresh callback"""
@@ -2166,7 +3028,9 @@ class LapsusBotHandler:
             services_text += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
             
             for service in services:
-                services_text += self.formatter.format_service_status(service) + "\n"
+                services_text += self.formatter.format_service_status(
+                    service, self.service_metrics.summary(service.name, 'memory')
+                ) + "\n"
             
             services_text += f"\n🕒 **Last Updated:** `{self.formatter.format_datetime(datetime.now())}`"
             
@@ -2322,8 +3186,8 @@ class LapsusBotHandler:
             reply_markup=reply_markup
         )
     
-    async def _handle_service_logs(self, query, service_name):
-        """Handle service logs display"""
+    async def _handle_service_logs(self, query, service_name, reset: bool = False):
+        """Handle service logs display (new lines since this chat's last view)"""
         service_display_name = self.service_manager.service_display_names.get(service_name, service_name)
         
         await query.edit_message_text(
@@ -2331,16 +3195,20 @@ class LapsusBotHandler:
             parse_mode=ParseMode.MARKDOWN
         )
         
-        logs = await self.service_manager.get_service_logs(service_name, 15)
-        
-        # Split logs if too long
-        if len(logs) > 3500:
-            logs = logs[-3500:]
-            logs = "...(truncated)\n" + logs
+        chunk = await self.log_tailer.tail(query.message.chat_id, service_name, 15, reset=reset)
+        messages = self._format_log_messages(service_name, chunk, 15)
         
+        following = self.log_tailer.is_following(query.message.chat_id, service_name)
         keyboard = [
             [
-                InlineKeyboardButton("🔄 Refresh Logs", callback_data=f"logs_{service_name}"),
+                InlineKeyboardButton("🔄 New Lines", callback_data=f"logs_{service_name}"),
+                InlineKeyboardButton("📜 Last 15", callback_data=f"logsfull_{service_name}")
+            ],
+            [
+                InlineKeyboardButton(
+                    "⏹️ Stop Follow" if following else "👁️ Follow 5 min",
+                    callback_data=f"{'unfollow' if following else 'follow'}_{service_name}"
+                ),
                 InlineKeyboardButton("🎛️ Control", callback_data=f"control_{service_name}")
             ],
             [
@@ -2349,12 +3217,29 @@ class LapsusBotHandler:
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
+        # Overflow goes out as extra messages; the buttons stay on the last one
         await query.edit_message_text(
-            f"📋 **Logs: {service_display_name}** (last 15 lines)\n\n"
-            f"```\n{logs}\n```",
+            messages[0],
             parse_mode=ParseMode.MARKDOWN,
-            reply_markup=reply_markup
+            reply_markup=reply_markup if len(messages) == 1 else None
         )
+        for index, message in enumerate(messages[1:], start=2):
+            await query.message.reply_text(
+                message,
+                parse_mode=ParseMode.MARKDOWN,
+                reply_markup=reply_markup if index == len(messages) else None
+            )
+    
+    async def _handle_log_follow(self, query, service_name: str, start: bool):
+        """Start or stop following a service's logs from the logs view"""
+        chat_id = query.message.chat_id
+        if start:
+            duration = self._start_log_follow(chat_id, service_name, 300)
+            text = f"👁️ **Following {service_name}** for {duration / 60:.0f} min"
+        else:
+            self.log_tailer.stop_follow(chat_id, service_name)
+            text = f"⏹️ **Stopped following {service_name}**"
+        await query.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
     
     async def _handle_services_logs_menu(self, query):
         """Handle services logs menu"""
@@ -2429,6 +3314,16 @@ class LapsusBotHandler:
                 if service.pid:
                     detailed_text += f"   PID: `{service.pid}`\n"
                 
+                memory_summary = self.service_metrics.summary(service.name, 'memory')
+                cpu_summary = self.service_metrics.summary(service.name, 'cpu')
+                if memory_summary or cpu_summary:
+                    hours = self.service_metrics.covered_hours(service.name)
+                    detailed_text += f"   History ({hours:.1f}h, min/avg/max/p95):\n"
+                    if memory_summary:
+                        detailed_text += self.formatter.format_resource_summary("Memory", memory_summary, "MB")
+                    if cpu_summary:
+                        detailed_text += self.formatter.format_resource_summary("CPU", cpu_summary, "%")
+                
                 detailed_text += "\n"
             
             detailed_text += f"🕒 **Generated:** `{self.formatter.format_datetime(datetime.now())}`"
@@ -2469,10 +3364,15 @@ class LapsusBotHandler:
             try:
                 services = await self.service_manager.get_all_services_status()
                 changes = self.service_manager.detect_status_changes(services)
+                self.service_metrics.record(services)
                 
                 if changes and self.service_monitor_chats:
                     await self._send_service_notifications(changes)
                 
+                alerts = self.service_metrics.check_alerts({s.name: s.display_name for s in services})
+                if alerts and self.service_monitor_chats:
+                    self._send_resource_alerts(alerts)
+                
                 await asyncio.sleep(self.config.service_check_interval)
                 
             except Exception as e:
@@ -2498,18 +3398,50 @@ class LapsusBotHandler:
             elif change['current_status'] == 'inactive':
                 notification = "🔴 " + notification
             
-            # Send to all monitoring chats
+            # Queue for all monitoring chats; bursts are merged per chat
             for chat_id in self.service_monitor_chats.copy():
-                try:
-                    await self.application.bot.send_message(
-                        chat_id=chat_id,
-                        text=notification,
-                        parse_mode=ParseMode.MARKDOWN
-                    )
-                except Exception as e:
-                    logging.error(f"Failed to send notification to {chat_id}: {e}")
-                    # Remove problematic chat
-                    self.service_monitor_chats.discard(chat_id)
+                self.outbound.enqueue(chat_id, notification, coalesce_key="service_status")
+    
+    def _send_db_perf_alerts(self, alerts: List[Dict[str, Any]]):
+        """Send MySQL performance threshold alerts to the service monitor chats"""
+        if not self.service_monitor_chats:
+            return
+        lines = []
+        for alert in alerts:
+            comparison = "above" if alert['direction'] == 'max' else "below"
+            lines.append(
+                f"{alert['label']}: `{alert['value']:.1f}{alert['unit']}` "
+                f"({comparison} `{alert['threshold']:g}{alert['unit']}`)"
+            )
+        notification = (
+            "🩺 **MySQL Performance Alert**\n\n"
+            + "\n".join(lines)
+            + f"\nTime: `{self.formatter.format_datetime(datetime.now())}`"
+        )
+        for chat_id in self.service_monitor_chats.copy():
+            self.outbound.enqueue(chat_id, notification, coalesce_key="db_perf")
+    
+    def _send_resource_alerts(self, alerts: List[Dict[str, Any]]):
+        """Send resource threshold alerts through the service notification path"""
+        for alert in alerts:
+            if alert['kind'] == 'rss_growth':
+                detail = (
+                    f"Memory growth: `{alert['value']:.1f} MB/h` (threshold `{alert['threshold']:.1f}`)\n"
+                    f"Current: `{alert['current']:.1f} MB`"
+                )
+            else:
+                detail = (
+                    f"Average CPU: `{alert['value']:.1f}%` (threshold `{alert['threshold']:.1f}%`)\n"
+                    f"Current: `{alert['current']:.1f}%`"
+                )
+            notification = (
+                f"⚠️ **Service Resource Alert**\n\n"
+                f"Service: **{alert['service']}**\n"
+                f"{detail}\n"
+                f"Time: `{self.formatter.format_datetime(datetime.now())}`"
+            )
+            for chat_id in self.service_monitor_chats.copy():
+                self.outbound.enqueue(chat_id, notification, coalesce_key="service_status")
 
 # =====================================
 # ENHANCED APPLICATION CLASS
@@ -2522,9 +3454,10 @@ class LapsusBotApplication:
         self.config = Config.load_from_env()
         self.handler = LapsusBotHandler(self.config)
         self.application: Optional[Application] = None
-        self.scheduler_thread = None
-        self.scheduler_running = False
+        self.report_task = None
         self.monitoring_task = None
+        self.aggregate_task = None
+        self.db_perf_task = None
     
     def setup_handlers(self):
         """Setup all command handlers"""
@@ -2555,6 +3488,7 @@ class LapsusBotApplication:
             ("servisler", self.handler.cmd_services),
             ("servisyonet", self.handler.cmd_service_control),
             ("servisloglari", self.handler.cmd_service_logs),
+            ("servistakip", self.handler.cmd_service_follow),
             ("servisizleme", self.handler.cmd_service_monitor),
             
             # Daily Reports
@@ -2564,14 +3498,19 @@ class LapsusBotApplication:
             
             # Debug & Admin
             ("debug", self.handler.cmd_debug),
+            ("dbperf", self.handler.cmd_db_perf),
+            ("perf", self.handler.cmd_perf),
             ("sessions", self.handler.cmd_sessions),
         ]
         
+        metrics = self.handler.command_metrics
         for command, handler in handlers:
-            self.application.add_handler(CommandHandler(command, handler))
+            self.application.add_handler(CommandHandler(command, with_request_id(metrics.instrument(command, handler))))
         
         # Add callback query handler
-        self.application.add_handler(CallbackQueryHandler(self.handler.handle_callback_query))
+        self.application.add_handler(
+            CallbackQueryHandler(with_request_id(metrics.instrument("callback", self.handler.handle_callback_query)))
+        )
         
         logging.info(f"✅ Registered {len(handlers)} command handlers + callback handler")
     
@@ -2581,6 +3520,26 @@ class LapsusBotApplication:
         if self.handler.service_monitor_enabled:
             self.monitoring_task = asyncio.create_task(self.handler.start_service_monitoring())
             logging.info("✅ Service monitoring task started")
+        
+        # Outbound message workers
+        await self.handler.outbound.start()
+        
+        # Nightly daily report precompute and broadcast
+        if self.handler.daily_report_enabled:
+            self.report_task = asyncio.create_task(self.handler.report_scheduler.run())
+            logging.info("✅ Daily report scheduler started")
+        
+        # Keep daily aggregates current for report commands
+        if self.handler.aggregates:
+            self.aggregate_task = asyncio.create_task(self.handler.aggregates.run())
+            logging.info("✅ Daily aggregate refresh task started")
+        
+        # MySQL server performance sampling and alerts
+        if self.handler.db_perf:
+            self.db_perf_task = asyncio.create_task(
+                self.handler.db_perf.run(self.handler._send_db_perf_alerts)
+            )
+            logging.info("✅ MySQL performance sampler started")
     
     def run_sync(self):
         """Synchronous run method"""
@@ -2604,7 +3563,12 @@ class LapsusBotApplication:
                 return False
             
             # Create application
-            self.application = ApplicationBuilder().token(self.config.bot_token).build()
+            self.application = (
+                ApplicationBuilder()
+                .token(self.config.bot_token)
+                .rate_limiter(self.handler.rate_limiter)
+                .build()
+            )
             self.handler.application = self.application
             
             # Setup handlers
@@ -2628,6 +3592,17 @@ class LapsusBotApplication:
             logging.info("🔄 Cleaning up resources...")
             if self.monitoring_task:
                 self.monitoring_task.cancel()
+            if self.aggregate_task:
+                self.aggregate_task.cancel()
+            if self.report_task:
+                self.report_task.cancel()
+            if self.db_perf_task:
+                self.db_perf_task.cancel()
+            self.handler.log_tailer.stop_all()
+            self.handler.outbound.stop()
+            self.handler.db_manager.close()
+            if self.handler.result_cache:
+                self.handler.result_cache.close()
         
         return True
 
@@ -2636,35 +3611,38 @@ class LapsusBotApplication:
 # =====================================
 
 def setup_logging(config: BotConfig):
-    """Setup comprehensive logging"""
-    log_format = "%(asctime)s | %(levelname)8s | %(name)s | %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
-    
-    os.makedirs("logs", exist_ok=True)
-    
-    file_handler = logging.FileHandler(
-        filename=f"logs/enhanced_lapsus_bot_{datetime.now().strftime('%Y%m%d')}.log",
-        encoding='utf-8'
-    )
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(logging.Formatter(log_format, date_format))
-    
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, config.log_level.upper()))
-    console_handler.setFormatter(logging.Formatter(log_format, date_format))
-    
-    logging.basicConfig(
-        level=logging.DEBUG,
-        handlers=[file_handler, console_handler],
-        format=log_format,
-        datefmt=date_format
+    """Route all logging through the shared queue-based pipeline
+
+    The file gets every DEBUG record as JSON and rotates at ``log_rotate_when``;
+    the console follows ``log_level``. Formatting and I/O happen on the
+    listener thread, never on the event loop.
+    """
+    logging_setup.configure(
+        level="DEBUG",
+        fmt=config.log_format,
+        file=config.log_file,
+        when=config.log_rotate_when,
+        backup_count=config.log_backup_count,
+        console=True,
+        console_level=config.log_level.upper(),
+        console_format="text",
+        stream=sys.stdout,
+        queue_size=config.log_queue_size,
+        sample_rate=config.log_info_sample_rate,
+        quiet_loggers=("httpx", "urllib3"),
+        datefmt="%Y-%m-%d %H:%M:%S"
     )
-    
-    # Reduce noise from external libraries
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("telegram").setLevel(logging.INFO)
 
+def with_request_id(handler):
+    """Tag every log record emitted while handling an update with its update id"""
+    @functools.wraps(handler)
+    async def wrapper(update, context):
+        update_id = getattr(update, "update_id", None)
+        with logging_setup.request_context(f"tg-{update_id}" if update_id is not None else None):
+            return await handler(update, context)
+    return wrapper
+
 # =====================================
 # MAIN ENTRY POINT
 # =====================================
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Per-command latency instrumentation for the bot
+
+Every registered handler is wrapped by ``CommandMetrics.instrument``. The
+wrapper puts a ``CommandTiming`` into a context variable; the database layer
+and the Telegram rate limiter report their time into it through ``track``,
+and reply builders are wrapped in ``track('format')`` / ``timed('format')``.
+Each command's latency splits into DB time, formatting time, send time
+(Telegram API, including rate-limit waits) and everything else (auth,
+usage tracking, cache waits). A phase nested in another, e.g. a query run
+by a render function, is only counted once, under the inner phase.
+Overlapping work, e.g. a concurrent query batch, counts as wall-clock time.
+"""
+
+import functools
+import inspect
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+
+PHASES = ('db', 'format', 'send')
+
+# Windows offered by /perf
+WINDOWS: Dict[str, int] = {
+    '5m': 300,
+    '1h': 3600,
+    '24h': 86400,
+}
+
+
+class CommandTiming:
+    """Phase timers for one handler invocation"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals = {phase: 0.0 for phase in PHASES}
+        self.tracked = set()
+        self.error = False
+        self._active = {phase: 0 for phase in PHASES}
+        self._entered = {phase: 0.0 for phase in PHASES}
+        self._nested = {phase: 0.0 for phase in PHASES}
+
+    def _others(self, phase: str) -> float:
+        return sum(total for name, total in self.totals.items() if name != phase)
+
+    def enter(self, phase: str):
+        if self._active[phase] == 0:
+            self._entered[phase] = time.perf_counter()
+            self._nested[phase] = self._others(phase)
+        self._active[phase] += 1
+        self.tracked.add(phase)
+
+    def exit(self, phase: str):
+        self._active[phase] -= 1
+        if self._active[phase] == 0:
+            # Time recorded by other phases inside this one stays with them
+            nested = self._others(phase) - self._nested[phase]
+            self.totals[phase] += max(0.0, time.perf_counter() - self._entered[phase] - nested)
+
+
+_current: ContextVar[Optional[CommandTiming]] = ContextVar('command_timing', default=None)
+
+
+@contextmanager
+def track(phase: str):
+    """Attribute the enclosed time to ``phase`` of the running command, if any"""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    timing.enter(phase)
+    try:
+        yield
+    finally:
+        timing.exit(phase)
+
+
+def timed(phase: str):
+    """Decorator form of ``track`` for sync and async functions"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track(phase):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def mark_error():
+    """Count the running command as failed even if its handler recovers"""
+    timing = _current.get()
+    if timing is not None:
+        timing.error = True
+
+
+class Sample(NamedTuple):
+    at: float
+    total: float
+    db: float
+    format: Optional[float]  # None when the command has no tracked formatting
+    send: float
+    error: bool
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+# =====================================
+# METRICS STORE
+# =====================================
+
+class CommandMetrics:
+    """Sliding-window latency samples per command"""
+
+    def __init__(self, max_samples: int = 5000, retention: int = max(WINDOWS.values())):
+        self.max_samples = max_samples
+        self.retention = retention
+        self._samples: Dict[str, Deque[Sample]] = {}
+
+    def instrument(self, name: str, handler):
+        """Wrap an async PTB handler so every call is timed under ``name``"""
+        @functools.wraps(handler)
+        async def wrapper(update, context):
+            timing = CommandTiming()
+            token = _current.set(timing)
+            try:
+                return await handler(update, context)
+            except Exception:
+                timing.error = True
+                raise
+            finally:
+                _current.reset(token)
+                self.record(name, timing)
+        return wrapper
+
+    def record(self, name: str, timing: CommandTiming):
+        now = time.time()
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.max_samples)
+        samples.append(Sample(
+            now,
+            time.perf_counter() - timing.started,
+            timing.totals['db'],
+            timing.totals['format'] if 'format' in timing.tracked else None,
+            timing.totals['send'],
+            timing.error
+        ))
+        while samples and now - samples[0].at > self.retention:
+            samples.popleft()
+
+    def summary(self, window: int) -> List[Dict[str, Any]]:
+        """Per-command count, errors, total p50/p95/p99 and phase p95s, slowest first
+
+        ``format_p95`` is None for commands whose formatting is not tracked
+        (it is then part of ``other_p95``).
+        """
+        cutoff = time.time() - window
+        results = []
+        for name, samples in self._samples.items():
+            recent = [sample for sample in samples if sample.at >= cutoff]
+            if not recent:
+                continue
+            totals = [sample.total for sample in recent]
+            formats = [sample.format for sample in recent if sample.format is not None]
+            results.append({
+                'command': name,
+                'count': len(recent),
+                'errors': sum(1 for sample in recent if sample.error),
+                'p50': _percentile(totals, 0.50),
+                'p95': _percentile(totals, 0.95),
+                'p99': _percentile(totals, 0.99),
+                'db_p95': _percentile([sample.db for sample in recent], 0.95),
+                'format_p95': _percentile(formats, 0.95) if formats else None,
+                'send_p95': _percentile([sample.send for sample in recent], 0.95),
+                'other_p95': _percentile(
+                    [max(0.0, sample.total - sample.db - (sample.format or 0.0) - sample.send)
+                     for sample in recent], 0.95
+                ),
+            })
+        return sorted(results, key=lambda row: row['p95'], reverse=True)
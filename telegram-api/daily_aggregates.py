@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained per-day aggregates over accs
+
+Counts are kept in ``accs_daily_agg`` keyed by ``(day, dimension, value)``
+and folded in from an ``accs.id`` watermark, so report commands read a few
+thousand aggregate rows instead of scanning the raw table. Rows with a NULL
+date are counted under 1970-01-01. Only inserts are tracked; rows updated or
+deleted in accs after they were folded are not reflected.
+
+Auto-increment ids are handed out at insert time but become visible at
+commit, so a lower id can show up after a higher one was already folded.
+The watermark therefore only advances to a ``MAX(id)`` observed at least
+``fold_lag`` seconds earlier; a row whose transaction stays open longer than
+that is still skipped for good.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import query_builder
+
+# =====================================
+# SCHEMA
+# =====================================
+
+AGGREGATE_TABLE = "accs_daily_agg"
+STATE_TABLE = "accs_agg_state"
+NULL_DAY = "1970-01-01"
+
+# dimension -> SQL expression over accs producing the stored value ('' = unspecified)
+DIMENSIONS: Dict[str, str] = {
+    "total": "''",
+    "region": "LEFT(COALESCE(region, ''), 255)",
+    "domain": "LEFT(COALESCE(domain, ''), 255)",
+    "source": "LEFT(COALESCE(source, ''), 255)",
+    "hour": "COALESCE(HOUR(date), '')",
+}
+
+SCHEMA_STATEMENTS = [
+    f"""
+        CREATE TABLE IF NOT EXISTS {AGGREGATE_TABLE} (
+            day DATE NOT NULL,
+            dimension VARCHAR(16) NOT NULL,
+            value VARCHAR(255) NOT NULL,
+            count BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, dimension, value),
+            KEY idx_dimension_day (dimension, day)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            name VARCHAR(64) NOT NULL PRIMARY KEY,
+            last_id BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            updated_at DATETIME NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+]
+
+FOLD_QUERY = """
+    INSERT INTO {table} (day, dimension, value, count)
+    SELECT COALESCE(DATE(date), '{null_day}') AS agg_day, %s, {expression} AS agg_value, COUNT(*)
+    FROM accs
+    WHERE id > %s AND id <= %s
+    GROUP BY agg_day, agg_value
+    ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+"""
+
+
+def _sum_if(window: query_builder.DateWindow, alias: str) -> str:
+    return f"SUM(CASE WHEN {window.condition('day')} THEN count ELSE 0 END) AS {alias}"
+
+
+# =====================================
+# AGGREGATE STORE
+# =====================================
+
+class DailyAggregateStore:
+    """Per-day region/domain/source/hour counts folded in from an id watermark"""
+
+    def __init__(self, db_manager, refresh_interval: int = 60, batch_size: int = 50000,
+                 fold_lag: int = 30, name: str = "accs_daily"):
+        self.db = db_manager
+        self.refresh_interval = max(1, refresh_interval)
+        self.batch_size = max(1, batch_size)
+        self.fold_lag = max(0, fold_lag)
+        self.name = name
+        self.watermark = 0
+        self.settled_id: Optional[int] = None
+        self._observed: deque = deque()
+        self.caught_up = False
+        self.last_refresh: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        """Aggregates are current enough to answer report commands"""
+        return (
+            self.caught_up
+            and self.last_refresh is not None
+            and time.monotonic() - self.last_refresh < self.refresh_interval * 3
+        )
+
+    async def ensure_schema(self):
+        for statement in SCHEMA_STATEMENTS:
+            await self.db.execute_query(statement)
+
+    # ---------- maintenance ----------
+
+    def _fold_batch(self, conn, high: int) -> int:
+        """Fold the next id batch up to ``high``; returns the new watermark"""
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT last_id FROM {STATE_TABLE} WHERE name = %s FOR UPDATE", (self.name,))
+            row = cursor.fetchone()
+            low = int(row['last_id']) if row else 0
+            if low >= high:
+                return low
+
+            upper = min(high, low + self.batch_size)
+            for dimension, expression in DIMENSIONS.items():
+                cursor.execute(
+                    FOLD_QUERY.format(table=AGGREGATE_TABLE, null_day=NULL_DAY, expression=expression),
+                    (dimension, low, upper)
+                )
+            cursor.execute(
+                f"""
+                    INSERT INTO {STATE_TABLE} (name, last_id, updated_at) VALUES (%s, %s, NOW())
+                    ON DUPLICATE KEY UPDATE last_id = VALUES(last_id), updated_at = VALUES(updated_at)
+                """,
+                (self.name, upper)
+            )
+            return upper
+
+    def _settled_high(self, max_id: int) -> Optional[int]:
+        """Highest MAX(id) observed at least ``fold_lag`` seconds ago, None until one is
+
+        Gives transactions that were still open when the ids were allocated
+        time to commit before the watermark moves past them.
+        """
+        now = time.monotonic()
+        self._observed.append((now, max_id))
+        while self._observed and now - self._observed[0][0] >= self.fold_lag:
+            self.settled_id = max(self.settled_id or 0, self._observed.popleft()[1])
+        return self.settled_id
+
+    async def refresh(self) -> int:
+        """Fold settled rows past the watermark; returns the number of ids advanced"""
+        rows = await self.db.execute_query("SELECT MAX(id) AS max_id FROM accs")
+        high = self._settled_high(int((rows[0]['max_id'] if rows else 0) or 0))
+        if high is None:
+            # Nothing has settled yet (first refresh after start)
+            return 0
+        start = self.watermark
+
+        while True:
+            watermark = await self.db.run_in_transaction(lambda conn: self._fold_batch(conn, high))
+            advanced = watermark != self.watermark
+            self.watermark = watermark
+            if not advanced or watermark >= high:
+                break
+            await asyncio.sleep(0)
+
+        self.caught_up = self.watermark >= high
+        self.last_refresh = time.monotonic()
+        self.last_error = None
+        if self.watermark > start:
+            logging.debug(f"Daily aggregates folded ids {start + 1}..{self.watermark}")
+        return self.watermark - start
+
+    async def run(self):
+        """Background loop keeping the aggregates current"""
+        logging.info(f"📦 Daily aggregate refresh started ({self.refresh_interval}s interval)")
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.caught_up = False
+                self.last_error = str(e)
+                logging.error(f"Daily aggregate refresh error: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'watermark': self.watermark,
+            'settled_id': self.settled_id,
+            'last_refresh_age': None if self.last_refresh is None else round(time.monotonic() - self.last_refresh, 1),
+            'last_error': self.last_error
+        }
+
+    # ---------- reads ----------
+
+    async def _breakdown(self, dimension: str, window: query_builder.DateWindow,
+                         limit: int, include_empty: bool = False) -> List[Dict[str, Any]]:
+        empty_filter = "" if include_empty else "AND value != ''"
+        rows = await self.db.execute_query(
+            f"""
+                SELECT value, SUM(count) AS count
+                FROM {AGGREGATE_TABLE}
+                WHERE dimension = %s AND {window.condition('day')} {empty_filter}
+                GROUP BY value
+                ORDER BY count DESC
+                LIMIT %s
+            """,
+            (dimension,) + window.day_params() + (limit,)
+        )
+        return [{dimension: row['value'], 'count': int(row['count'])} for row in rows or []]
+
+    async def _hourly(self, window: query_builder.DateWindow) -> List[Dict[str, Any]]:
+        rows = await self.db.execute_query(
+            f"""
+                SELECT value, SUM(count) AS count
+                FROM {AGGREGATE_TABLE}
+                WHERE dimension = 'hour' AND {window.condition('day')} AND value != ''
+                GROUP BY value
+            """,
+            window.day_params()
+        )
+        hourly = [{'hour': int(row['value']), 'count': int(row['count'])} for row in rows or []]
+        return sorted(hourly, key=lambda row: row['hour'])
+
+    async def _daily_totals(self, window: query_builder.DateWindow) -> List[Dict[str, Any]]:
+        rows = await self.db.execute_query(
+            f"""
+                SELECT day, count
+                FROM {AGGREGATE_TABLE}
+                WHERE dimension = 'total' AND {window.condition('day')}
+                ORDER BY day DESC
+            """,
+            window.day_params()
+        )
+        return [{'day': row['day'], 'count': int(row['count'])} for row in rows or []]
+
+    async def total(self) -> int:
+        rows = await self.db.execute_query(
+            f"SELECT SUM(count) AS total FROM {AGGREGATE_TABLE} WHERE dimension = 'total'"
+        )
+        return int((rows[0]['total'] if rows else 0) or 0)
+
+    async def statistics(self, today: Optional[date] = None) -> Dict[str, int]:
+        """Same keys as the raw /istatistik query"""
+        windows = {
+            'today_total': query_builder.today_window(today),
+            'yesterday_total': query_builder.yesterday_window(today),
+            'week_total': query_builder.week_window(today),
+            'month_total': query_builder.month_window(today),
+        }
+        params = ()
+        for window in windows.values():
+            params += window.day_params()
+
+        batch = await self.db.execute_batch({
+            'totals': (f"""
+                SELECT
+                    SUM(count) AS total,
+                    {', '.join(_sum_if(window, alias) for alias, window in windows.items())}
+                FROM {AGGREGATE_TABLE}
+                WHERE dimension = 'total'
+            """, params),
+            'distinct': (f"""
+                SELECT dimension, COUNT(DISTINCT value) AS value_count
+                FROM {AGGREGATE_TABLE}
+                WHERE dimension IN ('region', 'domain') AND value != ''
+                GROUP BY dimension
+            """, None)
+        })
+
+        totals = batch['totals'][0] if batch['totals'] else {}
+        results = {key: int(totals.get(key) or 0) for key in ['total'] + list(windows)}
+        distinct = {row['dimension']: int(row['value_count']) for row in batch['distinct']}
+        results['region_count'] = distinct.get('region', 0)
+        results['domain_count'] = distinct.get('domain', 0)
+        return results
+
+    async def trend(self, window: query_builder.DateWindow) -> List[Dict[str, Any]]:
+        """Per-day totals with day names, newest first (as /son7gun)"""
+        rows = await self._daily_totals(window)
+        for row in rows:
+            row['day_name'] = row['day'].strftime('%A')
+        return rows
+
+    async def date_breakdown(self, window: query_builder.DateWindow, limit: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """Top domains/regions and hourly counts (as /tarihsorgu)"""
+        domains, regions, hourly = await asyncio.gather(
+            self._breakdown('domain', window, limit),
+            self._breakdown('region', window, limit),
+            self._hourly(window)
+        )
+        return {'domains': domains, 'regions': regions, 'hourly': hourly}
+
+    async def daily_report(self, day: query_builder.DateWindow, week: query_builder.DateWindow,
+                           limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Day-scoped sections of the daily report (as generate_daily_report)"""
+        regions, domains, hourly, week_rows = await asyncio.gather(
+            self._breakdown('region', day, limit, include_empty=True),
+            self._breakdown('domain', day, limit),
+            self._hourly(day),
+            self._daily_totals(week)
+        )
+        for row in regions:
+            row['region'] = row['region'] or 'Unspecified'
+        return {
+            'regions': regions,
+            'domains': domains,
+            'hourly': hourly,
+            'week': [{'date': row['day'], 'count': row['count']} for row in week_rows]
+        }
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+MySQL server performance sampler
+
+Polls ``SHOW GLOBAL STATUS`` and ``SHOW PROCESSLIST`` at a fixed interval,
+turns the cumulative counters into per-interval rates and keeps them in
+ring buffers for /dbperf trends and threshold alerts.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from service_metrics import RingBuffer, sparkline, summarize
+
+STATUS_VARIABLES = (
+    'Questions',
+    'Slow_queries',
+    'Threads_running',
+    'Threads_connected',
+    'Innodb_buffer_pool_read_requests',
+    'Innodb_buffer_pool_reads',
+    'Innodb_row_lock_waits',
+    'Innodb_row_lock_time',
+)
+
+# metric -> (label, unit)
+METRICS: Dict[str, tuple] = {
+    'qps': ("Queries/s", ""),
+    'slow_per_min': ("Slow queries/min", ""),
+    'threads_running': ("Threads running", ""),
+    'threads_connected': ("Threads connected", ""),
+    'buffer_pool_hit_ratio': ("Buffer pool hit", "%"),
+    'lock_waits_per_min': ("Row lock waits/min", ""),
+    'lock_wait_avg_ms': ("Row lock wait avg", "ms"),
+    'active_queries': ("Active queries", ""),
+    'longest_query_seconds': ("Longest query", "s"),
+}
+
+# threshold name -> (metric, direction); a breach is value > threshold ('max') or < threshold ('min')
+ALERT_RULES: Dict[str, tuple] = {
+    'threads_running': ('threads_running', 'max'),
+    'slow_per_min': ('slow_per_min', 'max'),
+    'lock_waits_per_min': ('lock_waits_per_min', 'max'),
+    'longest_query_seconds': ('longest_query_seconds', 'max'),
+    'buffer_pool_hit_ratio': ('buffer_pool_hit_ratio', 'min'),
+}
+
+
+def _rate(current: Dict[str, float], previous: Dict[str, float], name: str, elapsed: float) -> float:
+    # Counters reset on server restart; treat a negative delta as a fresh start
+    return max(0.0, current.get(name, 0.0) - previous.get(name, 0.0)) / elapsed
+
+
+# =====================================
+# SAMPLER
+# =====================================
+
+class MySQLPerfSampler:
+    """Background sampler of server-wide MySQL performance counters
+
+    ``thresholds`` maps ALERT_RULES names to limits; 0 or missing disables a
+    rule. A rule must breach on ``alert_consecutive`` samples in a row before
+    it alerts, and re-alerts at most once per ``alert_cooldown`` seconds.
+    """
+
+    def __init__(self, db_manager, interval: int = 15, history_hours: float = 24,
+                 thresholds: Optional[Dict[str, float]] = None,
+                 alert_consecutive: int = 3, alert_cooldown: int = 900, top_queries: int = 5):
+        self.db = db_manager
+        self.interval = max(1, interval)
+        self.capacity = max(2, int(history_hours * 3600 / self.interval))
+        self.thresholds = {name: value for name, value in (thresholds or {}).items() if value}
+        self.alert_consecutive = max(1, alert_consecutive)
+        self.alert_cooldown = alert_cooldown
+        self.top_queries = top_queries
+        self.timestamps = RingBuffer(self.capacity)
+        self.series = {metric: RingBuffer(self.capacity) for metric in METRICS}
+        self.latest: Dict[str, float] = {}
+        self.long_queries: List[Dict[str, Any]] = []
+        self.last_error: Optional[str] = None
+        self._previous: Optional[Dict[str, float]] = None
+        self._previous_at: Optional[float] = None
+        self._breaches: Dict[str, int] = {}
+        self._last_alert: Dict[str, float] = {}
+
+    async def _read(self):
+        batch = await self.db.execute_batch({
+            'status': (
+                f"SHOW GLOBAL STATUS WHERE Variable_name IN ({', '.join(['%s'] * len(STATUS_VARIABLES))})",
+                STATUS_VARIABLES
+            ),
+            'processlist': "SHOW FULL PROCESSLIST"
+        })
+        status = {}
+        for row in batch['status']:
+            try:
+                status[row['Variable_name']] = float(row['Value'])
+            except (TypeError, ValueError):
+                continue
+        return status, batch['processlist']
+
+    def _process(self, status: Dict[str, float], processlist: List[Dict[str, Any]], now: float) -> Optional[Dict[str, float]]:
+        """Turn one reading into interval metrics; None for the first reading"""
+        previous, previous_at = self._previous, self._previous_at
+        self._previous, self._previous_at = status, now
+        if previous is None or now <= previous_at:
+            return None
+
+        elapsed = now - previous_at
+        read_requests = _rate(status, previous, 'Innodb_buffer_pool_read_requests', 1)
+        disk_reads = _rate(status, previous, 'Innodb_buffer_pool_reads', 1)
+        lock_waits = _rate(status, previous, 'Innodb_row_lock_waits', 1)
+        lock_time = _rate(status, previous, 'Innodb_row_lock_time', 1)
+
+        active = [
+            row for row in processlist
+            if row.get('Command') not in ('Sleep', 'Daemon', 'Binlog Dump') and row.get('Info')
+            and 'PROCESSLIST' not in str(row.get('Info')).upper()
+        ]
+        active.sort(key=lambda row: row.get('Time') or 0, reverse=True)
+        self.long_queries = [
+            {
+                'id': row.get('Id'),
+                'user': row.get('User'),
+                'time': int(row.get('Time') or 0),
+                'state': row.get('State') or '',
+                'query': ' '.join(str(row.get('Info')).split())[:120]
+            }
+            for row in active[:self.top_queries]
+        ]
+
+        return {
+            'qps': _rate(status, previous, 'Questions', elapsed),
+            'slow_per_min': _rate(status, previous, 'Slow_queries', elapsed) * 60,
+            'threads_running': status.get('Threads_running', 0.0),
+            'threads_connected': status.get('Threads_connected', 0.0),
+            'buffer_pool_hit_ratio': (1 - disk_reads / read_requests) * 100 if read_requests else math.nan,
+            'lock_waits_per_min': lock_waits / elapsed * 60,
+            'lock_wait_avg_ms': lock_time / lock_waits if lock_waits else 0.0,
+            'active_queries': float(len(active)),
+            'longest_query_seconds': float(active[0].get('Time') or 0) if active else 0.0,
+        }
+
+    async def sample(self, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """Take one reading and record its metrics"""
+        status, processlist = await self._read()
+        now = now or time.time()
+        metrics = self._process(status, processlist, now)
+        if metrics is None:
+            return None
+        self.timestamps.append(now)
+        for metric, value in metrics.items():
+            self.series[metric].append(value)
+        self.latest = metrics
+        self.last_error = None
+        return metrics
+
+    def check_alerts(self, metrics: Dict[str, float], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Rules that have breached on enough consecutive samples"""
+        now = now or time.time()
+        alerts = []
+        for name, threshold in self.thresholds.items():
+            metric, direction = ALERT_RULES[name]
+            value = metrics.get(metric)
+            if value is None or math.isnan(value):
+                continue
+            breached = value > threshold if direction == 'max' else value < threshold
+            self._breaches[name] = self._breaches.get(name, 0) + 1 if breached else 0
+            if self._breaches[name] < self.alert_consecutive:
+                continue
+            if name in self._last_alert and now - self._last_alert[name] < self.alert_cooldown:
+                continue
+            self._last_alert[name] = now
+            alerts.append({
+                'rule': name,
+                'label': METRICS[metric][0],
+                'unit': METRICS[metric][1],
+                'value': value,
+                'threshold': threshold,
+                'direction': direction
+            })
+        return alerts
+
+    async def run(self, on_alerts=None):
+        """Background loop; ``on_alerts(alerts)`` is called for threshold breaches"""
+        logging.info(f"🩺 MySQL performance sampler started ({self.interval}s interval)")
+        while True:
+            try:
+                metrics = await self.sample()
+                if metrics and on_alerts:
+                    alerts = self.check_alerts(metrics)
+                    if alerts:
+                        on_alerts(alerts)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logging.error(f"MySQL performance sampler error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def summary(self, metric: str, seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """min/avg/max/p95/last plus a sparkline over the last ``seconds``"""
+        cutoff = time.time() - seconds if seconds else None
+        values = [
+            value for ts, value in zip(self.timestamps.values(), self.series[metric].values())
+            if not math.isnan(value) and (cutoff is None or ts >= cutoff)
+        ]
+        stats = summarize(values)
+        if stats is not None:
+            stats['sparkline'] = sparkline(values)
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'samples': self.timestamps.count,
+            'interval': self.interval,
+            'last_error': self.last_error
+        }
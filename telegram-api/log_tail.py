@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Incremental journal tailing for monitored services
+
+journalctl is run with ``--show-cursor`` and the returned cursor is stored per
+(chat, service), so the next read passes ``--after-cursor`` and only returns
+lines that chat has not seen yet. Follow mode polls the same way for a bounded
+period and hands batched new lines to a send callback (the outbound queue).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+CURSOR_PREFIX = "-- cursor: "
+
+
+@dataclass
+class LogChunk:
+    """Result of one journal read"""
+    service: str
+    lines: List[str]
+    cursor: Optional[str]
+    incremental: bool
+    truncated: bool = False
+    error: Optional[str] = None
+
+
+def split_log_message(header: str, lines: List[str], limit: int = TELEGRAM_MESSAGE_LIMIT) -> List[str]:
+    """Markdown messages of ``header`` plus code blocks, each within ``limit``
+
+    Lines are never split across messages unless a single line is longer
+    than a message can hold, in which case it is cut.
+    """
+    fence_open, fence_close = "```\n", "\n```"
+    messages = []
+    current: List[str] = []
+    prefix = header + "\n\n" if header else ""
+    budget = limit - len(prefix) - len(fence_open) - len(fence_close)
+
+    for line in lines:
+        # Keep log content from closing the code block early
+        line = line.replace("```", "'''")
+        line = line[:budget]
+        size = sum(len(item) + 1 for item in current) + len(line)
+        if current and size > budget:
+            messages.append(prefix + fence_open + "\n".join(current) + fence_close)
+            prefix = ""
+            budget = limit - len(fence_open) - len(fence_close)
+            current = []
+        current.append(line)
+
+    if current:
+        messages.append(prefix + fence_open + "\n".join(current) + fence_close)
+    elif header:
+        messages.append(header)
+    return messages
+
+
+# =====================================
+# JOURNAL TAILER
+# =====================================
+
+class JournalTailer:
+    """Per-(chat, service) journal cursors and bounded follow sessions"""
+
+    def __init__(self, max_lines: int = 200, follow_interval: float = 5.0,
+                 follow_max_seconds: int = 600):
+        self.max_lines = max(1, max_lines)
+        self.follow_interval = max(1.0, follow_interval)
+        self.follow_max_seconds = max(1, follow_max_seconds)
+        self._cursors: Dict[Tuple[int, str], str] = {}
+        self._follows: Dict[Tuple[int, str], asyncio.Task] = {}
+
+    async def read(self, service: str, cursor: Optional[str] = None, lines: int = 20) -> LogChunk:
+        """Last ``lines`` entries, or up to ``max_lines`` entries after ``cursor``"""
+        args = ['journalctl', '-u', service, '--no-pager', '--quiet', '--show-cursor', '-o', 'short-iso']
+        if cursor:
+            args += ['--after-cursor', cursor, '-n', str(self.max_lines)]
+        else:
+            args += ['-n', str(min(lines, self.max_lines))]
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate()
+        except Exception as e:
+            return LogChunk(service, [], cursor, bool(cursor), error=str(e))
+
+        if process.returncode != 0:
+            return LogChunk(service, [], cursor, bool(cursor), error=stderr.decode(errors='replace').strip())
+
+        output = stdout.decode(errors='replace').splitlines()
+        new_cursor = cursor
+        if output and output[-1].startswith(CURSOR_PREFIX):
+            new_cursor = output.pop()[len(CURSOR_PREFIX):].strip()
+
+        # -n keeps the newest entries, so a full batch after a cursor may have skipped some
+        truncated = bool(cursor) and len(output) >= self.max_lines
+        return LogChunk(service, output, new_cursor, bool(cursor), truncated)
+
+    async def tail(self, chat_id: int, service: str, lines: int = 20, reset: bool = False) -> LogChunk:
+        """New lines for this chat since its last read (last ``lines`` on the first read)"""
+        key = (chat_id, service)
+        if reset:
+            self._cursors.pop(key, None)
+        chunk = await self.read(service, self._cursors.get(key), lines)
+        if chunk.error is None and chunk.cursor:
+            self._cursors[key] = chunk.cursor
+        return chunk
+
+    # ---------- follow mode ----------
+
+    def is_following(self, chat_id: int, service: str) -> bool:
+        task = self._follows.get((chat_id, service))
+        return task is not None and not task.done()
+
+    def start_follow(self, chat_id: int, service: str, duration: float,
+                     send: Callable[[LogChunk], None],
+                     on_finish: Optional[Callable[[], None]] = None) -> float:
+        """Stream new lines to ``send`` for up to ``duration`` seconds; returns the capped duration"""
+        duration = min(max(duration, self.follow_interval), self.follow_max_seconds)
+        self.stop_follow(chat_id, service)
+        task = asyncio.create_task(self._follow(chat_id, service, duration, send, on_finish))
+        self._follows[(chat_id, service)] = task
+        return duration
+
+    def stop_follow(self, chat_id: int, service: str) -> bool:
+        task = self._follows.pop((chat_id, service), None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def stop_all(self):
+        for task in self._follows.values():
+            task.cancel()
+        self._follows.clear()
+
+    async def _follow(self, chat_id: int, service: str, duration: float,
+                      send: Callable[[LogChunk], None], on_finish: Optional[Callable[[], None]]):
+        key = (chat_id, service)
+        deadline = time.monotonic() + duration
+        try:
+            # Start from the end of the journal unless the chat already has a cursor
+            if key not in self._cursors:
+                await self.tail(chat_id, service, lines=1)
+
+            while time.monotonic() < deadline:
+                await asyncio.sleep(min(self.follow_interval, max(0.0, deadline - time.monotonic())))
+                chunk = await self.tail(chat_id, service)
+                if chunk.error:
+                    logging.warning(f"Log follow for {service} failed: {chunk.error}")
+                    send(chunk)
+                    break
+                if chunk.lines:
+                    send(chunk)
+        finally:
+            if self._follows.get(key) is asyncio.current_task():
+                del self._follows[key]
+            if on_finish:
+                on_finish()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'cursors': len(self._cursors),
+            'follows': sum(1 for task in self._follows.values() if not task.done())
+        }
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Outbound message pacing for the Telegram bot
+
+TelegramRateLimiter plugs into python-telegram-bot's request layer
+(``ApplicationBuilder().rate_limiter(...)``), so every API call - command
+replies included - draws from the same global and per-chat token buckets
+and waits out ``RetryAfter`` instead of failing.
+
+OutboundMessageQueue is the single path for bot-initiated messages (reports,
+alerts). It coalesces bursts to the same chat, retries transient failures,
+keeps per-chat ordering and exposes depth/latency metrics.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, Forbidden, RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from command_metrics import track
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# BadRequest texts meaning the chat itself is unreachable, not just this message
+CHAT_GONE_ERRORS = (
+    'chat not found',
+    'user is deactivated',
+    'bot was kicked',
+    'chat was deleted',
+    'group chat was upgraded',
+)
+
+
+def is_chat_gone(error: Exception) -> bool:
+    """Forbidden, or a BadRequest that says the chat no longer exists"""
+    if isinstance(error, Forbidden):
+        return True
+    return isinstance(error, BadRequest) and any(
+        text in str(error).lower() for text in CHAT_GONE_ERRORS
+    )
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """RetryAfter.retry_after is an int or a timedelta depending on the PTB version"""
+    value = error.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+# =====================================
+# TOKEN BUCKETS
+# =====================================
+
+class TokenBucket:
+    """Async token bucket; waiters are served in arrival order"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, returns the seconds spent waiting"""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return time.monotonic() - started
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Block the bucket, e.g. after Telegram reported flood control"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and not self._lock.locked()
+
+
+class TelegramRateLimiter(BaseRateLimiter):
+    """Global + per-chat token buckets tuned to Telegram's documented limits
+
+    Private chats: ``private_chat_rate`` messages/second. Groups and channels
+    (negative or ``@name`` chat ids): ``group_chat_per_minute`` messages/minute.
+    ``RetryAfter`` pauses the global bucket for the requested time and the
+    request is retried up to ``max_retries`` times.
+    """
+
+    UNLIMITED_ENDPOINTS = {'getUpdates', 'getMe', 'deleteWebhook', 'setMyCommands'}
+
+    def __init__(self, global_rate: float = 25.0, private_chat_rate: float = 1.0,
+                 group_chat_per_minute: int = 20, max_retries: int = 3):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.private_chat_rate = private_chat_rate
+        self.group_chat_rate = group_chat_per_minute / 60.0
+        self.max_retries = max_retries
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        self._last_prune = time.monotonic()
+        self._metrics = {
+            'requests': 0,
+            'throttled': 0,
+            'wait_total': 0.0,
+            'retry_after': 0,
+            'retry_after_gave_up': 0
+        }
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        self._chat_buckets.clear()
+
+    @staticmethod
+    def _is_group(chat_id) -> bool:
+        if isinstance(chat_id, str):
+            return chat_id.startswith('@') or chat_id.startswith('-')
+        return chat_id < 0
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        now = time.monotonic()
+        if now - self._last_prune > 600:
+            self._chat_buckets = {
+                key: bucket for key, bucket in self._chat_buckets.items() if not bucket.idle(now)
+            }
+            self._last_prune = now
+
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if self._is_group(chat_id):
+                bucket = TokenBucket(self.group_chat_rate, 3)
+            else:
+                bucket = TokenBucket(self.private_chat_rate, 3)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        if endpoint in self.UNLIMITED_ENDPOINTS:
+            return await callback(*args, **kwargs)
+
+        # Counted as send time of the command being handled, throttling included
+        with track('send'):
+            return await self._process_limited(callback, args, kwargs, endpoint, data)
+
+    async def _process_limited(self, callback, args, kwargs, endpoint, data):
+        chat_id = data.get('chat_id') if data else None
+        chat_bucket = self._chat_bucket(chat_id) if chat_id is not None else None
+
+        for attempt in range(self.max_retries + 1):
+            self._metrics['requests'] += 1
+            waited = 0.0
+            if chat_bucket:
+                waited += await chat_bucket.acquire()
+            waited += await self.global_bucket.acquire()
+            if waited > 0.001:
+                self._metrics['throttled'] += 1
+                self._metrics['wait_total'] += waited
+
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                wait = retry_after_seconds(e)
+                self._metrics['retry_after'] += 1
+                if attempt >= self.max_retries:
+                    self._metrics['retry_after_gave_up'] += 1
+                    raise
+                logging.warning(f"Telegram flood control on {endpoint} (chat {chat_id}), retrying in {wait:.0f}s")
+                self.global_bucket.pause(wait)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self._metrics,
+            wait_total=round(self._metrics['wait_total'], 2),
+            chat_buckets=len(self._chat_buckets)
+        )
+
+
+# =====================================
+# OUTBOUND QUEUE
+# =====================================
+
+@dataclass
+class OutboundMessage:
+    chat_id: int
+    text: str
+    parse_mode: Optional[str]
+    coalesce_key: Optional[str]
+    enqueued_at: float
+    futures: List[asyncio.Future] = field(default_factory=list)
+    parts: int = 1
+    attempts: int = 0
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class OutboundMessageQueue:
+    """Single send path for bot-initiated messages
+
+    Messages with a ``coalesce_key`` that arrive for the same chat within
+    ``coalesce_window`` seconds are merged into one message (up to Telegram's
+    4096-character limit). Each chat is pinned to one worker, so messages to
+    a chat stay in order while different chats are sent in parallel.
+    """
+
+    def __init__(self, bot_provider: Callable[[], Any], workers: int = 4,
+                 coalesce_window: float = 3.0, max_attempts: int = 5,
+                 on_permanent_failure: Optional[Callable[[int, Exception], None]] = None):
+        self._bot_provider = bot_provider
+        self.worker_count = max(1, workers)
+        self.coalesce_window = coalesce_window
+        self.max_attempts = max(1, max_attempts)
+        self.on_permanent_failure = on_permanent_failure
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._pending: Dict[Tuple[int, str], OutboundMessage] = {}
+        self._latencies: deque = deque(maxlen=500)
+        self._inflight = 0
+        self._metrics = {
+            'enqueued': 0,
+            'sent': 0,
+            'coalesced': 0,
+            'retries': 0,
+            'failed': 0
+        }
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queues = [asyncio.Queue() for _ in range(self.worker_count)]
+        self._workers = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+
+    def stop(self):
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
+
+    def _queue_for(self, chat_id) -> asyncio.Queue:
+        if not self._queues:
+            raise RuntimeError("OutboundMessageQueue.start() must be awaited before enqueueing")
+        return self._queues[hash(chat_id) % len(self._queues)]
+
+    def enqueue(self, chat_id: int, text: str, parse_mode: Optional[str] = ParseMode.MARKDOWN,
+                coalesce_key: Optional[str] = None) -> asyncio.Future:
+        """Queue a message; the returned future resolves once it is delivered
+
+        The future fails with the last error if delivery is abandoned.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._queue_for(chat_id)  # Fails fast if start() was never awaited
+        future = loop.create_future()
+        self._metrics['enqueued'] += 1
+
+        if coalesce_key and self.coalesce_window > 0:
+            key = (chat_id, coalesce_key)
+            pending = self._pending.get(key)
+            if pending and len(pending.text) + len(text) + 2 <= TELEGRAM_MESSAGE_LIMIT:
+                pending.text += "\n\n" + text
+                pending.parts += 1
+                pending.futures.append(future)
+                self._metrics['coalesced'] += 1
+                return future
+            if pending:
+                self._release(key)
+            message = self._pending[key] = OutboundMessage(
+                chat_id, text, parse_mode, coalesce_key, time.monotonic(), [future]
+            )
+            message.timer = loop.call_later(self.coalesce_window, self._release, key)
+            return future
+
+        message = OutboundMessage(chat_id, text, parse_mode, None, time.monotonic(), [future])
+        queue.put_nowait(message)
+        return future
+
+    def _release(self, key: Tuple[int, str]):
+        message = self._pending.pop(key, None)
+        if message is not None:
+            # An early release must not leave its timer to flush a later entry
+            if message.timer is not None:
+                message.timer.cancel()
+                message.timer = None
+            self._queue_for(message.chat_id).put_nowait(message)
+
+    async def _wait_for_bot(self):
+        bot = self._bot_provider()
+        while bot is None:
+            await asyncio.sleep(0.5)
+            bot = self._bot_provider()
+        return bot
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+            bot = await self._wait_for_bot()
+            self._inflight += 1
+            try:
+                await self._deliver(bot, message)
+            finally:
+                self._inflight -= 1
+
+    async def _deliver(self, bot, message: OutboundMessage):
+        """Send one message; retries keep the worker on it so the chat's order holds"""
+        while True:
+            message.attempts += 1
+            try:
+                await bot.send_message(chat_id=message.chat_id, text=message.text, parse_mode=message.parse_mode)
+            except (Forbidden, BadRequest) as e:
+                if is_chat_gone(e):
+                    # The chat is gone or the bot was blocked: stop sending to it
+                    self._fail(message, e, permanent=True)
+                    return
+                if message.parse_mode is None and len(message.text) <= TELEGRAM_MESSAGE_LIMIT:
+                    # Only this message is invalid; the chat keeps its subscriptions
+                    self._fail(message, e, permanent=False)
+                    return
+                # Bad markup or an oversized message: resend this one as plain, truncated text
+                logging.warning(f"Send to {message.chat_id} rejected ({e}), resending as plain text")
+                message.parse_mode = None
+                message.text = message.text[:TELEGRAM_MESSAGE_LIMIT]
+            except Exception as e:
+                if message.attempts >= self.max_attempts:
+                    self._fail(message, e, permanent=False)
+                    return
+                self._metrics['retries'] += 1
+                delay = min(2 ** message.attempts, 60)
+                logging.warning(
+                    f"Send to {message.chat_id} failed (attempt {message.attempts}), retrying in {delay}s: {e}"
+                )
+                # Later messages to this chat wait behind the failed one
+                await asyncio.sleep(delay)
+            else:
+                self._metrics['sent'] += 1
+                self._latencies.append(time.monotonic() - message.enqueued_at)
+                for future in message.futures:
+                    if not future.done():
+                        future.set_result(True)
+                return
+
+    def _fail(self, message: OutboundMessage, error: Exception, permanent: bool):
+        self._metrics['failed'] += 1
+        logging.error(f"Dropping message to {message.chat_id} after {message.attempts} attempts: {error}")
+        for future in message.futures:
+            if not future.done():
+                future.set_exception(error)
+                future.exception()  # Mark retrieved; callers may not await fire-and-forget sends
+        if permanent and self.on_permanent_failure:
+            self.on_permanent_failure(message.chat_id, error)
+
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues) + len(self._pending) + self._inflight
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = list(self._latencies)
+        return dict(
+            self._metrics,
+            depth=self.depth(),
+            pending_coalesce=len(self._pending),
+            latency_avg_ms=(sum(latencies) / len(latencies) * 1000) if latencies else 0.0,
+            latency_p95_ms=_percentile(latencies, 0.95) * 1000,
+            latency_max_ms=max(latencies) * 1000 if latencies else 0.0
+        )
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Date-range query helpers for the accs analytics queries
+
+Filters are expressed as half-open ranges (``date >= X AND date < Y``)
+instead of ``DATE(date) = ...`` so MySQL can use an index on ``accs.date``.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+# =====================================
+# DATE WINDOWS
+# =====================================
+
+DATE_COLUMN = "date"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@dataclass(frozen=True)
+class DateWindow:
+    """Half-open datetime range [start, end)"""
+    start: datetime
+    end: datetime
+
+    def condition(self, column: str = DATE_COLUMN) -> str:
+        """SQL predicate for this window; bind with params()"""
+        return f"{column} >= %s AND {column} < %s"
+
+    def params(self) -> Tuple[str, str]:
+        return (self.start.strftime(DATETIME_FORMAT), self.end.strftime(DATETIME_FORMAT))
+
+    def day_params(self) -> Tuple[str, str]:
+        """Params for DATE columns (day-aligned windows only)"""
+        return (self.start.strftime("%Y-%m-%d"), self.end.strftime("%Y-%m-%d"))
+
+    def count_if(self, alias: str, column: str = DATE_COLUMN) -> str:
+        """Conditional count expression for single-pass aggregates"""
+        return f"SUM(CASE WHEN {self.condition(column)} THEN 1 ELSE 0 END) AS {alias}"
+
+
+def _as_date(value: Union[date, datetime, str]) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def day_window(day: Union[date, datetime, str]) -> DateWindow:
+    """A single calendar day"""
+    start = _midnight(_as_date(day))
+    return DateWindow(start, start + timedelta(days=1))
+
+
+def range_window(first_day: Union[date, datetime, str], last_day: Union[date, datetime, str]) -> DateWindow:
+    """Calendar days from first_day through last_day, inclusive"""
+    return DateWindow(_midnight(_as_date(first_day)), _midnight(_as_date(last_day)) + timedelta(days=1))
+
+
+def trailing_window(days: int, today: Optional[date] = None) -> DateWindow:
+    """The last ``days`` days plus today (matches ``CURDATE() - INTERVAL n DAY``)"""
+    today = today or date.today()
+    return range_window(today - timedelta(days=days), today)
+
+
+def today_window(today: Optional[date] = None) -> DateWindow:
+    return day_window(today or date.today())
+
+
+def yesterday_window(today: Optional[date] = None) -> DateWindow:
+    return day_window((today or date.today()) - timedelta(days=1))
+
+
+def week_window(today: Optional[date] = None) -> DateWindow:
+    return trailing_window(7, today)
+
+
+def month_window(today: Optional[date] = None) -> DateWindow:
+    return trailing_window(30, today)
+
+
+# =====================================
+# INDEX CHECK
+# =====================================
+
+# Leading index columns the analytics queries rely on, with the commands that need them
+REQUIRED_INDEXES: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "idx_accs_date": (("date",), "/istatistik, /son7gun, /tarihsorgu, /gunlukrapor"),
+}
+
+
+async def check_indexes(db_manager, table: str = "accs") -> List[str]:
+    """Warn about missing supporting indexes; returns the missing index names
+
+    An existing index satisfies a requirement when its leading columns match,
+    whatever it is called.
+    """
+    try:
+        rows = await db_manager.execute_query(f"SHOW INDEX FROM {table}")
+    except Exception as e:
+        logging.warning(f"Index check skipped for {table}: {e}")
+        return []
+
+    indexes: Dict[str, List[Tuple[int, str]]] = {}
+    for row in rows or []:
+        indexes.setdefault(row['Key_name'], []).append((int(row['Seq_in_index']), row['Column_name'].lower()))
+    existing = [tuple(column for _, column in sorted(columns)) for columns in indexes.values()]
+
+    missing = []
+    for name, (columns, used_by) in REQUIRED_INDEXES.items():
+        if any(index[:len(columns)] == columns for index in existing):
+            continue
+        missing.append(name)
+        logging.warning(
+            f"⚠️ Missing index on {table}({', '.join(columns)}) used by {used_by}; "
+            f"date-range queries will scan the whole table. "
+            f"Suggested: CREATE INDEX {name} ON {table} ({', '.join(columns)})"
+        )
+
+    if not missing:
+        logging.info(f"✅ Supporting indexes present on {table}")
+    return missing
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Daily report scheduling for the bot
+
+The report for the previous day is generated once shortly after midnight,
+kept in memory for /gunlukrapor, and delivered to every subscribed chat
+through the bot's outbound queue (pacing and retries live there). Subscribers, per-chat delivery and
+the last completed report day are persisted to a JSON file so restarts
+neither skip a missed run nor send the same report twice.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Dict, Optional, Set
+
+# =====================================
+# PERSISTED STATE
+# =====================================
+
+class ReportStateStore:
+    """Subscribers and delivery progress, saved atomically to a JSON file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.subscribers: Set[int] = set()
+        self.last_report_day: Optional[str] = None
+        self.delivered: Dict[str, Set[int]] = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error(f"Report state could not be read from {self.path}: {e}")
+            return
+
+        self.subscribers.update(int(chat_id) for chat_id in data.get('subscribers', []))
+        self.last_report_day = data.get('last_report_day')
+        self.delivered = {day: set(chat_ids) for day, chat_ids in data.get('delivered', {}).items()}
+
+    def save(self):
+        data = {
+            'subscribers': sorted(self.subscribers),
+            'last_report_day': self.last_report_day,
+            'delivered': {day: sorted(chat_ids) for day, chat_ids in self.delivered.items()}
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error(f"Report state could not be saved to {self.path}: {e}")
+
+    def mark_delivered(self, day: str, chat_id: int):
+        self.delivered.setdefault(day, set()).add(chat_id)
+        self.save()
+
+    def complete(self, day: str):
+        """Record a finished run and drop delivery records of older days"""
+        self.last_report_day = day
+        self.delivered = {d: chats for d, chats in self.delivered.items() if d >= day}
+        self.save()
+
+
+# =====================================
+# SCHEDULER
+# =====================================
+
+def parse_run_time(value: str) -> dt_time:
+    """'HH:MM' -> time, falling back to 00:05"""
+    try:
+        hour, minute = (int(part) for part in value.split(':', 1))
+        return dt_time(hour, minute)
+    except (ValueError, AttributeError):
+        logging.warning(f"Invalid daily report time {value!r}, using 00:05")
+        return dt_time(0, 5)
+
+
+class DailyReportScheduler:
+    """Precompute the daily report after midnight and broadcast it"""
+
+    def __init__(self, handler, store: ReportStateStore, run_at: dt_time):
+        self.handler = handler
+        self.store = store
+        self.run_at = run_at
+        self.cached_report: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def report_day(now: Optional[datetime] = None) -> str:
+        """The day a report generated now covers (yesterday)"""
+        return ((now or datetime.now()).date() - timedelta(days=1)).isoformat()
+
+    def next_run(self, now: Optional[datetime] = None) -> datetime:
+        now = now or datetime.now()
+        candidate = datetime.combine(now.date(), self.run_at)
+        return candidate if candidate > now else candidate + timedelta(days=1)
+
+    def is_due(self, now: Optional[datetime] = None) -> bool:
+        """Today's run time has passed and its report has not completed"""
+        now = now or datetime.now()
+        if now < datetime.combine(now.date(), self.run_at):
+            return False
+        return self.store.last_report_day != self.report_day(now)
+
+    def get_cached_report(self, day: Optional[str] = None) -> Optional[str]:
+        """Precomputed report text for ``day`` (default: yesterday)"""
+        day = day or self.report_day()
+        if self.cached_report and self.cached_report['day'] == day:
+            return self.cached_report['text']
+        return None
+
+    async def run(self):
+        """Background loop; a run missed while the bot was down happens at startup"""
+        logging.info(f"📅 Daily report scheduler started (runs at {self.run_at.strftime('%H:%M')})")
+        # The bot must be initialized before the first broadcast
+        while not getattr(self.handler.application, 'running', False):
+            await asyncio.sleep(1)
+
+        while True:
+            try:
+                if self.is_due():
+                    await self.run_once()
+                delay = (self.next_run() - datetime.now()).total_seconds()
+                await asyncio.sleep(max(delay, 1))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Daily report scheduler error: {e}")
+                await asyncio.sleep(300)
+
+    async def run_once(self):
+        day = self.report_day()
+        text = self.get_cached_report(day)
+        if text is None:
+            text = await self.handler.generate_daily_report()
+            self.cached_report = {'day': day, 'text': text}
+
+        already = self.store.delivered.get(day, set())
+        pending = [chat_id for chat_id in sorted(self.store.subscribers) if chat_id not in already]
+        logging.info(f"📤 Daily report {day}: {len(pending)} pending, {len(already)} already delivered")
+
+        failed = await self._broadcast(day, text, pending)
+        if failed:
+            logging.warning(f"Daily report {day} could not be delivered to {len(failed)} chats: {failed}")
+        self.store.complete(day)
+
+    async def _broadcast(self, day: str, text: str, chat_ids) -> list:
+        """Send through the shared outbound queue; returns the chats that failed"""
+        def delivered(chat_id, future):
+            if not future.cancelled() and future.exception() is None:
+                self.store.mark_delivered(day, chat_id)
+
+        futures = {}
+        for chat_id in chat_ids:
+            future = self.handler.outbound.enqueue(chat_id, text)
+            future.add_done_callback(lambda done, chat_id=chat_id: delivered(chat_id, done))
+            futures[chat_id] = future
+
+        results = await asyncio.gather(*futures.values(), return_exceptions=True)
+        return [chat_id for chat_id, result in zip(futures, results) if isinstance(result, BaseException)]
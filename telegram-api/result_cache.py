@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Result caches for the bot's analytics commands
+
+DayResultCache: results for days that have fully ended never change, so they
+are stored in a local SQLite file without expiry and survive restarts. Today
+(and any day that ended less than ``settle_seconds`` ago, to absorb late
+inserts) gets a short TTL instead.
+
+AsyncTTLCache: shared in-process cache for global aggregates and their
+rendered message text.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Optional, Union
+
+# =====================================
+# SERIALIZATION
+# =====================================
+
+class ResultEncoder(json.JSONEncoder):
+    """JSON encoder for DB rows: dates round-trip, Decimals become numbers"""
+
+    def default(self, obj):
+        if isinstance(obj, datetime):
+            return {'__datetime__': obj.isoformat()}
+        if isinstance(obj, date):
+            return {'__date__': obj.isoformat()}
+        if isinstance(obj, Decimal):
+            return int(obj) if obj == obj.to_integral_value() else float(obj)
+        return super().default(obj)
+
+
+def _decode_object(obj: Dict[str, Any]):
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        if '__date__' in obj:
+            return date.fromisoformat(obj['__date__'])
+    return obj
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, cls=ResultEncoder, ensure_ascii=False)
+
+
+def loads(payload: str) -> Any:
+    return json.loads(payload, object_hook=_decode_object)
+
+
+# =====================================
+# DAY RESULT CACHE
+# =====================================
+
+class DayResultCache:
+    """SQLite-backed cache keyed by (kind, day)"""
+
+    def __init__(self, path: str, today_ttl: int = 300, settle_seconds: int = 3600):
+        self.path = path
+        self.today_ttl = today_ttl
+        self.settle_seconds = settle_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._metrics = {'hits': 0, 'misses': 0, 'writes': 0, 'errors': 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS day_results (
+                    kind TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    expires_at REAL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (kind, day)
+                )
+            """)
+            conn.execute("DELETE FROM day_results WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def is_settled(self, day: Union[date, str], now: Optional[datetime] = None) -> bool:
+        """A day is immutable once it ended more than settle_seconds ago"""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        day_end = datetime.combine(day + timedelta(days=1), datetime.min.time())
+        return (now or datetime.now()) - day_end >= timedelta(seconds=self.settle_seconds)
+
+    def _get(self, kind: str, day: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload, expires_at FROM day_results WHERE kind = ? AND day = ?",
+                (kind, day)
+            ).fetchone()
+        if row is None:
+            return None
+        payload, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return loads(payload)
+
+    def _set(self, kind: str, day: str, value: Any):
+        expires_at = None if self.is_settled(day) else time.time() + self.today_ttl
+        payload = dumps(value)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO day_results (kind, day, payload, expires_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, day, payload, expires_at, time.time())
+            )
+            conn.commit()
+
+    async def get(self, kind: str, day: Union[date, str]) -> Optional[Any]:
+        """Cached value or None; cache errors are logged and treated as misses"""
+        try:
+            value = await asyncio.get_running_loop().run_in_executor(None, self._get, kind, str(day))
+        except Exception as e:
+            self._metrics['errors'] += 1
+            logging.warning(f"Result cache read failed ({kind} {day}): {e}")
+            return None
+        self._metrics['hits' if value is not None else 'misses'] += 1
+        return value
+
+    async def set(self, kind: str, day: Union[date, str], value: Any):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._set, kind, str(day), value)
+            self._metrics['writes'] += 1
+        except Exception as e:
+            self._metrics['errors'] += 1
+            logging.warning(f"Result cache write failed ({kind} {day}): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._metrics, path=self.path)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# =====================================
+# IN-PROCESS TTL CACHE
+# =====================================
+
+class AsyncTTLCache:
+    """Shared in-process cache with per-key TTLs and single-flight loading
+
+    Concurrent misses for the same key share one loader task, and the load
+    keeps running if the caller that started it is cancelled. ``invalidate``
+    drops every entry; loads that started before it are not stored.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generation = 0
+        self._metrics = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0}
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Fresh cached value or None, without loading"""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        self._metrics['hits'] += 1
+        return entry[0]
+
+    async def get_or_load(self, key: str, ttl: float, loader) -> Any:
+        """Cached value, or the result of ``await loader()`` stored for ``ttl`` seconds"""
+        value = self.peek(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self._metrics['misses'] += 1
+            generation = self._generation
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done, ttl, generation))
+        else:
+            self._metrics['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Future, ttl: float, generation: int):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if generation == self._generation and task.result() is not None:
+            self._entries[key] = (task.result(), time.monotonic() + ttl)
+
+    def invalidate(self):
+        self._generation += 1
+        self._entries.clear()
+        self._metrics['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._metrics, entries=len(self._entries), inflight=len(self._inflight))
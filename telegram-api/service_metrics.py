@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Per-service resource history for the monitoring loop
+
+Each monitored service keeps fixed-size ring buffers (``array('d')``) of
+timestamps, RSS and CPU samples, so 24h at 30s resolution costs about 70 KB
+per service. Unknown readings are stored as NaN and skipped by the stats.
+"""
+
+import math
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+METRICS = ('memory', 'cpu')
+
+
+# =====================================
+# RING BUFFER
+# =====================================
+
+class RingBuffer:
+    """Fixed-capacity float buffer that overwrites its oldest sample"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._data = array('d', [math.nan]) * self.capacity
+        self._next = 0
+        self.count = 0
+
+    def append(self, value: Optional[float]):
+        self._data[self._next] = math.nan if value is None else float(value)
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def values(self) -> List[float]:
+        """Samples oldest to newest (NaN included)"""
+        if self.count < self.capacity:
+            return self._data[:self.count].tolist()
+        return (self._data[self._next:] + self._data[:self._next]).tolist()
+
+
+class ServiceHistory:
+    """Aligned timestamp / RSS (MB) / CPU (%) ring buffers for one service"""
+
+    def __init__(self, capacity: int):
+        self.timestamps = RingBuffer(capacity)
+        self.series = {metric: RingBuffer(capacity) for metric in METRICS}
+
+    def append(self, timestamp: float, memory: Optional[float], cpu: Optional[float]):
+        self.timestamps.append(timestamp)
+        self.series['memory'].append(memory)
+        self.series['cpu'].append(cpu)
+
+    def window(self, metric: str, seconds: Optional[float] = None, now: Optional[float] = None):
+        """(timestamps, values) of known samples, optionally limited to the last ``seconds``"""
+        timestamps = self.timestamps.values()
+        values = self.series[metric].values()
+        cutoff = ((now or time.time()) - seconds) if seconds else None
+        pairs = [
+            (ts, value) for ts, value in zip(timestamps, values)
+            if not math.isnan(value) and (cutoff is None or ts >= cutoff)
+        ]
+        return [ts for ts, _ in pairs], [value for _, value in pairs]
+
+
+# =====================================
+# STATS HELPERS
+# =====================================
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {
+        'min': min(values),
+        'avg': sum(values) / len(values),
+        'max': max(values),
+        'p95': percentile(values, 0.95),
+        'last': values[-1],
+        'samples': len(values)
+    }
+
+
+def sparkline(values: List[float], width: int = 24) -> str:
+    """Downsample to ``width`` bucket averages and map onto ▁..█"""
+    if not values:
+        return ""
+    if len(values) > width:
+        step = len(values) / width
+        buckets = [values[int(i * step):max(int((i + 1) * step), int(i * step) + 1)] for i in range(width)]
+        values = [sum(bucket) / len(bucket) for bucket in buckets]
+    low, high = min(values), max(values)
+    if high - low < 1e-9:
+        return SPARK_CHARS[0] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (high - low)
+    return "".join(SPARK_CHARS[int(round((value - low) * scale))] for value in values)
+
+
+def slope_per_hour(timestamps: List[float], values: List[float]) -> Optional[float]:
+    """Least-squares slope in units per hour"""
+    n = len(values)
+    if n < 2 or timestamps[-1] - timestamps[0] <= 0:
+        return None
+    mean_t = sum(timestamps) / n
+    mean_v = sum(values) / n
+    variance = sum((t - mean_t) ** 2 for t in timestamps)
+    if variance == 0:
+        return None
+    covariance = sum((t - mean_t) * (v - mean_v) for t, v in zip(timestamps, values))
+    return covariance / variance * 3600
+
+
+# =====================================
+# RECORDER
+# =====================================
+
+class ServiceMetricsRecorder:
+    """Resource history for all monitored services plus optional threshold alerts
+
+    ``rss_growth_alert_mb_per_hour``: alert when RSS grows faster than this over
+    ``alert_window`` seconds. ``cpu_alert_percent``: alert when average CPU over
+    the window exceeds it. 0 disables either check. Each alert repeats at most
+    once per ``alert_cooldown`` seconds per service.
+    """
+
+    def __init__(self, sample_interval: int, history_hours: float = 24,
+                 rss_growth_alert_mb_per_hour: float = 0, cpu_alert_percent: float = 0,
+                 alert_window: int = 3600, alert_cooldown: int = 3600):
+        self.sample_interval = max(1, sample_interval)
+        self.capacity = max(2, int(history_hours * 3600 / self.sample_interval))
+        self.rss_growth_alert = rss_growth_alert_mb_per_hour
+        self.cpu_alert = cpu_alert_percent
+        self.alert_window = alert_window
+        self.alert_cooldown = alert_cooldown
+        self._histories: Dict[str, ServiceHistory] = {}
+        self._last_alert: Dict[tuple, float] = {}
+
+    def record(self, services, now: Optional[float] = None):
+        now = now or time.time()
+        for service in services:
+            history = self._histories.get(service.name)
+            if history is None:
+                history = self._histories[service.name] = ServiceHistory(self.capacity)
+            history.append(now, service.memory_usage, service.cpu_usage)
+
+    def summary(self, service_name: str, metric: str, seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """min/avg/max/p95/last plus a sparkline, or None without samples"""
+        history = self._histories.get(service_name)
+        if history is None:
+            return None
+        _, values = history.window(metric, seconds)
+        stats = summarize(values)
+        if stats is not None:
+            stats['sparkline'] = sparkline(values)
+        return stats
+
+    def covered_hours(self, service_name: str) -> float:
+        history = self._histories.get(service_name)
+        if history is None:
+            return 0.0
+        timestamps = history.timestamps.values()
+        return (timestamps[-1] - timestamps[0]) / 3600 if len(timestamps) > 1 else 0.0
+
+    def _cooled_down(self, key: tuple, now: float) -> bool:
+        if now - self._last_alert.get(key, 0) < self.alert_cooldown:
+            return False
+        self._last_alert[key] = now
+        return True
+
+    def check_alerts(self, display_names: Dict[str, str], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Threshold breaches over the alert window, respecting the cooldown"""
+        now = now or time.time()
+        alerts = []
+        min_samples = max(3, self.alert_window // self.sample_interval // 2)
+
+        for name, history in self._histories.items():
+            display_name = display_names.get(name, name)
+
+            if self.rss_growth_alert > 0:
+                timestamps, values = history.window('memory', self.alert_window, now)
+                rate = slope_per_hour(timestamps, values) if len(values) >= min_samples else None
+                if rate is not None and rate > self.rss_growth_alert and self._cooled_down((name, 'rss'), now):
+                    alerts.append({
+                        'service': display_name,
+                        'service_name': name,
+                        'kind': 'rss_growth',
+                        'value': rate,
+                        'threshold': self.rss_growth_alert,
+                        'current': values[-1]
+                    })
+
+            if self.cpu_alert > 0:
+                _, values = history.window('cpu', self.alert_window, now)
+                if len(values) >= min_samples:
+                    average = sum(values) / len(values)
+                    if average > self.cpu_alert and self._cooled_down((name, 'cpu'), now):
+                        alerts.append({
+                            'service': display_name,
+                            'service_name': name,
+                            'kind': 'cpu_high',
+                            'value': average,
+                            'threshold': self.cpu_alert,
+                            'current': values[-1]
+                        })
+        return alerts
@@ -0,0 +1,9 @@
+"""Üretim WSGI giriş noktası
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Ayrıntılar ve ayarlar için gunicorn.conf.py dosyasına bakın.
+"""
+from app import app, reinit_after_fork, startup_checks
+
+__all__ = ['app', 'reinit_after_fork', 'startup_checks']